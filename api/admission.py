@@ -0,0 +1,157 @@
+import asyncio
+import contextvars
+import math
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from api import metrics
+
+
+class Overloaded(Exception):
+    """Raised when the inference queue is full; the request should be retried later."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__(f"Inference queue is full; retry after {retry_after}s.")
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request's deadline passed before its inference ran."""
+
+
+class InferenceExecutor:
+    """
+    Bounded executor for CPU-bound model calls.
+
+    - At most max_concurrency calls run at once (own thread pool, not the
+      FastAPI default threadpool) and at most max_queue more may wait.
+    - Anything beyond that fails FAST with Overloaded, carrying a Retry-After
+      estimate (queue length x average inference time).
+    - Every call may carry a deadline (time.monotonic()): a queued call whose
+      deadline has passed is dropped instead of computed, and the waiting
+      request stops waiting at its deadline.
+
+    WHY: under a burst an unbounded queue makes EVERY request slow (they all
+    fight for the GIL inside model.predict); refusing a few keeps the rest fast.
+    """
+
+    def __init__(self, max_concurrency: int = 2, max_queue: int = 32) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1.")
+        if max_queue < 0:
+            raise ValueError("max_queue cannot be negative.")
+
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        self._pending = 0  # running + queued
+        self._running = 0
+        self._service_seconds: Optional[float] = None  # moving average of one call
+        self._n_completed = 0
+        self._n_rejected = 0
+        self._n_expired = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.max_concurrency + self.max_queue
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free (at least 1)."""
+        with self._lock:
+            pending, service = self._pending, self._service_seconds or 0.0
+        return max(1, math.ceil(pending / self.max_concurrency * service))
+
+    def submit(self, fn: Callable[..., Any], *args: Any, deadline: Optional[float] = None) -> "Future[Any]":
+        """Queue a call or raise Overloaded; the context (trace, metrics) goes along."""
+        with self._lock:
+            if self._pending >= self.capacity:
+                self._n_rejected += 1
+                admitted = False
+            else:
+                self._pending += 1
+                admitted = True
+                if self._pool is None:
+                    # Lazy, so the executor can be used again after shutdown()
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.max_concurrency, thread_name_prefix="immo-inference"
+                    )
+                pool = self._pool
+        if not admitted:
+            metrics.ADMISSION_REJECTED.inc(reason="overloaded")
+            raise Overloaded(self.retry_after())
+
+        context = contextvars.copy_context()
+        future = pool.submit(self._call, context, fn, args, deadline)
+        future.add_done_callback(self._release)
+        return future
+
+    async def run(self, fn: Callable[..., Any], *args: Any, deadline: Optional[float] = None) -> Any:
+        """Run fn(*args) in the executor and await its result (or the deadline)."""
+        future = self.submit(fn, *args, deadline=deadline)
+        waiter = asyncio.wrap_future(future)
+        if deadline is None:
+            return await waiter
+
+        try:
+            return await asyncio.wait_for(waiter, timeout=max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            # Still queued -> never computed; already running -> result is discarded
+            if future.cancel():
+                self._expired()
+            raise DeadlineExceeded("Request deadline passed while waiting for inference.") from None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": True,
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": self._pending - self._running,
+                "completed": self._n_completed,
+                "rejected": self._n_rejected,
+                "expired": self._n_expired,
+                "mean_inference_ms": (
+                    round(self._service_seconds * 1000, 3) if self._service_seconds is not None else None
+                ),
+            }
+
+    def shutdown(self) -> None:
+        """Drop queued calls and wait for running ones."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _expired(self) -> None:
+        with self._lock:
+            self._n_expired += 1
+        metrics.ADMISSION_REJECTED.inc(reason="deadline")
+
+    def _release(self, _: "Future[Any]") -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def _call(self, context: contextvars.Context, fn: Callable[..., Any], args: tuple,
+              deadline: Optional[float]) -> Any:
+        if deadline is not None and time.monotonic() >= deadline:
+            # The client has given up already: do not spend CPU on it
+            self._expired()
+            raise DeadlineExceeded("Request deadline passed before inference started.")
+
+        with self._lock:
+            self._running += 1
+        start = time.perf_counter()
+        try:
+            return context.run(fn, *args)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._running -= 1
+                self._n_completed += 1
+                previous = self._service_seconds
+                self._service_seconds = elapsed if previous is None else 0.9 * previous + 0.1 * elapsed
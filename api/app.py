@@ -1,23 +1,141 @@
-from typing import Any, Dict
+import hmac
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
 
-from fastapi import FastAPI, HTTPException, status
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, Header, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+
+from api.schemas import (
+    BatchPredictionRequest,
+    BatchPredictionResponse,
+    ColumnarPredictionRequest,
+    PredictionRequest,
+    PredictionResponse,
+)
+from api.predict import (
+    activate_model,
+    cache_stats,
+    inference_stats,
+    loaded_model_file,
+    model_registry,
+    model_status,
+    predict_prices_with_version,
+    score_columns,
+    warm_up,
+)
+from api import config, metrics, tracing
+from api.admission import DeadlineExceeded, InferenceExecutor, Overloaded
+from api.registry import ModelSwapper, SwapInProgress
+from api.batching import MicroBatcher
+from api.arrow import (
+    ARROW_STREAM_MEDIA_TYPE,
+    BINARY_FORMATS,
+    ArrowFormatError,
+    ArrowUnavailable,
+    BatchTooLarge,
+    detect_format,
+    predictions_body,
+    score_table,
+)
+from api.encoding import FastJSONResponse, batch_body, json_response
+from api.memory import process_memory
+from api.postcodes import postcode_index
+from api.streaming import STREAM_FORMATS, BodyStreamingResponse, gzip_stream, iter_lines, score_stream, start_stream
+
+logger = logging.getLogger(__name__)
+
+# WHY: opt-in; trades a few ms of latency for throughput under concurrent load
+_BATCHER: Optional[MicroBatcher[Tuple[float, str]]] = (
+    MicroBatcher(
+        predict_prices_with_version,
+        max_batch_size=config.BATCH_MAX_SIZE,
+        max_wait_ms=config.BATCH_MAX_WAIT_MS,
+    )
+    if config.BATCHING_ENABLED
+    else None
+)
+
+# WHY: a bounded queue that refuses extra work beats an unbounded one that makes
+# every request slow; with batching on, each waiting caller holds one slot, so
+# allow at least a full micro-batch to be in flight
+_EXECUTOR = InferenceExecutor(
+    max_concurrency=(
+        max(config.INFERENCE_CONCURRENCY, config.BATCH_MAX_SIZE)
+        if _BATCHER is not None
+        else config.INFERENCE_CONCURRENCY
+    ),
+    max_queue=config.INFERENCE_QUEUE,
+)
+
+
+# WHY: retrained models ship without a redeploy; loading happens next to live traffic
+_SWAPPER = ModelSwapper(model_registry(), activate_model, loaded_model_file)
+
+
+def _predict_one(features: Any) -> Tuple[float, str]:
+    """(price, model version) for one property, both from the same model version."""
+    return predict_prices_with_version([features])[0]
+
+
+def _deadline(request_timeout: Optional[float]) -> Optional[float]:
+    """Monotonic deadline from X-Request-Timeout, capped by IMMO_REQUEST_TIMEOUT."""
+    timeout = config.REQUEST_TIMEOUT_S
+    if request_timeout is not None and request_timeout > 0:
+        timeout = min(timeout, request_timeout) if timeout > 0 else request_timeout
+    return time.monotonic() + timeout if timeout > 0 else None
+
+
+def _warm_up() -> None:
+    try:
+        warm_up()
+    except Exception:
+        # Keep serving "/" so the failure is visible through /ready instead of a crash loop
+        logger.exception("Model warm-up failed; /ready will report not ready.")
 
-from api.schemas import PredictionRequest, PredictionResponse 
-from api.predict import predict_price
 
+# WHY: load + warm the model at deploy/cold start, not on the first user's request;
+# in the background by default, so a sleeping instance answers "/" while the model loads
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    tracing.configure_trace_file()
+    if config.BACKGROUND_WARMUP:
+        threading.Thread(target=_warm_up, name="immo-warm-up", daemon=True).start()
+    else:
+        await run_in_threadpool(_warm_up)
+    _SWAPPER.start_watching(config.MODEL_WATCH_SECONDS)
+
+    yield
+
+    _SWAPPER.stop_watching()
+
+    if _BATCHER is not None:
+        _BATCHER.stop(timeout=5)
+    await run_in_threadpool(_EXECUTOR.shutdown)
+    tracing.close_trace_file()
 
 
 app = FastAPI(
     title="Immo Eliza Deployment API",
     description="FastAPI backend for Belgian real-estate price prediction.",
     version="0.1.0",
-    default_response_class=JSONResponse,
+    # WHY: one encoding pass with orjson (when installed) instead of the stdlib encoder
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan,
 )
 
+# WHY: request counts, in-flight requests and latency per route for /metrics
+app.add_middleware(metrics.MetricsMiddleware)
+# WHY: Server-Timing header + optional trace file show where a slow request spent its time
+app.add_middleware(tracing.TracingMiddleware)
+
 # WHY: return documented JSON errors even when something crashes unexpectedly
 @app.exception_handler(Exception)
 def global_exception_handler(_: Any, exc: Exception) -> JSONResponse:
+    metrics.record_exception(exc)
     return JSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
@@ -31,6 +149,38 @@ def global_exception_handler(_: Any, exc: Exception) -> JSONResponse:
 
 
 
+# WHY: clients (and load balancers) must see "busy, retry later", not a slow timeout
+@app.exception_handler(Overloaded)
+def overloaded_handler(_: Any, exc: Overloaded) -> JSONResponse:
+    return JSONResponse(
+        status_code=config.OVERLOAD_STATUS,
+        headers={"Retry-After": str(exc.retry_after)},
+        content={
+            "detail": {
+                "status_code": config.OVERLOAD_STATUS,
+                "error": "Server is busy, retry later.",
+                "retry_after": exc.retry_after
+            }
+        }
+    )
+
+
+@app.exception_handler(DeadlineExceeded)
+def deadline_handler(_: Any, exc: DeadlineExceeded) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": "1"},
+        content={
+            "detail": {
+                "status_code": 503,
+                "error": "Request deadline exceeded before the prediction was computed.",
+                "message": str(exc)
+            }
+        }
+    )
+
+
+
 # WHY: easy uptime validation from browser or external service
 @app.get("/", response_model=Dict[str, str])
 def root() -> Dict[str, str]:
@@ -38,9 +188,164 @@ def root() -> Dict[str, str]:
 
 
 
+# WHY: readiness differs from liveness; only route traffic once the model answers
+@app.get("/ready")
+def ready() -> JSONResponse:
+    info = model_status()
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if info["ready"] else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"status": "ready" if info["ready"] else "not ready", **info},
+    )
+
+
+
+# WHY: operators need to see which batch sizes the micro-batcher actually achieves
+@app.get("/stats/batching", response_model=Dict[str, Any])
+def batching_stats() -> Dict[str, Any]:
+    if _BATCHER is None:
+        return {"enabled": False}
+    return _BATCHER.stats()
+
+
+
+# WHY: we cannot operate the API blind; Prometheus scrapes this text format
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics() -> PlainTextResponse:
+    info = model_status()
+    cache = cache_stats()
+    gauges = {
+        "immo_model_info": (
+            "Serving model version and engine (value is always 1).",
+            1,
+            {"version": info["version"], "engine": info["engine"]},
+        ),
+        "immo_model_ready": ("1 once the model passed its start-up self-test.", int(info["ready"]), {}),
+        "immo_model_load_seconds": ("Time spent loading the model artifact.", info["load_seconds"] or 0, {}),
+        "immo_model_calibration_seconds": (
+            "Time the auto engine spent timing its strategies.", info["calibration_seconds"] or 0, {}),
+        "immo_model_warmup_seconds": ("Time spent on the start-up self-test.", info["warmup_seconds"] or 0, {}),
+    }
+    counters = {}
+    if cache["enabled"]:
+        gauges["immo_cache_size"] = ("Prediction cache entries.", cache["size"], {})
+        for key in ("hits", "misses", "evictions"):
+            counters[f"immo_cache_{key}_total"] = (f"Prediction cache {key}.", cache[key], {})
+    if _BATCHER is not None:
+        batching = _BATCHER.stats()
+        counters["immo_batcher_batches_total"] = ("Micro-batches run.", batching["batches"], {})
+        counters["immo_batcher_items_total"] = ("Requests served through micro-batches.", batching["items"], {})
+    admission = _EXECUTOR.stats()
+    gauges["immo_inference_running"] = ("Model calls running now.", admission["running"], {})
+    gauges["immo_inference_queued"] = ("Model calls waiting for a slot.", admission["queued"], {})
+
+    return PlainTextResponse(
+        metrics.render(gauges, counters),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+
+# WHY: shows how close the inference queue is to refusing work
+@app.get("/stats/admission", response_model=Dict[str, Any])
+def admission_stats() -> Dict[str, Any]:
+    return _EXECUTOR.stats()
+
+
+
+# WHY: shows which model versions can be swapped in and how the last swap went
+@app.get("/models", response_model=Dict[str, Any])
+def models() -> Dict[str, Any]:
+    info = model_status()
+    return {
+        "serving": {"version": info["version"], "model_file": info["model_file"]},
+        "available": model_registry().describe(),
+        "swap": _SWAPPER.status(),
+    }
+
+
+
+def _require_admin(token: Optional[str]) -> None:
+    if not config.ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail={"status_code": 403, "error": "Admin endpoints are disabled (set IMMO_ADMIN_TOKEN)."}
+        )
+    if not token or not hmac.compare_digest(token, config.ADMIN_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail={"status_code": 401, "error": "Invalid admin token."}
+        )
+
+
+
+# WHY: zero-downtime model rollout; loads + self-tests in the background, then swaps
+@app.post("/admin/models/{name}/activate", status_code=status.HTTP_202_ACCEPTED)
+def activate(
+    name: str,
+    admin_token: Optional[str] = Header(None, alias="X-Admin-Token"),
+) -> JSONResponse:
+    _require_admin(admin_token)
+    try:
+        swap = _SWAPPER.request(name)
+    except (ValueError, FileNotFoundError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"status_code": 404, "error": str(exc)}
+        )
+    except SwapInProgress as exc:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"status_code": 409, "error": str(exc)}
+        )
+    return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=swap)
+
+
+
+# WHY: operators need hit/miss/eviction counters to size the prediction cache
+@app.get("/stats/cache", response_model=Dict[str, Any])
+def prediction_cache_stats() -> Dict[str, Any]:
+    return cache_stats()
+
+
+
+# WHY: shows which inference engine answers and whether its worker pool had to recover
+@app.get("/stats/inference", response_model=Dict[str, Any])
+def inference_engine_stats() -> Dict[str, Any]:
+    return inference_stats()
+
+
+
+# WHY: with several workers, each one reports its own RSS vs shared/private split
+@app.get("/stats/memory", response_model=Dict[str, Any])
+def memory_stats() -> Dict[str, Any]:
+    return process_memory()
+
+
+
+# WHY: clients can fill province/locality from a postcode with the same data we validate against
+@app.get("/locations/{postcode}", response_model=Dict[str, Any])
+def location_lookup(postcode: int) -> Dict[str, Any]:
+    info = postcode_index().lookup(postcode) if 1000 <= postcode <= 9999 else None
+    if info is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"status_code": 404, "error": f"{postcode} is not a Belgian postcode."},
+        )
+    return info._asdict()
+
+
+
 # WHY: location + property_type must be mandatory and not guessed or skipped
 @app.post("/predict", response_model=PredictionResponse)
-def predict(features: PredictionRequest) -> JSONResponse:
+async def predict(
+    features: PredictionRequest,
+    request_timeout: Optional[float] = Header(
+        None,
+        alias="X-Request-Timeout",
+        description="Seconds the client will wait; queued work is dropped after that.",
+    ),
+) -> JSONResponse:
+    metrics.observe_request_validation()
     try:
         # Validate mandatory data BEFORE prediction
         if not features.data.property_type:
@@ -62,34 +367,234 @@ def predict(features: PredictionRequest) -> JSONResponse:
                 }
             )
 
-        # Call model service
-        price = predict_price(features.data)
+        # Call model service through the bounded executor (and the micro-batcher when enabled)
+        deadline = _deadline(request_timeout)
+        if _BATCHER is not None:
+            # Model stages run on the batcher thread: time queue wait + shared model call
+            with metrics.timed("batched_predict"):
+                price, version = await _EXECUTOR.run(_BATCHER.predict, features.data, deadline=deadline)
+        else:
+            price, version = await _EXECUTOR.run(_predict_one, features.data, deadline=deadline)
 
         # Prevent leakage — compute AFTER inference
-        price_per_m2 = price / price if price else None
+        price_per_m2 = price / features.data.livable_surface
 
+        with metrics.timed("serialization"):
+            # Returned as-is: FastAPI does not re-validate it against response_model
+            response = FastJSONResponse(
+                status_code=status.HTTP_200_OK,
+                content={
+                    "prediction": price,
+                    "price_per_m2": price_per_m2,
+                    "status_code": 200,
+                    "model_version": version
+                }
+            )
+        return response
+
+    except (HTTPException, Overloaded, DeadlineExceeded):
+        # Already formatted JSON errors (and 503 / Retry-After) should pass cleanly
+        raise
+    except Exception as model_exc:
+        # WHY: model errors must be explicit and wrapped in JSON
+        metrics.record_exception(model_exc)
         return JSONResponse(
-            status_code=status.HTTP_200_OK,
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             content={
-                "prediction": price,
-                "price_per_m2": price_per_m2,
-                "status_code": 200
+                "detail": {
+                    "status_code": 500,
+                    "error": "Prediction service failed.",
+                    "details": str(model_exc)
+                }
             }
         )
 
-    except HTTPException as http_exc:
-        # Already formatted JSON errors should pass cleanly
-        raise http_exc
+
+
+# WHY: nightly re-pricing scores thousands of listings; one DataFrame + one model call
+# is orders of magnitude cheaper than one HTTP round-trip per property
+@app.post("/predict/batch", response_model=BatchPredictionResponse)
+async def predict_batch(
+    request: BatchPredictionRequest,
+    request_timeout: Optional[float] = Header(
+        None,
+        alias="X-Request-Timeout",
+        description="Seconds the client will wait; queued work is dropped after that.",
+    ),
+) -> JSONResponse:
+    metrics.observe_request_validation()
+    try:
+        # Validate every item on its own, then call model service ONCE for the valid ones
+        scored = await _EXECUTOR.run(score_columns, request.data, deadline=_deadline(request_timeout))
+
+        with metrics.timed("serialization"):
+            # Encoded straight from the price arrays, no dict per item
+            response = json_response(batch_body(scored))
+        return response
+
+    except (Overloaded, DeadlineExceeded):
+        raise
     except Exception as model_exc:
         # WHY: model errors must be explicit and wrapped in JSON
+        metrics.record_exception(model_exc)
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             content={
                 "detail": {
                     "status_code": 500,
-                    "error": "Prediction service failed.",
+                    "error": "Batch prediction service failed.",
+                    "details": str(model_exc)
+                }
+            }
+        )
+
+
+
+# WHY: bulk callers already hold columns; validating them per column skips building
+# thousands of PropertyFeatures objects, which costs more than the model call
+@app.post("/predict/columns", response_model=BatchPredictionResponse)
+async def predict_columns(
+    request: ColumnarPredictionRequest,
+    request_timeout: Optional[float] = Header(
+        None,
+        alias="X-Request-Timeout",
+        description="Seconds the client will wait; queued work is dropped after that.",
+    ),
+) -> JSONResponse:
+    metrics.observe_request_validation()
+    # Deferred: pulls in pandas, which "/" does not need at cold start
+    from api.columnar import score_columnar
+
+    try:
+        scored = await _EXECUTOR.run(score_columnar, request.data, deadline=_deadline(request_timeout))
+
+        with metrics.timed("serialization"):
+            response = json_response(batch_body(scored))
+        return response
+
+    except (Overloaded, DeadlineExceeded):
+        raise
+    except Exception as model_exc:
+        # WHY: model errors must be explicit and wrapped in JSON
+        metrics.record_exception(model_exc)
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={
+                "detail": {
+                    "status_code": 500,
+                    "error": "Columnar prediction service failed.",
                     "details": str(model_exc)
                 }
             }
         )
 
+
+
+# WHY: data pipelines already hold Arrow / Parquet; decoding it is a memory copy at
+# most, where the same batch as JSON costs more to parse than to score
+@app.post("/predict/arrow")
+async def predict_arrow(
+    request: Request,
+    input_format: Optional[str] = Query(
+        None,
+        alias="format",
+        description="'arrow' (IPC stream or file) or 'parquet'; defaults to the Content-Type / body.",
+    ),
+    request_timeout: Optional[float] = Header(
+        None,
+        alias="X-Request-Timeout",
+        description="Seconds the client will wait; queued work is dropped after that.",
+    ),
+) -> Response:
+    body = await request.body()
+    metrics.observe_request_validation()
+    fmt = (input_format or detect_format(request.headers.get("content-type", ""), body)).lower()
+    if fmt not in BINARY_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "status_code": 400,
+                "error": f"Unsupported binary format '{fmt}'. Use one of {list(BINARY_FORMATS)}."
+            }
+        )
+
+    try:
+        scored = await _EXECUTOR.run(score_table, body, fmt, deadline=_deadline(request_timeout))
+
+        with metrics.timed("serialization"):
+            if "json" in request.headers.get("accept", "").lower():
+                response = json_response(batch_body(scored))
+            else:
+                response = Response(
+                    content=predictions_body(scored),
+                    media_type=ARROW_STREAM_MEDIA_TYPE,
+                    headers={"X-Model-Version": scored.model_version or ""},
+                )
+        return response
+
+    except (Overloaded, DeadlineExceeded):
+        raise
+    except ArrowUnavailable as exc:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail={"status_code": 501, "error": str(exc)}
+        )
+    except BatchTooLarge as exc:
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail={"status_code": 413, "error": str(exc)}
+        )
+    except ArrowFormatError as exc:
+        # Not Arrow / Parquet, no known columns, or no rows
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"status_code": 400, "error": str(exc)}
+        )
+    except Exception as model_exc:
+        # WHY: model errors must be explicit and wrapped in JSON
+        metrics.record_exception(model_exc)
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={
+                "detail": {
+                    "status_code": 500,
+                    "error": "Arrow prediction service failed.",
+                    "details": str(model_exc)
+                }
+            }
+        )
+
+
+# WHY: multi-million-row exports must be scored without holding them in memory
+# or splitting them into thousands of requests
+@app.post("/predict/stream")
+async def predict_stream(
+    request: Request,
+    input_format: Optional[str] = Query(
+        None,
+        alias="format",
+        description="'ndjson' or 'csv'; defaults to the request Content-Type.",
+    ),
+) -> BodyStreamingResponse:
+    content_type = request.headers.get("content-type", "").lower()
+    fmt = (input_format or ("csv" if "csv" in content_type else "ndjson")).lower()
+    if fmt not in STREAM_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "status_code": 400,
+                "error": f"Unsupported stream format '{fmt}'. Use one of {list(STREAM_FORMATS)}."
+            }
+        )
+
+    gzipped = request.headers.get("content-encoding", "").lower() == "gzip"
+    # Chunks share the bounded executor; Overloaded on the first one is a plain 503
+    body = await start_stream(score_stream(iter_lines(request.stream(), gzipped), fmt, config.STREAM_CHUNK_SIZE,
+                                           _EXECUTOR.run))
+
+    headers = {}
+    if "gzip" in request.headers.get("accept-encoding", "").lower():
+        body = gzip_stream(body)
+        headers["Content-Encoding"] = "gzip"
+
+    return BodyStreamingResponse(body, media_type="application/x-ndjson", headers=headers)
@@ -0,0 +1,160 @@
+"""
+Binary batches: an Arrow IPC stream or a Parquet file in, an Arrow column of prices out.
+
+    curl -X POST localhost:8000/predict/arrow --data-binary @batch.arrows \
+         -H "Content-Type: application/vnd.apache.arrow.stream" -o predictions.arrows
+
+- Same columns as /predict/columns (PropertyFeatures fields, Location fields
+  flat); the model column names ("Livable surface", "Postcode", ...) work too.
+- Numeric and boolean columns map onto NumPy views of the Arrow buffers (no
+  copy when they have no nulls) and are validated in place by api/columnar.py;
+  only text columns become Python strings, which the model's encoders need.
+- The response is an Arrow IPC stream: index, prediction, price_per_m2,
+  status_code, errors (JSON text, null for valid rows), with the model version
+  in the schema metadata. Accept: application/json gives the usual JSON body.
+- pyarrow is optional (pip install pyarrow); without it the endpoint answers 501.
+"""
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+from api import config, metrics
+from api.encoding import dumps
+from api.features import FEATURE_COLUMNS, LOCATION_COLUMNS
+from api.predict import ScoredItems
+from api.schemas import Location, PropertyFeatures
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+BINARY_FORMATS = ("arrow", "parquet")
+
+_PARQUET_MAGIC = b"PAR1"
+_ARROW_FILE_MAGIC = b"ARROW1"
+
+# Column names of the columnar format (api/columnar.py)
+_FIELDS = {name for name in PropertyFeatures.model_fields if name != "location"} | set(Location.model_fields)
+# Model column name -> field name ("Livable surface" -> "livable_surface")
+_ALIASES = {
+    **FEATURE_COLUMNS,
+    **{column: key for column, key in LOCATION_COLUMNS.items() if key in _FIELDS},
+}
+
+
+class ArrowUnavailable(RuntimeError):
+    """pyarrow is not installed."""
+
+
+class ArrowFormatError(ValueError):
+    """The body is not a usable Arrow / Parquet batch."""
+
+
+class BatchTooLarge(ArrowFormatError):
+    """More rows than IMMO_ARROW_MAX_ROWS."""
+
+
+def _import_pyarrow() -> Tuple[Any, Any]:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ArrowUnavailable(
+            "Arrow / Parquet input needs the optional pyarrow package (pip install pyarrow)."
+        ) from exc
+    return pa, pq
+
+
+def detect_format(content_type: str, body: bytes) -> str:
+    """'parquet' for a Parquet Content-Type or body, else 'arrow'."""
+    if "parquet" in content_type.lower() or body[:4] == _PARQUET_MAGIC:
+        return "parquet"
+    return "arrow"
+
+
+def read_table(body: bytes, fmt: str) -> Any:
+    """pyarrow Table from the request body; the buffers point into `body` where the format allows."""
+    pa, pq = _import_pyarrow()
+    buffer = pa.py_buffer(body)
+    try:
+        if fmt == "parquet":
+            table = pq.read_table(pa.BufferReader(buffer))
+        elif body[:6] == _ARROW_FILE_MAGIC:
+            # Arrow IPC file (random access) format, e.g. pyarrow.feather without compression
+            table = pa.ipc.open_file(buffer).read_all()
+        else:
+            table = pa.ipc.open_stream(buffer).read_all()
+    except (pa.ArrowException, OSError) as exc:
+        raise ArrowFormatError(f"Could not read the body as {fmt}: {exc}") from exc
+
+    if table.num_rows == 0:
+        raise ArrowFormatError("Expected at least 1 row, got 0.")
+    if table.num_rows > config.ARROW_MAX_ROWS:
+        raise BatchTooLarge(f"Expected at most {config.ARROW_MAX_ROWS} rows, got {table.num_rows}.")
+    return table
+
+
+def _to_numpy(column: Any) -> np.ndarray:
+    """
+    One Arrow column as NumPy.
+
+    - Numbers without nulls: a read-only view of the Arrow buffer (one chunk).
+    - Integers with nulls: float64 with NaN; booleans with nulls / text: object.
+    """
+    pa, _ = _import_pyarrow()
+    kind = column.type
+    if pa.types.is_dictionary(kind):
+        # pandas categoricals arrive dictionary-encoded
+        column, kind = column.cast(kind.value_type), kind.value_type
+    if pa.types.is_decimal(kind):
+        column = column.cast(pa.float64())
+    return column.to_numpy()
+
+
+def table_columns(table: Any) -> Dict[str, np.ndarray]:
+    """Known columns of the table by field name (unknown ones are ignored)."""
+    columns: Dict[str, np.ndarray] = {}
+    for name, column in zip(table.column_names, table.columns):
+        field = _ALIASES.get(name, name)
+        if field in _FIELDS and field not in columns:
+            columns[field] = _to_numpy(column)
+    if not columns:
+        raise ArrowFormatError(
+            f"None of the columns {table.column_names[:10]} is a property field; "
+            "expected e.g. 'property_type', 'livable_surface', 'postcode'."
+        )
+    return columns
+
+
+def score_table(body: bytes, fmt: str) -> ScoredItems:
+    """Decode an Arrow / Parquet body and score it like /predict/columns."""
+    from api.columnar import score_columnar
+
+    with metrics.timed("deserialization"):
+        columns = table_columns(read_table(body, fmt))
+    return score_columnar(columns)
+
+
+def predictions_body(scored: ScoredItems) -> bytes:
+    """The scores as an Arrow IPC stream (one record batch)."""
+    pa, _ = _import_pyarrow()
+    n_rows = len(scored.prices)
+    failed = np.zeros(n_rows, dtype=bool)
+    failed[list(scored.errors)] = True
+
+    errors = np.full(n_rows, None, dtype=object)
+    for index, item_errors in scored.errors.items():
+        errors[index] = dumps(item_errors).decode("utf-8")
+
+    table = pa.table(
+        {
+            "index": np.arange(n_rows, dtype=np.int64),
+            "prediction": pa.array(scored.prices, mask=np.isnan(scored.prices)),
+            "price_per_m2": pa.array(scored.price_per_m2, mask=~np.isfinite(scored.price_per_m2)),
+            "status_code": np.where(failed, 422, 200).astype(np.int16),
+            "errors": pa.array(errors, type=pa.string()),
+        },
+        metadata={"model_version": scored.model_version or ""},
+    )
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
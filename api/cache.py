@@ -0,0 +1,108 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+def feature_key(feature_dict: Dict[str, Any], model_version: str) -> str:
+    """
+    Canonical hash of the model input + model version.
+
+    - feature_dict is the output of preprocess_for_model, so only the fields
+      the model actually sees are part of the key (location, property_type... are not).
+    - Keys are sorted and JSON-encoded so field order never matters.
+    """
+    canonical = json.dumps(feature_dict, sort_keys=True, separators=(",", ":"), default=str)
+    digest = hashlib.sha256()
+    digest.update(model_version.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(canonical.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class PredictionCache:
+    """
+    Bounded, thread-safe LRU cache with a time-to-live for predicted prices.
+
+    - max_size: least recently used entries are evicted beyond this size.
+    - ttl_seconds: entries older than this are treated as misses (0 = no expiry).
+    - bind_model(version): drops every entry when the serving model changes.
+    """
+
+    def __init__(self, max_size: int = 10_000, ttl_seconds: float = 3600.0) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1.")
+
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+
+        self._entries: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._model_version: Optional[str] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def bind_model(self, model_version: str) -> None:
+        """Invalidate everything if predictions come from a different model now."""
+        with self._lock:
+            if self._model_version == model_version:
+                return
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._model_version = model_version
+
+    def get(self, key: str) -> Optional[float]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            stored_at, price = entry
+            if self.ttl_seconds and now - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return price
+
+    def put(self, key: str, price: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), price)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for operators."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": True,
+                "model_version": self._model_version,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
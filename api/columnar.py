@@ -0,0 +1,316 @@
+"""
+Columnar requests: one array per feature instead of one object per property.
+
+    {"data": {"property_type": ["house", "apartment"], "livable_surface": [120, 80],
+              "province": ["Antwerpen", "Limburg"], "postcode": [2000, 3500], ...}}
+
+- Column names are PropertyFeatures fields, with the Location fields flat
+  (province, postcode, locality, region, country) as in CSV input.
+- COLUMN_SPECS is read from the pydantic schemas (type, required, ge / le /
+  min_length), so these checks cannot drift from the Field constraints.
+- Every column is checked at once with NumPy / pandas; no PropertyFeatures
+  or Location object is ever built. Invalid rows get pydantic-style errors
+  (loc / msg / type) by index and never fail the other rows.
+- Valid rows go straight into the model DataFrame (same column values as
+  the per-object path, so predictions are identical); the prediction cache
+  is skipped, bulk rows rarely repeat.
+"""
+import typing
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import annotated_types
+import numpy as np
+import pandas as pd
+
+from api import config, metrics, tracing
+from api.features import FEATURE_COLUMNS, LOCATION_COLUMNS, missing_as_nan
+from api.postcodes import canonical_province, canonical_region, is_belgian, postcode_index
+from api.predict import ScoredItems, current_model
+from api.schemas import Location, PropertyFeatures
+
+# Spellings pydantic accepts for booleans (lax mode); 0 / 1 match True / False as dict keys
+_TRUE = ("true", "yes", "on", "t", "y", "1")
+_FALSE = ("false", "no", "off", "f", "n", "0")
+_BOOL_STRINGS = {**{text: True for text in _TRUE}, **{text: False for text in _FALSE}}
+_BOOL_VALUES = {True: True, False: False}
+
+
+def _bool_value(value: Any) -> Optional[bool]:
+    if isinstance(value, str):
+        return _BOOL_STRINGS.get(value.lower())
+    if isinstance(value, (bool, int, float)):
+        return _BOOL_VALUES.get(value)
+    return None
+
+
+class ColumnSpec(NamedTuple):
+    name: str
+    kind: type  # int, float, bool or str
+    required: bool
+    ge: Optional[float] = None
+    le: Optional[float] = None
+    min_length: Optional[int] = None
+
+
+def _spec(name: str, field: Any) -> ColumnSpec:
+    kind = field.annotation
+    if typing.get_origin(kind) is typing.Union:
+        # Optional[X] -> X
+        kind = next(arg for arg in typing.get_args(kind) if arg is not type(None))
+    constraints: Dict[str, Any] = {}
+    for item in field.metadata:
+        if isinstance(item, annotated_types.Ge):
+            constraints["ge"] = item.ge
+        elif isinstance(item, annotated_types.Le):
+            constraints["le"] = item.le
+        elif isinstance(item, annotated_types.MinLen):
+            constraints["min_length"] = item.min_length
+    return ColumnSpec(name, kind, field.is_required(), **constraints)
+
+
+COLUMN_SPECS: Tuple[ColumnSpec, ...] = tuple(
+    [_spec(name, field) for name, field in PropertyFeatures.model_fields.items() if name != "location"]
+    + [_spec(name, field) for name, field in Location.model_fields.items()]
+)
+
+
+class ColumnError(NamedTuple):
+    rows: np.ndarray  # bool mask
+    type: str
+    msg: str
+
+
+def _object_array(values: List[Any]) -> np.ndarray:
+    array = np.empty(len(values), dtype=object)
+    array[:] = values  # never turns nested lists into extra dimensions
+    return array
+
+
+def _not_scalar(raw: np.ndarray, inferred: str) -> np.ndarray:
+    if inferred not in ("mixed", "mixed-integer"):
+        return np.zeros(len(raw), dtype=bool)
+    return np.fromiter((isinstance(value, (list, dict)) for value in raw), dtype=bool, count=len(raw))
+
+
+def _number_errors(spec: ColumnSpec, numbers: np.ndarray, present: np.ndarray,
+                   unparsed: np.ndarray) -> Tuple[np.ndarray, List[ColumnError]]:
+    """Type and ge / le checks of a numeric column; returns the usable rows and the errors."""
+    errors: List[ColumnError] = []
+    with np.errstate(invalid="ignore"):
+        if spec.kind is int:
+            bad = unparsed | (present & ~unparsed & (~np.isfinite(numbers) | (numbers != np.floor(numbers))))
+            errors.append(ColumnError(bad, "int_parsing", "Input should be a valid integer"))
+        else:
+            bad = unparsed
+            errors.append(ColumnError(bad, "float_parsing", "Input should be a valid number"))
+        usable = present & ~bad
+        if spec.ge is not None:
+            errors.append(ColumnError(usable & ~(numbers >= spec.ge), "greater_than_equal",
+                                      f"Input should be greater than or equal to {spec.ge}"))
+        if spec.le is not None:
+            errors.append(ColumnError(usable & ~(numbers <= spec.le), "less_than_equal",
+                                      f"Input should be less than or equal to {spec.le}"))
+    return usable, errors
+
+
+def _check_typed(spec: ColumnSpec, raw: np.ndarray) -> Optional[Tuple[np.ndarray, List[ColumnError]]]:
+    """
+    Numeric / boolean NumPy arrays (Arrow, Parquet): checked without boxing.
+
+    The array itself is returned (no copy; NaN = missing), since rows with
+    errors never reach the model. None = no fast path for this dtype.
+    """
+    kind = raw.dtype.kind
+    if spec.kind is bool and kind == "b":
+        return raw, []
+    if spec.kind not in (int, float) or kind not in "iuf":
+        return None
+    numbers = raw.astype(np.float64, copy=False)
+    missing = np.isnan(numbers)
+    errors: List[ColumnError] = []
+    if spec.required and missing.any():
+        errors.append(ColumnError(missing, "missing", "Field required"))
+    _, checks = _number_errors(spec, numbers, ~missing, np.zeros(len(raw), dtype=bool))
+    errors.extend(checks)
+    return raw, [error for error in errors if error.rows.any()]
+
+
+def check_column(spec: ColumnSpec, raw: np.ndarray) -> Tuple[np.ndarray, List[ColumnError]]:
+    """
+    Convert one column like pydantic would and report the rows that fail.
+
+    Returns an object array (Python int / float / bool / str, None = missing)
+    and the errors of the column; typed numeric / boolean arrays come back
+    as they are (see _check_typed).
+    """
+    if raw.dtype != object:
+        typed = _check_typed(spec, raw)
+        if typed is not None:
+            return typed
+        raw = raw.astype(object)
+
+    missing = pd.isna(raw)
+    present = ~missing
+    errors: List[ColumnError] = []
+    if spec.required and missing.any():
+        errors.append(ColumnError(missing, "missing", "Field required"))
+
+    inferred = pd.api.types.infer_dtype(raw, skipna=True)
+    nested = _not_scalar(raw, inferred)
+    converted = np.full(len(raw), None, dtype=object)
+
+    if spec.kind in (int, float):
+        if inferred in ("integer", "floating", "mixed-integer-float", "empty"):
+            # Plain JSON numbers: one C-level cast
+            numbers = np.where(missing, np.nan, raw).astype(np.float64)
+        else:
+            numbers = pd.to_numeric(pd.Series(np.where(nested, None, raw)), errors="coerce").to_numpy(np.float64)
+        usable, checks = _number_errors(spec, numbers, present, present & np.isnan(numbers))
+        errors.extend(checks)
+        if spec.kind is int:
+            converted[usable] = numbers[usable].astype(np.int64).astype(object)
+        else:
+            converted[usable] = numbers[usable].astype(object)
+
+    elif spec.kind is bool:
+        if inferred in ("boolean", "empty"):
+            values = raw
+        elif inferred == "string":
+            values = pd.Series(raw, dtype=object).str.lower().map(_BOOL_STRINGS).to_numpy(object)
+        elif inferred in ("integer", "floating", "mixed-integer-float"):
+            values = pd.Series(raw, dtype=object).map(_BOOL_VALUES).to_numpy(object)
+        else:
+            # Mixed types: one by one
+            values = _object_array([None if flag else _bool_value(value) for value, flag in zip(raw, nested)])
+        bad = present & pd.isna(values)
+        errors.append(ColumnError(bad, "bool_parsing", "Input should be a valid boolean"))
+        converted[present & ~bad] = values[present & ~bad]
+
+    else:
+        if inferred in ("string", "empty"):
+            is_text = present
+        else:
+            is_text = np.fromiter((type(value) is str for value in raw), dtype=bool, count=len(raw))
+        errors.append(ColumnError(present & ~is_text, "string_type", "Input should be a valid string"))
+        usable = is_text
+        if spec.min_length:
+            lengths = pd.Series(np.where(is_text, raw, "")).str.len().to_numpy()
+            short = is_text & (lengths < spec.min_length)
+            errors.append(ColumnError(short, "string_too_short",
+                                      f"String should have at least {spec.min_length} character"
+                                      + ("s" if spec.min_length > 1 else "")))
+            usable = usable & ~short
+        converted[usable] = raw[usable]
+
+    return converted, [error for error in errors if error.rows.any()]
+
+
+def _location_errors(columns: Dict[str, np.ndarray], candidates: np.ndarray) -> List[Tuple[str, ColumnError]]:
+    """Same checks as postcodes.check_location, for all rows at once."""
+    if config.POSTCODE_CHECK != "strict":
+        return []
+    postcodes = np.where(candidates, columns["postcode"], 0).astype(np.int64)
+    expected = postcode_index().columns(postcodes)
+
+    country = pd.Series(columns["country"], dtype=object)
+    distinct = {value: is_belgian(value) for value in country.dropna().unique()}
+    belgian = country.map(distinct).fillna(True).to_numpy(bool)  # no country = Belgian postcode
+    checked = candidates & belgian
+
+    def canonical(values: np.ndarray, lookup: Any) -> np.ndarray:
+        series = pd.Series(values, dtype=object)
+        distinct = {value: lookup(value) for value in series.dropna().unique()}
+        return series.map(distinct).to_numpy(object)
+
+    province = canonical(columns["province"], canonical_province)
+    region = canonical(columns["region"], canonical_region)
+    has_region = ~pd.isna(columns["region"])
+    return [
+        ("province", ColumnError(checked & (province != expected["province"]), "value_error",
+                                 "Value error, province does not match the postcode")),
+        ("region", ColumnError(checked & has_region & (region != expected["region"]), "value_error",
+                               "Value error, region does not match the postcode")),
+    ]
+
+
+def validate_columns(data: Dict[str, Any]) -> Tuple[Dict[str, np.ndarray], Dict[int, List[Dict[str, Any]]]]:
+    """
+    Check every column; returns the converted columns and {row index: errors}.
+
+    - Columns are lists (JSON) or NumPy arrays (Arrow / Parquet).
+    - All columns must have the same length; unknown columns are ignored (as
+      PropertyFeatures ignores unknown fields).
+    """
+    n_rows = len(next(iter(data.values()))) if data else 0
+    converted: Dict[str, np.ndarray] = {}
+    failed: List[Tuple[str, ColumnError]] = []
+
+    for spec in COLUMN_SPECS:
+        values = data.get(spec.name)
+        if values is None:
+            raw = np.full(n_rows, None, dtype=object)
+        else:
+            raw = values if isinstance(values, np.ndarray) else _object_array(values)
+        converted[spec.name], errors = check_column(spec, raw)
+        failed.extend((spec.name, error) for error in errors)
+
+    bad_rows = np.zeros(n_rows, dtype=bool)
+    for _, error in failed:
+        bad_rows |= error.rows
+    failed.extend(
+        (name, error) for name, error in _location_errors(converted, ~bad_rows) if error.rows.any()
+    )
+
+    row_errors: Dict[int, List[Dict[str, Any]]] = {}
+    for name, error in failed:
+        for index in np.flatnonzero(error.rows).tolist():
+            row_errors.setdefault(index, []).append({"loc": [name], "msg": error.msg, "type": error.type})
+    return converted, dict(sorted(row_errors.items()))
+
+
+def _model_frame(columns: Dict[str, np.ndarray], rows: np.ndarray, model_columns: List[str],
+                 as_dict: bool = False) -> Any:
+    # All rows valid (the usual bulk case): the columns go in as they are, no copy
+    n_rows = len(columns["postcode"])
+    take: Any = slice(None) if len(rows) == n_rows else rows
+    frame: Dict[str, np.ndarray] = {}
+    enriched = None
+    for column in model_columns:
+        if column in FEATURE_COLUMNS:
+            values = columns[FEATURE_COLUMNS[column]][take]
+            if values.dtype == object:
+                # Missing as NaN, like the per-object path (a row must not depend on its neighbours)
+                values = missing_as_nan(values.copy())
+            frame[column] = values
+        else:
+            if enriched is None:
+                enriched = postcode_index().columns(columns["postcode"][take].astype(np.int64))
+            frame[column] = enriched[LOCATION_COLUMNS[column]]
+    if as_dict:
+        # Fused preprocessing reads the columns directly
+        return frame
+    return pd.DataFrame(frame, columns=model_columns, copy=False)
+
+
+def score_columnar(data: Dict[str, Any]) -> ScoredItems:
+    """Validate a columnar batch and predict its valid rows in ONE model call."""
+    with metrics.timed("request_validation"):
+        columns, errors = validate_columns(data)
+    n_rows = len(columns["livable_surface"])
+    valid = np.ones(n_rows, dtype=bool)
+    valid[list(errors)] = False
+    rows = np.flatnonzero(valid)
+    tracing.annotate(rows=n_rows)
+
+    prices = np.full(n_rows, np.nan)
+    serving = current_model() if len(rows) else None
+    if serving is not None:
+        model_columns = list(serving.layout.columns) if serving.layout is not None else list(FEATURE_COLUMNS)
+        with metrics.timed("preprocess"):
+            frame = _model_frame(columns, rows, model_columns, as_dict=serving.fused)
+        with metrics.timed("predict"):
+            prices[rows] = np.asarray(serving.predictor.predict(frame), dtype=np.float64)
+        metrics.PREDICTED_ROWS.inc(len(rows))
+
+    surfaces = np.where(valid, columns["livable_surface"], np.nan).astype(np.float64)
+    return ScoredItems(prices, prices / surfaces, errors, serving.version if serving else None)
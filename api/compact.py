@@ -0,0 +1,252 @@
+"""
+Forest compaction: a smaller, faster variant of the model within an error budget.
+
+    python -m api.compact eval.csv --max-deviation 1.0
+    python -m api.compact eval.csv --max-mape-increase 0.5 -o api/models/rf-compact.joblib
+
+- eval.csv is held-out data (not used for training) with the model columns
+  ("Livable surface", ...) or PropertyFeatures field names, plus an optional
+  price column.
+- Candidates: depth caps (deep nodes become leaves predicting their mean) x
+  number of trees, trees picked greedily so their average stays closest to
+  the full forest.
+- Every variant is a float32 CompiledForest (float32 leaf values, thresholds
+  rounded down to float32 so splits decide exactly as before, int32 indices).
+- The eval set is split in two: candidates are chosen on one half and must
+  ALSO meet the budget on the other, so the budget is not met by overfitting.
+- Budgets: --max-deviation = mean |compact - original| / original in %;
+  --max-mape-increase = allowed MAPE increase vs the true prices in % points.
+  Only the budgets given apply; with neither, --max-deviation 1.0.
+- The result is a regular registry artifact: serve it with IMMO_MODEL_NAME or
+  a hot swap. A JSON report (size, load time, latency, error deltas) is
+  written next to it.
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from api import config
+from api.features import FEATURE_COLUMNS, missing_as_nan
+from api.forest import CompiledForest, CompiledPipeline
+from api.predict import _unwrap_model
+
+DEFAULT_DEPTHS: Tuple[Optional[int], ...] = (None, 12, 10, 8, 6)
+# Budget when none is given on the command line (mean deviation, %)
+DEFAULT_MAX_DEVIATION = 1.0
+
+
+def load_eval_set(path: Path, price_column: str = "price") -> Tuple[pd.DataFrame, Optional[np.ndarray]]:
+    """Model input columns + true prices (None without a price column), missing values as NaN like serving."""
+    frame = pd.read_csv(path)
+    # PropertyFeatures field names -> model column names
+    frame = frame.rename(columns={attribute: column for column, attribute in FEATURE_COLUMNS.items()})
+    prices = frame[price_column].to_numpy(dtype=np.float64) if price_column in frame else None
+    values = frame.reindex(columns=list(FEATURE_COLUMNS)).to_numpy(dtype=object)
+    # Same frame as api.predict._model_input: dtype=object, None -> NaN
+    return pd.DataFrame(missing_as_nan(values), columns=list(FEATURE_COLUMNS), dtype=object), prices
+
+
+def errors(predicted: np.ndarray, original: np.ndarray, prices: Optional[np.ndarray]) -> Dict[str, Optional[float]]:
+    """Deviation from the original model (and MAPE vs true prices) in %."""
+    deviation = np.abs(predicted - original) / np.maximum(np.abs(original), 1.0)
+    result: Dict[str, Optional[float]] = {"deviation_pct": float(100 * deviation.mean()), "mape_pct": None}
+    if prices is not None:
+        result["mape_pct"] = float(100 * (np.abs(predicted - prices) / np.maximum(np.abs(prices), 1.0)).mean())
+    return result
+
+
+def greedy_tree_order(tree_predictions: np.ndarray, target: np.ndarray) -> List[int]:
+    """Forward selection: each step adds the tree whose inclusion keeps the average closest to target."""
+    n_trees = tree_predictions.shape[0]
+    scale = np.maximum(np.abs(target), 1.0)
+    order: List[int] = []
+    remaining = list(range(n_trees))
+    running = np.zeros_like(target)
+
+    while remaining:
+        candidates = tree_predictions[remaining]
+        means = (running + candidates) / (len(order) + 1)
+        best = int(np.argmin((np.abs(means - target) / scale).mean(axis=1)))
+        tree = remaining.pop(best)
+        order.append(tree)
+        running = running + tree_predictions[tree]
+    return order
+
+
+def _prefix_errors(tree_predictions: np.ndarray, order: Sequence[int], original: np.ndarray,
+                   prices: Optional[np.ndarray]) -> List[Dict[str, Optional[float]]]:
+    """errors() of the average of the first k trees in `order`, for k = 1..n."""
+    sums = np.cumsum(tree_predictions[list(order)], axis=0)
+    return [errors(sums[k] / (k + 1), original, prices) for k in range(len(order))]
+
+
+def _within_budget(result: Dict[str, Optional[float]], baseline: Dict[str, Optional[float]],
+                   max_deviation: Optional[float], max_mape_increase: Optional[float]) -> bool:
+    if max_deviation is not None and result["deviation_pct"] > max_deviation:
+        return False
+    if max_mape_increase is not None and result["mape_pct"] is not None:
+        return result["mape_pct"] - baseline["mape_pct"] <= max_mape_increase
+    return True
+
+
+def compact_model(
+    model: Any,
+    X: pd.DataFrame,
+    prices: Optional[np.ndarray] = None,
+    max_deviation: Optional[float] = DEFAULT_MAX_DEVIATION,
+    max_mape_increase: Optional[float] = None,
+    depths: Sequence[Optional[int]] = DEFAULT_DEPTHS,
+    seed: int = 0,
+) -> Tuple[CompiledPipeline, Dict[str, Any]]:
+    """
+    Smallest float32 variant of a fitted tree pipeline within the error budget.
+
+    Returns the compact pipeline and a summary of the chosen candidate.
+    """
+    if max_mape_increase is not None and prices is None:
+        raise ValueError("--max-mape-increase needs true prices in the evaluation set.")
+
+    full = CompiledPipeline.from_model(model)
+    Xt = full.transform(X)
+    original = np.asarray(full.estimator.predict(Xt), dtype=np.float64)
+
+    # Choose on one half, confirm on the other
+    rng = np.random.default_rng(seed)
+    is_select = rng.random(len(Xt)) < 0.5
+    halves = {name: np.flatnonzero(mask) for name, mask in (("select", is_select), ("check", ~is_select))}
+
+    def subset(values: Optional[np.ndarray], half: str) -> Optional[np.ndarray]:
+        return None if values is None else values[halves[half]]
+
+    baselines = {half: errors(subset(original, half), subset(original, half), subset(prices, half))
+                 for half in halves}
+
+    # Per depth cap: trees ordered on the "select" half; the smallest prefix that
+    # meets the budget on BOTH halves is that cap's candidate
+    best: Optional[Tuple[int, Optional[int], List[int], Dict[str, Optional[float]]]] = None
+    for depth in depths:
+        capped = CompiledForest.from_estimator(full.estimator, max_depth=depth, dtype=np.float32)
+        per_tree_nodes = np.diff(np.append(capped.roots, capped.n_nodes))
+        tree_predictions = capped.tree_predictions(Xt)
+        order = greedy_tree_order(tree_predictions[:, halves["select"]], subset(original, "select"))
+        prefix = {
+            half: _prefix_errors(tree_predictions[:, halves[half]], order, subset(original, half), subset(prices, half))
+            for half in halves
+        }
+        for k in range(1, len(order) + 1):
+            if all(_within_budget(prefix[half][k - 1], baselines[half], max_deviation, max_mape_increase)
+                   for half in halves):
+                n_nodes = int(per_tree_nodes[order[:k]].sum())
+                if best is None or n_nodes < best[0]:
+                    best = (n_nodes, depth, order[:k], prefix["check"][k - 1])
+                break
+
+    if best is None:
+        # Nothing smaller fits: keep every tree (float32 still halves the arrays, splits are exact)
+        trees, depth = list(range(full.forest.n_trees)), None
+        forest = CompiledForest.from_estimator(full.estimator, dtype=np.float32)
+        check = errors(forest.predict(Xt[halves["check"]]), subset(original, "check"), subset(prices, "check"))
+    else:
+        _, depth, trees, check = best
+        forest = CompiledForest.from_estimator(full.estimator, max_depth=depth, trees=sorted(trees), dtype=np.float32)
+
+    compact = CompiledPipeline(full.preprocessor, forest)
+    summary = {
+        "max_depth_cap": depth,
+        "trees": sorted(int(tree) for tree in trees),
+        "budget": {"max_deviation_pct": max_deviation, "max_mape_increase_pct": max_mape_increase},
+        "check_half": check,
+    }
+    return compact, summary
+
+
+def _best_of(fn: Any, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def describe(model: Any, path: Path, X: pd.DataFrame, prices: Optional[np.ndarray],
+             original: np.ndarray) -> Dict[str, Any]:
+    """Size, load time, latency and error of one variant (as served: full pipeline)."""
+    forest = model.forest if isinstance(model, CompiledPipeline) else CompiledPipeline.from_model(model).forest
+    return {
+        "file": path.name,
+        "file_bytes": path.stat().st_size,
+        "load_seconds": round(_best_of(lambda: joblib.load(path), 3), 4),
+        "n_trees": forest.n_trees,
+        "n_nodes": forest.n_nodes,
+        "max_depth": forest.max_depth,
+        "forest_bytes": forest.nbytes if isinstance(model, CompiledPipeline) else None,
+        "latency_ms_1_row": round(1000 * _best_of(lambda: model.predict(X.iloc[:1]), 20), 3),
+        "latency_ms_100_rows": round(1000 * _best_of(lambda: model.predict(X.iloc[:100]), 5), 3),
+        **errors(np.asarray(model.predict(X), dtype=np.float64), original, prices),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build a compact variant of the model within an error budget.")
+    parser.add_argument("eval_csv", type=Path, help="Held-out evaluation set (CSV).")
+    parser.add_argument("--model", type=Path, default=None,
+                        help="Model artifact to compact (default: the active registry model).")
+    parser.add_argument("-o", "--output", type=Path, default=None,
+                        help="Output artifact (default: <model>-compact.joblib in the registry).")
+    parser.add_argument("--price-column", default="price", help="True price column (optional).")
+    parser.add_argument("--max-deviation", type=float, default=None,
+                        help="Max mean relative deviation from the original predictions, in %% "
+                             f"(default {DEFAULT_MAX_DEVIATION} unless --max-mape-increase is given).")
+    parser.add_argument("--max-mape-increase", type=float, default=None,
+                        help="Max MAPE increase vs true prices, in %% points.")
+    parser.add_argument("--depths", default="none,12,10,8,6",
+                        help="Depth caps to try, comma-separated ('none' = no cap).")
+    args = parser.parse_args(argv)
+
+    from api.predict import model_registry
+
+    source = args.model or model_registry().active_path()
+    output = args.output or config.MODEL_DIR / f"{source.stem}-compact.joblib"
+    depths = [None if depth.strip().lower() == "none" else int(depth) for depth in args.depths.split(",")]
+    max_deviation = args.max_deviation
+    if max_deviation is None and args.max_mape_increase is None:
+        max_deviation = DEFAULT_MAX_DEVIATION
+
+    model = _unwrap_model(joblib.load(source))
+    X, prices = load_eval_set(args.eval_csv, args.price_column)
+    compact, summary = compact_model(model, X, prices, max_deviation, args.max_mape_increase, depths)
+    joblib.dump(compact, output, compress=3)
+
+    original_predictions = np.asarray(model.predict(X), dtype=np.float64)
+    before = describe(model, source, X, prices, original_predictions)
+    after = describe(compact, output, X, prices, original_predictions)
+    report = {
+        "original": before,
+        "compact": after,
+        "selection": summary,
+        "delta": {
+            "file_bytes_ratio": round(after["file_bytes"] / before["file_bytes"], 3),
+            "load_seconds_ratio": round(after["load_seconds"] / before["load_seconds"], 3),
+            "latency_1_row_ratio": round(after["latency_ms_1_row"] / before["latency_ms_1_row"], 3),
+            "mape_pct_change": (
+                after["mape_pct"] - before["mape_pct"] if before["mape_pct"] is not None else None
+            ),
+        },
+    }
+    report_path = output.with_suffix(".report.json")
+    report_path.write_text(json.dumps(report, indent=2))
+    print(json.dumps(report, indent=2))
+    print(f"\nCompact model: {output}\nReport: {report_path}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+Runtime settings read from environment variables.
+
+Render and Docker configure the service through env vars (PORT, IMMO_API_URL),
+so every opt-in serving feature follows the same IMMO_* convention.
+"""
+import os
+from pathlib import Path
+
+
+def env_flag(name: str, default: bool = False) -> bool:
+    """Read a yes/no env var ('1', 'true', 'yes', 'on' count as yes)."""
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def env_int(name: str, default: int) -> int:
+    """Read an integer env var, falling back to the default when unset."""
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return int(value)
+
+
+def env_float(name: str, default: float) -> float:
+    """Read a float env var, falling back to the default when unset."""
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return float(value)
+
+
+# Model registry: directory of versioned .joblib artifacts; the CURRENT file in it
+# (written by hot swaps) names the active one, else IMMO_MODEL_NAME is served
+MODEL_DIR = Path(os.getenv("IMMO_MODEL_DIR", "").strip() or Path(__file__).parent / "models")
+MODEL_NAME = os.getenv("IMMO_MODEL_NAME", "immo_eliza_rf_small.joblib").strip()
+# Load + self-test the model on a background thread at start-up, so "/" answers at
+# once on a cold instance (requests that need the model wait for it); off = block start-up
+BACKGROUND_WARMUP = env_flag("IMMO_BACKGROUND_WARMUP", True)
+# Poll the CURRENT file every N seconds and hot-swap when it changes (0 = off)
+MODEL_WATCH_SECONDS = env_float("IMMO_MODEL_WATCH_SECONDS", 0.0)
+# Shared secret for /admin endpoints (unset = admin endpoints disabled)
+ADMIN_TOKEN = os.getenv("IMMO_ADMIN_TOKEN", "").strip()
+
+# Location checks against the bundled postcode index (api/postcodes.py):
+# fill = only fill the missing region (accepts every payload the API always
+# accepted), strict = also reject an unknown postcode or a province/region that
+# contradicts it, off = no checks. IMMO_POSTCODE_FILE replaces the CSV.
+POSTCODE_CHECK = os.getenv("IMMO_POSTCODE_CHECK", "fill").strip().lower()
+POSTCODE_FILE = os.getenv("IMMO_POSTCODE_FILE", "").strip()
+
+# Micro-batching of concurrent /predict calls (opt-in)
+BATCHING_ENABLED = env_flag("IMMO_BATCHING")
+BATCH_MAX_SIZE = env_int("IMMO_BATCH_MAX_SIZE", 32)
+BATCH_MAX_WAIT_MS = env_float("IMMO_BATCH_MAX_WAIT_MS", 3.0)
+
+# In-process prediction cache (IMMO_CACHE_SIZE=0 disables it)
+CACHE_MAX_SIZE = env_int("IMMO_CACHE_SIZE", 10_000)
+CACHE_TTL_SECONDS = env_float("IMMO_CACHE_TTL_SECONDS", 3600.0)
+
+# Pandas-light model input path (falls back to pd.DataFrame when off)
+FAST_PATH_ENABLED = env_flag("IMMO_FAST_PATH", True)
+
+# Inference engine: "auto" (default: per-call choice from a start-up calibration, see api/planner.py),
+# "sklearn", "compiled" (flat-array forest, see api/forest.py)
+# or "process" (compiled forest walked in a pool of worker processes, see api/procpool.py)
+INFERENCE_ENGINE = os.getenv("IMMO_INFERENCE_ENGINE", "auto").strip().lower()
+# Above this many rows the compiled engine hands the batch back to scikit-learn
+COMPILED_MAX_ROWS = env_int("IMMO_COMPILED_MAX_ROWS", 512)
+# Worker processes of the "process" engine, per server process (0 = one per CPU);
+# "auto" only considers a pool when this is 2 or more
+INFERENCE_PROCESSES = env_int("IMMO_INFERENCE_PROCESSES", 0)
+# Largest batch size timed by the "auto" calibration (bigger batches use its last step)
+PLANNER_MAX_ROWS = env_int("IMMO_PLANNER_MAX_ROWS", 4096)
+# Replace the fitted preprocessing by lookup tables (api/fused.py) in the non-sklearn
+# engines, when it reproduces the pipeline bit-for-bit at model load
+FUSED_PREPROCESS = env_flag("IMMO_FUSED_PREPROCESS", True)
+
+# Admission control: model calls running at once / waiting beyond that before
+# new requests are refused with IMMO_OVERLOAD_STATUS (503 or 429) + Retry-After
+INFERENCE_CONCURRENCY = env_int("IMMO_INFERENCE_CONCURRENCY", 2)
+INFERENCE_QUEUE = env_int("IMMO_INFERENCE_QUEUE", 32)
+OVERLOAD_STATUS = env_int("IMMO_OVERLOAD_STATUS", 503)
+# Queued work older than this is dropped (the Streamlit client gives up at 20 s; 0 = no deadline)
+REQUEST_TIMEOUT_S = env_float("IMMO_REQUEST_TIMEOUT", 20.0)
+
+# Rows validated + scored together by the streaming endpoint
+STREAM_CHUNK_SIZE = env_int("IMMO_STREAM_CHUNK_SIZE", 1000)
+# Longer stream lines are skipped and reported as a 400 line (a property is ~1 KB)
+STREAM_MAX_LINE_LENGTH = env_int("IMMO_STREAM_MAX_LINE_LENGTH", 65536)
+# Max rows of one Arrow / Parquet body on /predict/arrow (the body is held in memory)
+ARROW_MAX_ROWS = env_int("IMMO_ARROW_MAX_ROWS", 1_000_000)
+
+# Per-request stage timings in a Server-Timing response header
+SERVER_TIMING = env_flag("IMMO_SERVER_TIMING", True)
+# Opt-in JSON-lines trace file (one line per span), rotated by size
+TRACE_FILE = os.getenv("IMMO_TRACE_FILE", "").strip()
+TRACE_MAX_BYTES = env_int("IMMO_TRACE_MAX_BYTES", 10 * 1024 * 1024)
+TRACE_BACKUPS = env_int("IMMO_TRACE_BACKUPS", 3)
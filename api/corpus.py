@@ -0,0 +1,50 @@
+"""
+Synthetic but realistic properties, for the start-up self-test, benchmarks and tests.
+
+- Every optional field is missing in about a quarter of the rows, so
+  categorical columns mix strings and None the way real batches do.
+- Seeded: the same (n, seed) always gives the same properties.
+"""
+import random
+from typing import List
+
+from api.schemas import PropertyFeatures
+
+
+def random_corpus(n: int, seed: int = 0) -> List[PropertyFeatures]:
+    """Realistic properties with a mix of filled and missing optional fields."""
+    rng = random.Random(seed)
+
+    def maybe(value):
+        return None if rng.random() < 0.25 else value
+
+    corpus = []
+    for _ in range(n):
+        corpus.append(PropertyFeatures(
+            property_type=rng.choice(["house", "apartment"]),
+            location={"province": "Antwerpen", "postcode": 2000, "locality": "Antwerpen"},
+            livable_surface=rng.randint(30, 400),
+            number_of_bedrooms=maybe(rng.randint(0, 5)),
+            total_land_surface=maybe(rng.randint(50, 2000)),
+            surface_garden=maybe(rng.randint(0, 500)),
+            surface_terrace=maybe(rng.randint(0, 60)),
+            number_of_facades=maybe(rng.randint(1, 4)),
+            number_of_bathrooms=maybe(rng.randint(0, 3)),
+            number_of_showers=maybe(rng.randint(0, 2)),
+            number_of_toilets=maybe(rng.randint(0, 3)),
+            garage=maybe(rng.random() < 0.5),
+            number_of_garages=maybe(rng.randint(0, 2)),
+            furnished=maybe(rng.random() < 0.2),
+            attic=maybe(rng.random() < 0.5),
+            garden=maybe(rng.random() < 0.5),
+            terrace=maybe(rng.random() < 0.5),
+            swimming_pool=maybe(rng.random() < 0.1),
+            kitchen_equipment=maybe(rng.choice(["not installed", "installed", "hyper equipped"])),
+            kitchen_type=maybe(rng.choice(["not installed", "semi-equipped", "installed"])),
+            type_of_heating=maybe(rng.choice(["gas", "electric", "heat pump"])),
+            type_of_glazing=maybe(rng.choice(["single", "double", "triple"])),
+            elevator=maybe(rng.random() < 0.3),
+            availability=maybe(rng.choice(["immediately", "to be agreed"])),
+            state_of_property=maybe(rng.choice(["to renovate", "good", "as new"])),
+        ))
+    return corpus
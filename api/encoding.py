@@ -0,0 +1,105 @@
+"""
+Single-pass JSON encoding for prediction responses.
+
+- orjson when installed (optional: pip install orjson), else the standard
+  library with the same compact output; `ENCODER` says which one is used.
+- Prediction rows are written straight from the ScoredItems arrays: every
+  number column is formatted in one call and spliced into fixed row
+  templates, so a 10k-row batch never becomes 10k dicts.
+- FastJSONResponse renders with dumps(). Endpoints return it (or the bytes
+  from batch_body) directly, so FastAPI does not validate our own output
+  against response_model again; the models stay for the OpenAPI docs.
+"""
+import json
+import math
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+from fastapi.responses import JSONResponse, Response
+
+from api.predict import ScoredItems
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+ENCODER = "orjson" if orjson is not None else "json"
+JSON_MEDIA_TYPE = "application/json"
+
+
+def dumps(content: Any) -> bytes:
+    """Compact UTF-8 JSON; NaN / infinity become null (as orjson does)."""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+    try:
+        text = json.dumps(content, ensure_ascii=False, separators=(",", ":"), allow_nan=False)
+    except ValueError:
+        # Rare: NaN / infinity somewhere, which the standard library cannot write as JSON
+        text = json.dumps(_finite(content), ensure_ascii=False, separators=(",", ":"))
+    return text.encode("utf-8")
+
+
+def _finite(content: Any) -> Any:
+    if isinstance(content, float) and not math.isfinite(content):
+        return None
+    if isinstance(content, dict):
+        return {key: _finite(value) for key, value in content.items()}
+    if isinstance(content, (list, tuple)):
+        return [_finite(value) for value in content]
+    return content
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered by dumps() (orjson when available)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def _numbers(values: np.ndarray) -> List[bytes]:
+    """Each value as a JSON number (shortest round-trip form; null when not finite)."""
+    if len(values) == 0:
+        return []
+    if orjson is not None:
+        return orjson.dumps(values, option=orjson.OPT_SERIALIZE_NUMPY)[1:-1].split(b",")
+    finite = np.isfinite(values).tolist()
+    return [repr(value).encode("ascii") if ok else b"null" for value, ok in zip(values.tolist(), finite)]
+
+
+def prediction_rows(scored: ScoredItems, indices: Sequence[int]) -> List[bytes]:
+    """
+    One JSON object per item, same fields as BatchPredictionItem.
+
+    indices: the "index" reported for each item (e.g. offset in a stream).
+    """
+    prices = _numbers(scored.prices)
+    per_m2 = _numbers(scored.price_per_m2)
+    numbers = _numbers(np.asarray(indices, dtype=np.int64))
+    tail = b',"status_code":200,"errors":null,"model_version":' + dumps(scored.model_version) + b"}"
+
+    rows = [
+        b"".join((b'{"index":', index, b',"prediction":', price, b',"price_per_m2":', ratio, tail))
+        for index, price, ratio in zip(numbers, prices, per_m2)
+    ]
+    for position in scored.errors:
+        # Rare: the full object, through the generic encoder
+        rows[position] = dumps({**scored.item(position), "index": int(indices[position])})
+    return rows
+
+
+def batch_body(scored: ScoredItems) -> bytes:
+    """The whole BatchPredictionResponse as JSON bytes."""
+    summary: Dict[str, Any] = {
+        "n_success": scored.n_success,
+        "n_failed": len(scored.errors),
+        "status_code": 200,
+        "model_version": scored.model_version,
+    }
+    rows = prediction_rows(scored, range(len(scored.prices)))
+    return b'{"predictions":[' + b",".join(rows) + b"]," + dumps(summary)[1:]
+
+
+def json_response(body: bytes, status_code: int = 200) -> Response:
+    """Response around JSON bytes that are already encoded."""
+    return Response(content=body, status_code=status_code, media_type=JSON_MEDIA_TYPE)
@@ -0,0 +1,165 @@
+import threading
+from operator import attrgetter
+from typing import TYPE_CHECKING, Any, Dict, List, Sequence
+
+import numpy as np
+
+if TYPE_CHECKING:
+    # Imported where used: "/" must answer before pandas is loaded (cold start)
+    import pandas as pd
+
+from api.postcodes import postcode_index
+from api.schemas import PropertyFeatures
+
+# Model column name (as in training, with capital letters and spaces)
+# -> PropertyFeatures attribute. These are the 23 columns the model expects.
+FEATURE_COLUMNS: Dict[str, str] = {
+    # Size & physical attributes
+    "Number of bedrooms": "number_of_bedrooms",
+    "Livable surface": "livable_surface",
+    "Total land surface": "total_land_surface",
+    "Surface garden": "surface_garden",
+    "Surface terrace": "surface_terrace",
+    "Number of facades": "number_of_facades",
+    "Number of bathrooms": "number_of_bathrooms",
+    "Number of showers": "number_of_showers",
+    "Number of toilets": "number_of_toilets",
+    "Garage": "garage",
+    "Number of garages": "number_of_garages",
+
+    # Condition & comfort indicators
+    "Furnished": "furnished",
+    "Attic": "attic",
+    "Garden": "garden",
+    "Terrace": "terrace",
+    "Swimming pool": "swimming_pool",
+    "Kitchen equipment": "kitchen_equipment",
+    "Kitchen type": "kitchen_type",
+    "Type of heating": "type_of_heating",
+    "Type of glazing": "type_of_glazing",
+    "Elevator": "elevator",
+    "Availability": "availability",
+    "State of the property": "state_of_property",
+}
+
+# Location columns a (retrained) model may use -> PostcodeIndex.columns() key.
+# Filled from the postcode index, never from free text the client typed.
+LOCATION_COLUMNS: Dict[str, str] = {
+    "Postcode": "postcode",
+    "Province": "province",
+    "Region": "region",
+    "Locality": "locality",
+    "Latitude": "latitude",
+    "Longitude": "longitude",
+}
+
+
+def missing_as_nan(values: np.ndarray) -> np.ndarray:
+    """
+    None -> NaN, in place, in an object array of model columns.
+
+    WHY: pandas 3 stores a column as str (None -> NaN, imputed) only when it
+    holds a string somewhere, so a lone None stayed a category of its own and a
+    row's price depended on the other rows of its batch. NaN is missing for
+    SimpleImputer in every column, whatever the neighbours.
+    """
+    values[values == None] = np.nan  # noqa: E711 (element-wise on object arrays)
+    return values
+
+
+class RowLayout:
+    """
+    Column order of the loaded model, computed once at model load.
+
+    - Reads PropertyFeatures attributes straight into an object array in
+      model column order (no intermediate dict per row).
+    - Single rows reuse a preallocated per-thread buffer wrapped ONCE in a
+      DataFrame, so a request does not construct a new DataFrame at all.
+    - Batches build one 2D array and wrap it without copying.
+
+    - Location columns (LOCATION_COLUMNS) are looked up for the whole batch
+      at once in the postcode index.
+    - Missing values are NaN in object columns (missing_as_nan), so every row
+      is preprocessed the same way whatever else is in its batch.
+
+    WHY: pd.DataFrame([feature_dict]) infers dtypes from a list of dicts on
+    every request, which costs more than filling a buffer in place.
+    """
+
+    def __init__(self, columns: Sequence[str]) -> None:
+        unknown = [column for column in columns if column not in FEATURE_COLUMNS and column not in LOCATION_COLUMNS]
+        if unknown:
+            raise ValueError(f"No PropertyFeatures attribute for model columns: {unknown}")
+        import pandas as pd
+
+        self.columns = pd.Index(list(columns))
+        self._getters = [
+            (j, attrgetter(FEATURE_COLUMNS[column])) for j, column in enumerate(columns) if column in FEATURE_COLUMNS
+        ]
+        self._location = [
+            (j, LOCATION_COLUMNS[column]) for j, column in enumerate(columns) if column in LOCATION_COLUMNS
+        ]
+        self._local = threading.local()
+
+    @property
+    def uses_location(self) -> bool:
+        """True when the model reads postcode-derived columns (they must be in the cache key)."""
+        return bool(self._location)
+
+    @classmethod
+    def for_model(cls, model: Any) -> "RowLayout":
+        """Use the model's own column order when it recorded one while fitting."""
+        columns = getattr(model, "feature_names_in_", None)
+        if columns is None:
+            return cls(list(FEATURE_COLUMNS))
+        return cls([str(column) for column in columns])
+
+    def values(self, features_list: List[PropertyFeatures]) -> np.ndarray:
+        """Object array of the model columns (what frame() wraps), e.g. for fused preprocessing."""
+        if len(features_list) == 1:
+            return self._single_row_values(features_list[0])
+        values = np.empty((len(features_list), len(self.columns)), dtype=object)
+        for j, get in self._getters:
+            values[:, j] = [get(features) for features in features_list]
+        self._fill_location(values, features_list)
+        return missing_as_nan(values)
+
+    def frame(self, features_list: List[PropertyFeatures]) -> "pd.DataFrame":
+        """Model input DataFrame for the given properties."""
+        if len(features_list) == 1:
+            return self._single_row_frame(features_list[0])
+        import pandas as pd
+
+        # dtype=object like the single-row frame: no per-batch dtype inference
+        return pd.DataFrame(self.values(features_list), columns=self.columns, dtype=object, copy=False)
+
+    def _fill_location(self, values: np.ndarray, features_list: List[PropertyFeatures]) -> None:
+        if not self._location:
+            return
+        postcodes = [features.location.postcode for features in features_list]
+        enriched = postcode_index().columns(postcodes)
+        for j, key in self._location:
+            values[:, j] = enriched[key]
+
+    def _single_row_values(self, features: PropertyFeatures) -> np.ndarray:
+        local = self._local
+        if not hasattr(local, "buffer"):
+            # One buffer per thread: the threadpool serves requests concurrently
+            local.buffer = np.empty((1, len(self.columns)), dtype=object)
+
+        row = local.buffer[0]
+        for j, get in self._getters:
+            row[j] = get(features)
+        self._fill_location(local.buffer, [features])
+        return missing_as_nan(local.buffer)
+
+    def _single_row_frame(self, features: PropertyFeatures) -> "pd.DataFrame":
+        local = self._local
+        if not hasattr(local, "frame"):
+            import pandas as pd
+
+            # Wrapped while still empty: filled values would make pandas infer dtypes and copy
+            local.buffer = np.empty((1, len(self.columns)), dtype=object)
+            local.frame = pd.DataFrame(local.buffer, columns=self.columns, copy=False)
+        self._single_row_values(features)
+        return local.frame
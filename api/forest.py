@@ -0,0 +1,268 @@
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Max (trees x rows) nodes walked per NumPy step; bounds memory on big batches
+_MAX_CELLS_PER_CHUNK = 1_000_000
+
+
+def _tree_estimators(estimator: Any) -> Tuple[List[Any], float]:
+    """Fitted sklearn trees of a supported estimator + the averaging factor."""
+    name = type(estimator).__name__
+
+    if name in ("RandomForestRegressor", "ExtraTreesRegressor"):
+        trees = [tree.tree_ for tree in estimator.estimators_]
+        return trees, 1.0 / len(trees)
+
+    if name in ("DecisionTreeRegressor", "ExtraTreeRegressor"):
+        return [estimator.tree_], 1.0
+
+    raise TypeError(f"Cannot compile estimator of type {name}; only tree regressors are supported.")
+
+
+class CompiledForest:
+    """
+    A fitted tree ensemble flattened into contiguous node arrays.
+
+    - All trees share one set of arrays (feature, threshold, left, right, value);
+      leaves point to themselves, so every row can take the same number of steps.
+    - predict() walks all trees for all rows at once with NumPy indexing
+      instead of dispatching estimator by estimator.
+    - Decisions follow scikit-learn exactly: X is compared as float32 and
+      missing values follow each node's missing_go_to_left flag.
+    """
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        value: np.ndarray,
+        missing_left: np.ndarray,
+        roots: np.ndarray,
+        max_depth: int,
+        n_features: int,
+    ) -> None:
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.missing_left = missing_left
+        self.roots = roots
+        self.max_depth = max_depth
+        self.n_features = n_features
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the node arrays."""
+        arrays = (self.feature, self.threshold, self.left, self.right, self.value, self.missing_left, self.roots)
+        return sum(array.nbytes for array in arrays)
+
+    @classmethod
+    def from_estimator(
+        cls,
+        estimator: Any,
+        max_depth: Optional[int] = None,
+        trees: Optional[Sequence[int]] = None,
+        dtype: Any = np.float64,
+    ) -> "CompiledForest":
+        """
+        Compile a fitted RandomForest / ExtraTrees / DecisionTree regressor.
+
+        Compaction options (see api/compact.py):
+        - max_depth: nodes at this depth become leaves predicting their mean.
+        - trees: indices of the trees to keep (the average is over those only).
+        - dtype=np.float32: float32 values + thresholds and int32 node indices.
+          Thresholds are rounded DOWN to float32; as X is compared in float32,
+          `x <= threshold` decides exactly as before.
+        """
+        all_trees, _ = _tree_estimators(estimator)
+        selected = [all_trees[i] for i in trees] if trees is not None else all_trees
+        if not selected:
+            raise ValueError("At least one tree must be kept.")
+        if any(tree.n_outputs != 1 for tree in selected):
+            raise TypeError("Only single-output regressors can be compiled.")
+
+        compact = np.dtype(dtype) == np.float32
+        index_dtype = np.int32 if compact else np.int64
+
+        features, thresholds, lefts, rights, values, missing, roots = [], [], [], [], [], [], []
+        depths = []
+        offset = 0
+        for tree in selected:
+            children_left = tree.children_left
+            children_right = tree.children_right
+            feature = tree.feature
+            threshold = tree.threshold
+            value = tree.value[:, 0, 0]
+            # Older scikit-learn versions have no missing-value support in trees
+            go_left = getattr(tree, "missing_go_to_left", None)
+            go_left = np.zeros(tree.node_count, dtype=bool) if go_left is None else np.asarray(go_left, dtype=bool)
+            is_leaf = children_left == -1
+            depth = tree.max_depth
+
+            if max_depth is not None and tree.max_depth > max_depth:
+                keep, is_leaf = _depth_cap(children_left, children_right, max_depth)
+                # Kept nodes keep their order; parents always come before children
+                new_ids = np.cumsum(keep) - 1
+                children_left = np.where(is_leaf, -1, new_ids[np.maximum(children_left, 0)])[keep]
+                children_right = np.where(is_leaf, -1, new_ids[np.maximum(children_right, 0)])[keep]
+                feature, threshold, value = feature[keep], threshold[keep], value[keep]
+                go_left, is_leaf = go_left[keep], is_leaf[keep]
+                depth = max_depth
+
+            n = len(children_left)
+            node_ids = np.arange(offset, offset + n, dtype=np.int64)
+
+            # Leaves loop on themselves so extra traversal steps are no-ops
+            lefts.append(np.where(is_leaf, node_ids, children_left + offset))
+            rights.append(np.where(is_leaf, node_ids, children_right + offset))
+            features.append(np.where(is_leaf, 0, feature))
+            thresholds.append(_round_down(threshold) if compact else threshold.astype(np.float64))
+            values.append(value.astype(dtype))
+            missing.append(go_left)
+            depths.append(depth)
+
+            roots.append(offset)
+            offset += n
+
+        return cls(
+            feature=np.concatenate(features).astype(index_dtype),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts).astype(index_dtype),
+            right=np.concatenate(rights).astype(index_dtype),
+            value=np.concatenate(values),
+            missing_left=np.concatenate(missing),
+            roots=np.asarray(roots, dtype=index_dtype),
+            max_depth=max(depths),
+            n_features=int(estimator.n_features_in_),
+        )
+
+    def predict(self, X: Any) -> np.ndarray:
+        """Average prediction of all trees for every row of a numeric matrix."""
+        leaves = self.tree_predictions(X)
+        # Tree by tree, then divided, like scikit-learn's own average: bit-identical to
+        # it and independent of the other rows of the call. numpy sums along axis 0 in
+        # that order, except for a single row (pairwise sum), hence the cumsum there.
+        if leaves.shape[1] == 1:
+            return np.cumsum(leaves, axis=0, dtype=np.float64)[-1] / self.n_trees
+        return leaves.sum(axis=0, dtype=np.float64) / self.n_trees
+
+    def tree_predictions(self, X: Any) -> np.ndarray:
+        """Leaf value of every tree for every row, shape (n_trees, n_rows)."""
+        # scikit-learn casts inputs to float32 before walking its trees
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected a 2D array with {self.n_features} columns, got shape {X.shape}.")
+
+        chunk = max(1, _MAX_CELLS_PER_CHUNK // self.n_trees)
+        if X.shape[0] <= chunk:
+            return self._leaf_values(X)
+        return np.concatenate(
+            [self._leaf_values(X[start:start + chunk]) for start in range(0, X.shape[0], chunk)],
+            axis=1,
+        )
+
+    def _leaf_values(self, X: np.ndarray) -> np.ndarray:
+        n_rows = X.shape[0]
+        # One cursor per (tree, row), flattened tree-major
+        node = np.repeat(self.roots, n_rows)
+        row = np.tile(np.arange(n_rows), self.n_trees)
+        has_missing = bool(np.isnan(X).any())
+
+        for _ in range(self.max_depth):
+            x = X[row, self.feature[node]]
+            go_left = x <= self.threshold[node]
+            if has_missing:
+                go_left = np.where(np.isnan(x), self.missing_left[node], go_left)
+            node = np.where(go_left, self.left[node], self.right[node])
+
+        # Summed per row by the caller
+        return self.value[node].reshape(self.n_trees, n_rows)
+
+
+def _depth_cap(children_left: np.ndarray, children_right: np.ndarray, max_depth: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(nodes to keep, nodes that are leaves after capping the tree at max_depth)."""
+    depth = np.zeros(len(children_left), dtype=np.int64)
+    frontier = np.array([0])
+    while frontier.size:
+        parents = frontier[children_left[frontier] != -1]
+        children = np.concatenate([children_left[parents], children_right[parents]])
+        depth[children] = np.concatenate([depth[parents], depth[parents]]) + 1
+        frontier = children
+    keep = depth <= max_depth
+    is_leaf = (children_left == -1) | (depth == max_depth)
+    return keep, is_leaf
+
+
+def _round_down(threshold: np.ndarray) -> np.ndarray:
+    """Largest float32 <= each float64 threshold (exact for float32 inputs)."""
+    rounded = threshold.astype(np.float32)
+    too_big = rounded.astype(np.float64) > threshold
+    rounded[too_big] = np.nextafter(rounded[too_big], np.float32(-np.inf))
+    return rounded
+
+
+class CompiledPipeline:
+    """
+    Drop-in replacement for the loaded pipeline with a compiled final forest.
+
+    - The fitted preprocessing steps still run through scikit-learn.
+    - The final tree ensemble is evaluated by a CompiledForest for up to
+      max_rows rows; larger batches go back to the original estimator,
+      whose Cython tree walk wins once per-call dispatch no longer dominates.
+    """
+
+    def __init__(
+        self,
+        preprocessor: Optional[Any],
+        forest: CompiledForest,
+        estimator: Optional[Any] = None,
+        max_rows: Optional[int] = None,
+    ) -> None:
+        self.preprocessor = preprocessor
+        self.forest = forest
+        self.estimator = estimator
+        self.max_rows = max_rows
+
+    @classmethod
+    def from_model(cls, model: Any, max_rows: Optional[int] = None) -> "CompiledPipeline":
+        """Split a fitted Pipeline (or bare forest) into preprocessing + compiled forest."""
+        steps = getattr(model, "steps", None)
+        if steps:
+            preprocessor = model[:-1] if len(steps) > 1 else None
+            estimator = steps[-1][1]
+        else:
+            preprocessor, estimator = None, model
+
+        return cls(preprocessor, CompiledForest.from_estimator(estimator), estimator, max_rows)
+
+    @property
+    def feature_names_in_(self) -> Optional[np.ndarray]:
+        """Input columns of the fitted preprocessing (used for the fast input path)."""
+        return getattr(self.preprocessor, "feature_names_in_", None)
+
+    def transform(self, X: Any) -> np.ndarray:
+        """Numeric feature matrix the forest was trained on."""
+        if self.preprocessor is not None:
+            X = self.preprocessor.transform(X)
+        if hasattr(X, "toarray"):
+            # Sparse one-hot output
+            X = X.toarray()
+        return np.asarray(X, dtype=np.float64)
+
+    def predict(self, X: Any) -> np.ndarray:
+        Xt = self.transform(X)
+        if self.estimator is not None and self.max_rows is not None and Xt.shape[0] > self.max_rows:
+            return np.asarray(self.estimator.predict(Xt))
+        return self.forest.predict(Xt)
@@ -0,0 +1,239 @@
+"""
+Fused preprocessing: the fitted ColumnTransformer of the pipeline as plain lookup tables.
+
+- Numeric SimpleImputer columns become ONE float64 block with the fitted
+  fill values baked in (np.where over the block, no per-call validation).
+- Each categorical column (optionally SimpleImputer -> OneHotEncoder) becomes
+  a dict category -> one-hot column; a row sets one cell instead of going
+  through pandas / check_array / _encode.
+- Input: a DataFrame, a dict of columns (columnar batches) or an object array
+  in the fitted column order (RowLayout.values), so single requests skip the
+  DataFrame entirely. None and NaN are both missing, value by value (the
+  serving path stores None as NaN, see api.features.missing_as_nan).
+- Only the step types above are fused (anything else raises TypeError), and
+  verify() checks the result is bit-for-bit the pipeline's on a corpus built
+  from the fitted categories and fill values; the caller keeps scikit-learn
+  otherwise.
+"""
+import math
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+_NO_FILL = object()  # categorical column without an imputer in front
+_UNKNOWN = -1
+
+
+class _NumericBlock(NamedTuple):
+    inputs: List[int]
+    fill: np.ndarray
+    start: int
+
+
+class _OneHotColumn(NamedTuple):
+    input: int
+    table: Dict[Any, int]
+    nan_code: int  # code of a NaN category (or _UNKNOWN)
+    fill: Any  # imputed value for NaN inputs (or _NO_FILL)
+    start: int
+    unknown_error: bool
+    categories: List[Any]
+
+
+def _is_nan(value: Any) -> bool:
+    return isinstance(value, float) and math.isnan(value)
+
+
+def _imputer_fill(imputer: Any, n_columns: int) -> np.ndarray:
+    """Fitted fill values of a SimpleImputer we can reproduce exactly."""
+    missing = imputer.missing_values
+    if not _is_nan(missing):
+        raise TypeError(f"Only SimpleImputer(missing_values=nan) can be fused, got {missing!r}.")
+    if imputer.add_indicator:
+        raise TypeError("SimpleImputer(add_indicator=True) cannot be fused.")
+    fill = np.asarray(imputer.statistics_)
+    if len(fill) != n_columns:
+        # Empty training columns were dropped by the imputer
+        raise TypeError("SimpleImputer dropped empty columns; cannot fuse.")
+    return fill
+
+
+def _one_hot_columns(encoder: Any, inputs: List[int], fill: Optional[np.ndarray], start: int) -> List[_OneHotColumn]:
+    if getattr(encoder, "drop_idx_", None) is not None or getattr(encoder, "_infrequent_enabled", False):
+        raise TypeError("OneHotEncoder with drop / infrequent categories cannot be fused.")
+    columns = []
+    for i, (column, categories) in enumerate(zip(inputs, encoder.categories_)):
+        categories = list(categories)
+        table = {category: code for code, category in enumerate(categories) if not _is_nan(category)}
+        nan_code = next((code for code, category in enumerate(categories) if _is_nan(category)), _UNKNOWN)
+        columns.append(_OneHotColumn(
+            input=column,
+            table=table,
+            nan_code=nan_code,
+            fill=_NO_FILL if fill is None else fill[i],
+            start=start,
+            unknown_error=encoder.handle_unknown == "error",
+            categories=categories,
+        ))
+        start += len(categories)
+    return columns
+
+
+class FusedTransform:
+    """Drop-in for the fitted preprocessing of a pipeline (see module docstring)."""
+
+    def __init__(self, feature_names_in_: np.ndarray, numeric: List[_NumericBlock],
+                 categorical: List[_OneHotColumn], n_outputs: int) -> None:
+        self.feature_names_in_ = feature_names_in_
+        self.numeric = numeric
+        self.categorical = categorical
+        self.n_outputs = n_outputs
+
+    @classmethod
+    def from_preprocessor(cls, preprocessor: Any) -> "FusedTransform":
+        """Fuse a fitted ColumnTransformer (bare or as the only step of a Pipeline)."""
+        steps = getattr(preprocessor, "steps", None)
+        if steps is not None:
+            if len(steps) != 1:
+                raise TypeError("Only a single ColumnTransformer step can be fused.")
+            preprocessor = steps[0][1]
+        if type(preprocessor).__name__ != "ColumnTransformer":
+            raise TypeError(f"Cannot fuse {type(preprocessor).__name__}; expected a ColumnTransformer.")
+        names = getattr(preprocessor, "feature_names_in_", None)
+        if names is None:
+            raise TypeError("ColumnTransformer was not fitted on named columns.")
+        positions = {str(name): j for j, name in enumerate(names)}
+
+        numeric, categorical, start = [], [], 0
+        for name, transformer, selection in preprocessor.transformers_:
+            if isinstance(transformer, str):
+                if transformer == "drop":
+                    continue
+                raise TypeError(f"Cannot fuse transformer {name!r} ({transformer!r}).")
+            inputs = [positions[column] if isinstance(column, str) else int(column) for column in selection]
+            if not inputs:
+                continue
+            parts = [step for _, step in transformer.steps] if hasattr(transformer, "steps") else [transformer]
+            kinds = [type(part).__name__ for part in parts]
+
+            if kinds == ["SimpleImputer"]:
+                numeric.append(_NumericBlock(inputs, np.asarray(_imputer_fill(parts[0], len(inputs)), dtype=np.float64),
+                                             start))
+                start += len(inputs)
+            elif kinds in (["OneHotEncoder"], ["SimpleImputer", "OneHotEncoder"]):
+                fill = _imputer_fill(parts[0], len(inputs)) if len(parts) == 2 else None
+                columns = _one_hot_columns(parts[-1], inputs, fill, start)
+                categorical.extend(columns)
+                start = columns[-1].start + len(columns[-1].categories)
+            else:
+                raise TypeError(f"Cannot fuse transformer {name!r} ({' -> '.join(kinds)}).")
+
+        return cls(np.asarray(names, dtype=object), numeric, categorical, start)
+
+    def _columns(self, X: Any) -> Tuple[Any, int, Any]:
+        """(input as array or dict, n_rows, get(j) -> column j as a 1D array)."""
+        names = self.feature_names_in_
+        if isinstance(X, dict):
+            return X, len(X[names[0]]), lambda j: np.asarray(X[names[j]])
+        if not isinstance(X, np.ndarray):
+            # DataFrame: ONE conversion, column-by-column access costs more than the transform
+            X = (X if list(X.columns) == list(names) else X[list(names)]).to_numpy()
+        if X.ndim != 2 or X.shape[1] != len(names):
+            raise ValueError(f"Expected {len(names)} columns, got shape {X.shape}.")
+        return X, X.shape[0], lambda j: X[:, j]
+
+    def transform(self, X: Any) -> np.ndarray:
+        X, n_rows, column = self._columns(X)
+        out = np.zeros((n_rows, self.n_outputs), dtype=np.float64)
+        if n_rows == 0:
+            return out
+
+        for block in self.numeric:
+            if isinstance(X, np.ndarray):
+                values = np.asarray(X[:, block.inputs], dtype=np.float64)
+            else:
+                values = np.column_stack([np.asarray(column(j), dtype=np.float64) for j in block.inputs])
+            out[:, block.start:block.start + len(block.inputs)] = np.where(np.isnan(values), block.fill, values)
+
+        rows = np.arange(n_rows)
+        for encoded in self.categorical:
+            values = column(encoded.input)
+            codes = np.fromiter(_codes(values, encoded), dtype=np.int64, count=n_rows)
+            known = codes != _UNKNOWN
+            if encoded.unknown_error and not known.all():
+                unknown = sorted({str(value) for value in np.asarray(values, dtype=object)[~known]})
+                raise ValueError(f"Found unknown categories {unknown} in column "
+                                 f"{self.feature_names_in_[encoded.input]!r} during transform")
+            out[rows[known], encoded.start + codes[known]] = 1.0
+        return out
+
+
+def _codes(values: Sequence[Any], encoded: _OneHotColumn) -> Any:
+    table, fill, nan_code = encoded.table, encoded.fill, encoded.nan_code
+    for value in values:
+        if value is None or value != value:  # missing: imputed, or the NaN category
+            if fill is _NO_FILL or _is_nan(fill):
+                yield nan_code
+                continue
+            value = fill
+        yield table.get(value, _UNKNOWN)
+
+
+def verification_columns(fused: FusedTransform, n_rows: int = 64, seed: int = 0) -> Dict[str, np.ndarray]:
+    """Raw columns covering every category, missing and unseen values (where the encoder accepts them)."""
+    rng = np.random.default_rng(seed)
+    candidates: Dict[str, List[Any]] = {}
+    for block in fused.numeric:
+        for j, fill in zip(block.inputs, block.fill):
+            candidates[str(fused.feature_names_in_[j])] = [None, float("nan"), 0.0, 1.0, fill, fill * 1.5 + 1,
+                                                           -1.0, 1e6, True, 3]
+    for encoded in fused.categorical:
+        if encoded.unknown_error:
+            # Values the encoder would reject are not part of the contract
+            values = ([] if encoded.fill is _NO_FILL else [float("nan")]) + list(encoded.categories)
+        else:
+            values = [None, float("nan"), *encoded.categories, "__unseen__"]
+        candidates[str(fused.feature_names_in_[encoded.input])] = values
+
+    columns = {}
+    for name in map(str, fused.feature_names_in_):
+        values = candidates.get(name, [None])
+        picks = rng.integers(0, len(values), size=n_rows)
+        picks[:len(values)] = np.arange(min(len(values), n_rows))
+        columns[name] = np.array([values[i] for i in picks], dtype=object)
+    return columns
+
+
+def verify(fused: FusedTransform, preprocessor: Any, columns: Optional[Dict[str, np.ndarray]] = None,
+           single_rows: int = 4) -> bool:
+    """
+    True when fused and fitted preprocessing give bit-identical matrices.
+
+    - columns: raw model columns (default: verification_columns()); checked as a
+      DataFrame, a dict of columns, one object array and a few single rows.
+    - The reference is always the fitted preprocessing on a dtype=object
+      DataFrame of the input with None as NaN, like the serving path builds it.
+    """
+    import pandas as pd
+
+    from api.features import missing_as_nan
+
+    if columns is None:
+        columns = verification_columns(fused)
+    names = list(map(str, fused.feature_names_in_))
+    values = np.empty((len(columns[names[0]]), len(names)), dtype=object)
+    for j, name in enumerate(names):
+        values[:, j] = columns[name]
+
+    frame = pd.DataFrame(missing_as_nan(values.copy()), columns=names, dtype=object)
+    cases = [(pd.DataFrame(columns, columns=names), frame), (columns, frame), (values, frame)]
+    cases += [(values[i:i + 1], frame.iloc[i:i + 1]) for i in range(min(single_rows, len(values)))]
+    for given, reference in cases:
+        expected = preprocessor.transform(reference)
+        if hasattr(expected, "toarray"):
+            expected = expected.toarray()
+        expected = np.ascontiguousarray(expected, dtype=np.float64)
+        got = fused.transform(given)
+        if got.shape != expected.shape or got.tobytes() != expected.tobytes():
+            return False
+    return True
@@ -0,0 +1,50 @@
+"""
+Gunicorn settings for multi-worker serving.
+
+    gunicorn -c api/gunicorn_conf.py api.app:app
+
+WHY preload instead of memory-mapping: joblib can memory-map numpy arrays,
+but scikit-learn copies every tree's node arrays into its own buffers when
+unpickling, so each worker would still hold a private forest. Instead the
+master loads the model ONCE before forking; workers inherit it copy-on-write,
+so RSS grows with the interpreter overhead per worker, not with the model size.
+With a single worker there is nothing to share and the worker loads the model
+itself after binding the port (faster cold start, see IMMO_BACKGROUND_WARMUP).
+"""
+import gc
+import os
+
+from api.config import env_int
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+# WEB_CONCURRENCY is the usual knob on Render/Heroku-style platforms
+workers = env_int("WEB_CONCURRENCY", 1)
+worker_class = "uvicorn_worker.UvicornWorker"
+
+# Import api.app in the master so the model can be shared with every worker
+preload_app = True
+
+# Model warm-up can take a while on a cold instance
+timeout = env_int("IMMO_WORKER_TIMEOUT", 120)
+
+
+def on_starting(server) -> None:
+    if workers == 1:
+        # Nothing to share: the worker binds first and loads in the background
+        # (IMMO_BACKGROUND_WARMUP), so "/" answers sooner on a cold instance
+        return
+
+    from api.predict import preload
+
+    # Load + self-test without leaving worker processes behind (see preload)
+    preload()
+
+    # WHY: move everything loaded so far out of the GC's reach; otherwise the
+    # collector touches object headers in the workers and un-shares their pages
+    gc.freeze()
+    server.log.info("Model preloaded in master (pid %s) for copy-on-write sharing.", os.getpid())
+
+
+def post_fork(server, worker) -> None:
+    server.log.info("Worker %s forked with the shared model.", worker.pid)
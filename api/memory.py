@@ -0,0 +1,115 @@
+"""
+Per-process memory accounting (Linux /proc).
+
+RSS alone double-counts pages that forked workers share with the master,
+so we also report PSS (each shared page divided by the number of processes
+mapping it) and split resident memory into shared vs private.
+
+Usage (whole gunicorn tree, master pid from `ps` or the gunicorn log):
+
+    python -m api.memory <master_pid>
+"""
+import argparse
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Union
+
+# /proc/<pid>/smaps_rollup keys we report, converted to bytes
+_SMAPS_KEYS = {
+    "Rss": "rss",
+    "Pss": "pss",
+    "Shared_Clean": "shared_clean",
+    "Shared_Dirty": "shared_dirty",
+    "Private_Clean": "private_clean",
+    "Private_Dirty": "private_dirty",
+}
+
+
+def process_memory(pid: Union[int, str] = "self") -> Dict[str, Any]:
+    """
+    Memory of one process in bytes: rss, pss, shared, private (+ raw smaps fields).
+
+    Returns {"pid": ..., "available": False} where /proc is not available.
+    """
+    proc = Path("/proc") / str(pid)
+    real_pid = os.getpid() if pid == "self" else int(pid)
+    info: Dict[str, Any] = {"pid": real_pid, "available": False}
+
+    rollup = proc / "smaps_rollup"
+    try:
+        lines = rollup.read_text().splitlines()
+    except OSError:
+        lines = []
+
+    for line in lines:
+        parts = line.split()
+        if len(parts) >= 2 and parts[0].rstrip(":") in _SMAPS_KEYS:
+            info[_SMAPS_KEYS[parts[0].rstrip(":")]] = int(parts[1]) * 1024
+
+    if "rss" in info:
+        info["available"] = True
+        info["shared"] = info.get("shared_clean", 0) + info.get("shared_dirty", 0)
+        info["private"] = info.get("private_clean", 0) + info.get("private_dirty", 0)
+        return info
+
+    # Older kernels: only VmRSS is available, no shared/private split
+    try:
+        for line in (proc / "status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                info["rss"] = int(line.split()[1]) * 1024
+                info["available"] = True
+    except OSError:
+        pass
+
+    return info
+
+
+def child_pids(pid: int) -> List[int]:
+    """Direct children of a process (e.g. gunicorn workers of the master)."""
+    children: List[int] = []
+    task_dir = Path("/proc") / str(pid) / "task"
+    try:
+        for task in task_dir.iterdir():
+            text = (task / "children").read_text().split()
+            children.extend(int(child) for child in text)
+    except OSError:
+        pass
+    return sorted(set(children))
+
+
+def memory_report(master_pid: int) -> Dict[str, Any]:
+    """
+    Memory of a master process and its workers, plus totals.
+
+    - total_rss: what naive monitoring shows (shared pages counted per worker).
+    - total_pss: the real footprint of the process tree.
+    """
+    master = process_memory(master_pid)
+    workers = [process_memory(child) for child in child_pids(master_pid)]
+    everyone = [master] + workers
+
+    return {
+        "master": master,
+        "workers": workers,
+        "n_workers": len(workers),
+        "total_rss": sum(proc.get("rss", 0) for proc in everyone),
+        "total_pss": sum(proc.get("pss", 0) for proc in everyone),
+        "worker_private_mean": (
+            sum(proc.get("private", 0) for proc in workers) / len(workers) if workers else None
+        ),
+        "worker_shared_mean": (
+            sum(proc.get("shared", 0) for proc in workers) / len(workers) if workers else None
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report shared vs per-worker memory.")
+    parser.add_argument("master_pid", type=int, help="PID of the gunicorn master process.")
+    args = parser.parse_args()
+    print(json.dumps(memory_report(args.master_pid), indent=2))
+
+
+if __name__ == "__main__":
+    main()
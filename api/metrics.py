@@ -0,0 +1,237 @@
+"""
+Prometheus-style metrics without extra dependencies.
+
+- Counters, gauges and histograms live in process memory behind one lock each;
+  recording is a dict lookup + bisect, cheap enough for the hot path.
+- MetricsMiddleware counts requests, in-flight requests and latency per route.
+- timed(stage) measures the prediction stages (preprocess, predict, ...).
+- render() produces the text exposition format served at /metrics.
+
+With several gunicorn workers every worker keeps its own numbers; Prometheus
+scrapes whichever worker answers (label the target per instance if needed).
+"""
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from api import tracing
+
+# Latency buckets in seconds: 0.5 ms .. 10 s
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+# perf_counter() when the current request entered the middleware
+_REQUEST_START: "contextvars.ContextVar[Optional[float]]" = contextvars.ContextVar(
+    "immo_request_start", default=None
+)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(**labels: Any) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str) -> None:
+        self.name = name
+        self.help_text = help_text
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = _labels(**labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(_labels(**labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        lines.extend(f"{self.name}{_format_labels(key)} {value}" for key, value in items)
+        return lines
+
+
+class Gauge(Counter):
+    def set(self, value: float, **labels: Any) -> None:
+        with self._lock:
+            self._values[_labels(**labels)] = value
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Labels, List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _labels(**labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels: Any) -> int:
+        with self._lock:
+            series = self._series.get(_labels(**labels))
+            return series[2] if series else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, ([*s[0]], s[1], s[2])) for key, s in self._series.items())
+
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels(key, ('le', repr(bound)))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(key, ('le', '+Inf'))} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+
+# 1) Metric definitions
+
+REQUESTS = Counter("immo_http_requests_total", "HTTP requests by route, method and status code.")
+REQUEST_LATENCY = Histogram("immo_http_request_duration_seconds", "End-to-end request latency by route.")
+IN_FLIGHT = Gauge("immo_http_requests_in_flight", "Requests currently being handled.")
+EXCEPTIONS = Counter("immo_exceptions_total", "Exceptions turned into error responses, by type.")
+STAGE_LATENCY = Histogram(
+    "immo_stage_duration_seconds",
+    "Latency of prediction stages (deserialization, request_validation, preprocess, predict, batched_predict, serialization).",
+)
+PREDICTED_ROWS = Counter("immo_predicted_rows_total", "Rows sent through the model.")
+ADMISSION_REJECTED = Counter(
+    "immo_admission_rejected_total",
+    "Inference requests refused (overloaded) or dropped (deadline), by reason.",
+)
+
+_REGISTRY = (
+    REQUESTS, REQUEST_LATENCY, IN_FLIGHT, EXCEPTIONS, STAGE_LATENCY, PREDICTED_ROWS, ADMISSION_REJECTED,
+)
+
+
+# 2) Recording helpers
+
+def observe_stage(stage: str, seconds: float) -> None:
+    STAGE_LATENCY.observe(seconds, stage=stage)
+    # Same stages feed the Server-Timing header / trace file of the request
+    tracing.add_span(stage, seconds)
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """Measure a block of code as one prediction stage."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - start)
+
+
+def observe_request_validation() -> None:
+    """
+    Call first thing in an endpoint: time since the request arrived.
+
+    Covers body reading, JSON parsing and pydantic validation of the request
+    model (plus threadpool dispatch for sync endpoints).
+    """
+    start = _REQUEST_START.get()
+    if start is not None:
+        observe_stage("request_validation", time.perf_counter() - start)
+
+
+def record_exception(exc: BaseException) -> None:
+    EXCEPTIONS.inc(type=type(exc).__name__)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware (no BaseHTTPMiddleware overhead, safe for streaming)."""
+
+    def __init__(self, app: Callable) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        token = _REQUEST_START.set(start)
+        status_code = 500
+        IN_FLIGHT.inc(1)
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            IN_FLIGHT.inc(-1)
+            _REQUEST_START.reset(token)
+            # Route template (e.g. /predict) keeps label cardinality bounded
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            REQUESTS.inc(route=path, method=scope["method"], status=status_code)
+            REQUEST_LATENCY.observe(time.perf_counter() - start, route=path)
+
+
+# 3) Exposition
+
+def render(extra_gauges: Optional[Dict[str, Tuple[str, float, Dict[str, Any]]]] = None,
+           extra_counters: Optional[Dict[str, Tuple[str, float, Dict[str, Any]]]] = None) -> str:
+    """
+    Text exposition format of every metric.
+
+    extra_gauges: name -> (help, value, labels) read at scrape time
+    (model load time, queue length, ...).
+    extra_counters: same, for totals kept elsewhere that only ever grow
+    (cache hits, micro-batches, ...); names end in _total so rate() works.
+    """
+    lines: List[str] = []
+    for metric in _REGISTRY:
+        lines.extend(metric.render())
+
+    for kind, extra in (("gauge", extra_gauges), ("counter", extra_counters)):
+        for name, (help_text, value, labels) in sorted((extra or {}).items()):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name}{_format_labels(_labels(**labels))} {value}")
+
+    return "\n".join(lines) + "\n"
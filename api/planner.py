@@ -0,0 +1,180 @@
+"""
+Execution planner: the fastest way to run the forest for a batch of n rows, measured on this machine.
+
+- Strategies (whatever the loaded model and the machine allow):
+  compiled        flat-array tree walk (api/forest.py), in chunks of chunk_rows rows;
+  sklearn         scikit-learn's own tree walk, as fitted;
+  sklearn_threads the same, trees spread over all CPUs (joblib threads, >1 CPU only);
+  process         the process pool of api/procpool.py (IMMO_INFERENCE_PROCESSES >= 2 only).
+- At model load, every strategy is timed on a ladder of batch sizes (1, 4,
+  16, ..., 4096 = IMMO_PLANNER_MAX_ROWS). The rows are synthetic but
+  realistic for the forest: each feature takes values around the split
+  thresholds the trees actually use, so rows follow varied paths.
+- The plan keeps the fastest strategy per ladder size; a call with n rows uses
+  the step of the largest ladder size <= n.
+"""
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from api.forest import CompiledForest, CompiledPipeline
+from api.procpool import ProcessPoolPredictor
+
+_LADDER_FACTOR = 4
+_CHUNK_CANDIDATES = (256, 1024)
+# A timing is repeated up to this often, and not after this long (best run is kept)
+_REPEATS = 5
+_MAX_SECONDS = 0.05
+
+
+def calibration_rows(forest: CompiledForest, n_rows: int, seed: int = 0) -> np.ndarray:
+    """Synthetic feature matrix whose values sit just below / above the forest's split thresholds."""
+    rng = np.random.default_rng(seed)
+    internal = forest.left != np.arange(forest.n_nodes)
+    feature, threshold = forest.feature[internal], forest.threshold[internal]
+
+    X = np.zeros((n_rows, forest.n_features))
+    for column in range(forest.n_features):
+        splits = threshold[feature == column]
+        if splits.size == 0:
+            continue
+        picked = rng.choice(splits, size=n_rows)
+        offset = np.maximum(np.abs(picked) * 1e-3, 1e-3)
+        X[:, column] = picked + np.where(rng.random(n_rows) < 0.5, -offset, offset)
+    return X
+
+
+def ladder(max_rows: int) -> List[int]:
+    """Calibrated batch sizes: 1, 4, 16, ... up to max_rows."""
+    sizes = [1]
+    while sizes[-1] * _LADDER_FACTOR <= max_rows:
+        sizes.append(sizes[-1] * _LADDER_FACTOR)
+    return sizes
+
+
+def _best_seconds(run: Callable[[], Any]) -> float:
+    best, spent = float("inf"), 0.0
+    for _ in range(_REPEATS):
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        best, spent = min(best, elapsed), spent + elapsed
+        if spent > _MAX_SECONDS:
+            break  # big batches: noise is small next to their cost
+    return best
+
+
+class PlannedPredictor:
+    """
+    Drop-in predictor (like CompiledPipeline) that picks its strategy per call from a calibrated plan.
+
+    pool: optional ProcessPoolPredictor over the same forest (enables "process").
+    """
+
+    def __init__(self, compiled: CompiledPipeline, pool: Optional[ProcessPoolPredictor] = None) -> None:
+        self.compiled = compiled
+        self.pool = pool
+        self.cpus = os.cpu_count() or 1
+        self.plan: List[Dict[str, Any]] = [{"min_rows": 1, "strategy": "compiled", "chunk_rows": None}]
+        self.calibration: Dict[str, Any] = {}
+
+    @property
+    def preprocessor(self) -> Any:
+        return self.compiled.preprocessor
+
+    @property
+    def feature_names_in_(self) -> Optional[np.ndarray]:
+        return self.compiled.feature_names_in_
+
+    def transform(self, X: Any) -> np.ndarray:
+        return self.compiled.transform(X)
+
+    def strategies(self) -> List[str]:
+        """Strategies available for the loaded model on this machine."""
+        names = ["compiled"]
+        estimator = self.compiled.estimator
+        if estimator is not None:
+            names.append("sklearn")
+            if self.cpus > 1 and getattr(estimator, "n_jobs", 1) is None:
+                names.append("sklearn_threads")
+        if self.pool is not None:
+            names.append("process")
+        return names
+
+    def run(self, strategy: str, Xt: np.ndarray, chunk_rows: Optional[int] = None) -> np.ndarray:
+        """Prices for a numeric feature matrix with one given strategy."""
+        if strategy == "compiled":
+            forest = self.compiled.forest
+            if chunk_rows is None or Xt.shape[0] <= chunk_rows:
+                return forest.predict(Xt)
+            return np.concatenate([forest.predict(Xt[start:start + chunk_rows])
+                                   for start in range(0, Xt.shape[0], chunk_rows)])
+        if strategy == "sklearn":
+            return np.asarray(self.compiled.estimator.predict(Xt), dtype=np.float64)
+        if strategy == "sklearn_threads":
+            import joblib
+
+            with joblib.parallel_config(backend="threading", n_jobs=self.cpus):
+                return np.asarray(self.compiled.estimator.predict(Xt), dtype=np.float64)
+        if strategy == "process":
+            return self.pool.predict_matrix(Xt)
+        raise ValueError(f"Unknown execution strategy: {strategy!r}")
+
+    def calibrate(self, max_rows: int) -> Dict[str, Any]:
+        """Time every strategy on the ladder of batch sizes and rebuild the plan."""
+        start = time.perf_counter()
+        sizes = ladder(max_rows)
+        X = calibration_rows(self.compiled.forest, sizes[-1])
+        strategies = self.strategies()
+        for strategy in strategies:
+            self.run(strategy, X[:1])  # one-off costs (pool start-up, lazy imports) are not per call
+
+        timings: Dict[str, Dict[str, float]] = {}
+        plan = []
+        for size in sizes:
+            rows = X[:size]
+            measured = {}
+            for strategy in strategies:
+                chunks = [None] + [c for c in _CHUNK_CANDIDATES if c < size] if strategy == "compiled" else [None]
+                for chunk_rows in chunks:
+                    seconds = _best_seconds(lambda: self.run(strategy, rows, chunk_rows))
+                    measured[(strategy, chunk_rows)] = seconds
+            timings[str(size)] = {
+                (name if chunk is None else f"{name}/{chunk}"): round(seconds * 1000, 4)
+                for (name, chunk), seconds in measured.items()
+            }
+            (strategy, chunk_rows), _ = min(measured.items(), key=lambda item: item[1])
+            plan.append({"min_rows": size, "strategy": strategy, "chunk_rows": chunk_rows})
+
+        # Neighbouring ladder sizes with the same choice form one step
+        self.plan = [step for previous, step in zip([None] + plan, plan)
+                     if previous is None or (step["strategy"], step["chunk_rows"]) != (previous["strategy"], previous["chunk_rows"])]
+        self.calibration = {
+            "cpus": self.cpus,
+            "strategies": strategies,
+            "batch_sizes": sizes,
+            "timings_ms": timings,
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+        return self.calibration
+
+    def step_for(self, n_rows: int) -> Dict[str, Any]:
+        """Plan step used for a call with n_rows rows."""
+        chosen = self.plan[0]
+        for step in self.plan:
+            if step["min_rows"] > n_rows:
+                break
+            chosen = step
+        return chosen
+
+    def predict_matrix(self, Xt: np.ndarray) -> np.ndarray:
+        step = self.step_for(Xt.shape[0])
+        return self.run(step["strategy"], Xt, step["chunk_rows"])
+
+    def predict(self, X: Any) -> np.ndarray:
+        return self.predict_matrix(self.transform(X))
+
+    def stats(self) -> Dict[str, Any]:
+        return {"plan": self.plan, "calibration": self.calibration}
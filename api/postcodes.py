@@ -0,0 +1,273 @@
+"""
+Belgian postcode index: postcode -> locality, province, region, coordinates.
+
+- Province and region come from the official postcode ranges (1000-1299
+  Brussels, 2000-2999 Antwerpen, ...), so they are known for EVERY postcode.
+- Locality and coordinates come from a bundled CSV (postcode, locality,
+  latitude, longitude; IMMO_POSTCODE_FILE to use a fuller list). A postcode
+  missing from it borrows the coordinates of the closest lower postcode in
+  the same province (marked exact=False).
+- Everything is built ONCE into arrays indexed by the postcode itself, so a
+  lookup is one array read and a batch is one fancy-indexing call; no
+  geocoding service is ever called.
+- check_location() is what the Location schema runs: it fills a missing
+  region and, in strict mode, rejects a province or region that contradicts
+  the postcode. Names are accepted in Dutch, French, English or German.
+"""
+import csv
+import re
+import threading
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from api import config
+
+# Canonical names follow the rest of the API (Dutch, as in the training data)
+FLANDERS, WALLONIA, BRUSSELS = "Vlaanderen", "Wallonië", "Brussels"
+
+# (first postcode, last postcode, province, region)
+PROVINCE_RANGES: Tuple[Tuple[int, int, str, str], ...] = (
+    (1000, 1299, "Brussel", BRUSSELS),
+    (1300, 1499, "Waals-Brabant", WALLONIA),
+    (1500, 1999, "Vlaams-Brabant", FLANDERS),
+    (2000, 2999, "Antwerpen", FLANDERS),
+    (3000, 3499, "Vlaams-Brabant", FLANDERS),
+    (3500, 3999, "Limburg", FLANDERS),
+    (4000, 4999, "Luik", WALLONIA),
+    (5000, 5999, "Namen", WALLONIA),
+    (6000, 6599, "Henegouwen", WALLONIA),
+    (6600, 6999, "Luxemburg", WALLONIA),
+    (7000, 7999, "Henegouwen", WALLONIA),
+    (8000, 8999, "West-Vlaanderen", FLANDERS),
+    (9000, 9999, "Oost-Vlaanderen", FLANDERS),
+)
+
+# Other spellings people send (French, English, German, with "province" etc.)
+PROVINCE_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "Brussel": ("Bruxelles", "Brussels", "Brussels-Capital", "Bruxelles-Capitale",
+                "Brussels Hoofdstedelijk Gewest", "Brussels Capital Region", "Brüssel"),
+    "Waals-Brabant": ("Brabant wallon", "Walloon Brabant", "Wallonisch-Brabant"),
+    "Vlaams-Brabant": ("Brabant flamand", "Flemish Brabant", "Flämisch-Brabant"),
+    "Antwerpen": ("Anvers", "Antwerp"),
+    "Limburg": ("Limbourg",),
+    "Luik": ("Liège", "Liege", "Lüttich"),
+    "Namen": ("Namur",),
+    "Henegouwen": ("Hainaut", "Hennegau"),
+    "Luxemburg": ("Luxembourg",),
+    "West-Vlaanderen": ("Flandre-Occidentale", "West Flanders", "Westflandern"),
+    "Oost-Vlaanderen": ("Flandre-Orientale", "East Flanders", "Ostflandern"),
+}
+REGION_ALIASES: Dict[str, Tuple[str, ...]] = {
+    FLANDERS: ("Vlaams Gewest", "Flanders", "Flandre", "Région flamande", "Flemish Region", "Flandern"),
+    WALLONIA: ("Wallonie", "Wallonia", "Waals Gewest", "Région wallonne", "Walloon Region", "Wallonien"),
+    BRUSSELS: ("Brussel", "Bruxelles", "Brussels-Capital", "Brussels Capital Region",
+               "Brussels Hoofdstedelijk Gewest", "Région de Bruxelles-Capitale", "Brüssel"),
+}
+# Country values for which the Belgian checks apply (None = not given = Belgian postcode)
+BELGIUM_ALIASES = ("Belgium", "België", "Belgique", "Belgien", "BE")
+
+POSTCODE_FILE = Path(__file__).parent / "resources" / "be_postcodes.csv"
+_N_CODES = 10_000  # postcodes are 4 digits: the array index IS the postcode
+
+
+def _normalize(name: str) -> str:
+    """'Flandre-Occidentale ' -> 'flandreoccidentale' (case, accents, separators ignored)."""
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
+    ascii_name = re.sub(r"^(provincie|province de|province of|province|provinz)\s+", "", ascii_name.strip().lower())
+    return re.sub(r"[^a-z0-9]", "", ascii_name)
+
+
+def _alias_table(aliases: Dict[str, Tuple[str, ...]]) -> Dict[str, str]:
+    table = {}
+    for canonical, others in aliases.items():
+        for name in (canonical, *others):
+            table[_normalize(name)] = canonical
+    return table
+
+
+_PROVINCES = _alias_table(PROVINCE_ALIASES)
+_REGIONS = _alias_table(REGION_ALIASES)
+_BELGIUM = {_normalize(name) for name in BELGIUM_ALIASES}
+
+
+@lru_cache(maxsize=1024)
+def canonical_province(name: str) -> Optional[str]:
+    """Canonical province for any accepted spelling (None = not a Belgian province)."""
+    return _PROVINCES.get(_normalize(name))
+
+
+@lru_cache(maxsize=256)
+def canonical_region(name: str) -> Optional[str]:
+    return _REGIONS.get(_normalize(name))
+
+
+@lru_cache(maxsize=256)
+def is_belgian(country: str) -> bool:
+    """True for any accepted spelling of Belgium."""
+    return _normalize(country) in _BELGIUM
+
+
+class PostcodeInfo(NamedTuple):
+    postcode: int
+    locality: Optional[str]
+    province: str
+    region: str
+    latitude: float
+    longitude: float
+    exact: bool  # False: locality unknown, coordinates of a nearby postcode
+
+
+class PostcodeIndex:
+    """
+    Array-backed postcode lookups (10 000 slots, one per 4-digit postcode).
+
+    - province_id / region_id: int8 codes from the postcode ranges (-1 = no range).
+    - locality_id: int16 code into `localities` (-1 = not in the file).
+    - latitude / longitude: float32, filled for every postcode in a range.
+    """
+
+    def __init__(self, rows: List[Tuple[int, str, float, float]]) -> None:
+        self.provinces = sorted({province for _, _, province, _ in PROVINCE_RANGES})
+        self.regions = sorted({region for _, _, _, region in PROVINCE_RANGES})
+        self.localities = sorted({locality for _, locality, _, _ in rows})
+
+        self.province_id = np.full(_N_CODES, -1, dtype=np.int8)
+        self.region_id = np.full(_N_CODES, -1, dtype=np.int8)
+        for first, last, province, region in PROVINCE_RANGES:
+            self.province_id[first:last + 1] = self.provinces.index(province)
+            self.region_id[first:last + 1] = self.regions.index(region)
+
+        locality_codes = {locality: code for code, locality in enumerate(self.localities)}
+        self.locality_id = np.full(_N_CODES, -1, dtype=np.int16)
+        self.latitude = np.full(_N_CODES, np.nan, dtype=np.float32)
+        self.longitude = np.full(_N_CODES, np.nan, dtype=np.float32)
+        for postcode, locality, latitude, longitude in rows:
+            if self.province_id[postcode] < 0:
+                raise ValueError(f"Postcode {postcode} is outside the Belgian postcode ranges.")
+            self.locality_id[postcode] = locality_codes[locality]
+            self.latitude[postcode] = latitude
+            self.longitude[postcode] = longitude
+        self._fill_coordinates()
+
+        # Object arrays so batches map codes -> names with one take()
+        self._province_names = np.array(self.provinces + [None], dtype=object)
+        self._region_names = np.array(self.regions + [None], dtype=object)
+        self._locality_names = np.array(self.localities + [None], dtype=object)
+
+    @classmethod
+    def from_csv(cls, path: Path) -> "PostcodeIndex":
+        rows = []
+        with open(path, newline="", encoding="utf-8") as handle:
+            for record in csv.DictReader(handle):
+                rows.append((
+                    int(record["postcode"]),
+                    record["locality"].strip(),
+                    float(record["latitude"]),
+                    float(record["longitude"]),
+                ))
+        return cls(rows)
+
+    def _fill_coordinates(self) -> None:
+        """Give unknown postcodes the coordinates of the closest lower known one in their province."""
+        known = ~np.isnan(self.latitude)
+        for first, last, _, _ in PROVINCE_RANGES:
+            span = slice(first, last + 1)
+            positions = np.where(known[span], np.arange(last - first + 1), -1)
+            source = np.maximum.accumulate(positions)
+            if (source < 0).all():
+                continue
+            # Before the first known postcode of the range: use that first one
+            source[source < 0] = np.flatnonzero(known[span])[0]
+            self.latitude[span] = self.latitude[span][source]
+            self.longitude[span] = self.longitude[span][source]
+
+    def __len__(self) -> int:
+        return int((self.locality_id >= 0).sum())
+
+    def lookup(self, postcode: int) -> Optional[PostcodeInfo]:
+        """Everything known about one postcode (None = not a Belgian postcode)."""
+        if not 0 <= postcode < _N_CODES or self.province_id[postcode] < 0:
+            return None
+        locality = int(self.locality_id[postcode])
+        return PostcodeInfo(
+            postcode=postcode,
+            locality=self.localities[locality] if locality >= 0 else None,
+            province=self.provinces[self.province_id[postcode]],
+            region=self.regions[self.region_id[postcode]],
+            latitude=float(self.latitude[postcode]),
+            longitude=float(self.longitude[postcode]),
+            exact=locality >= 0,
+        )
+
+    def columns(self, postcodes: Any) -> Dict[str, np.ndarray]:
+        """Location features for many postcodes at once (unknown -> None / NaN)."""
+        codes = np.asarray(postcodes, dtype=np.int64)
+        valid = (codes >= 0) & (codes < _N_CODES)
+        safe = np.where(valid, codes, 0)
+        # Index -1 (and invalid postcodes) -> the trailing None of the name arrays
+        province = np.where(valid, self.province_id[safe], -1)
+        region = np.where(valid, self.region_id[safe], -1)
+        locality = np.where(valid, self.locality_id[safe], -1)
+        return {
+            "postcode": codes,
+            "province": self._province_names[province],
+            "region": self._region_names[region],
+            "locality": self._locality_names[locality],
+            "latitude": np.where(valid, self.latitude[safe], np.nan),
+            "longitude": np.where(valid, self.longitude[safe], np.nan),
+        }
+
+
+_INDEX: Optional[PostcodeIndex] = None
+_INDEX_LOCK = threading.Lock()
+
+
+def postcode_index() -> PostcodeIndex:
+    """The process-wide index, built from the postcode file on first use."""
+    global _INDEX
+    if _INDEX is None:
+        with _INDEX_LOCK:
+            if _INDEX is None:
+                _INDEX = PostcodeIndex.from_csv(Path(config.POSTCODE_FILE or POSTCODE_FILE))
+    return _INDEX
+
+
+def check_location(location: Any) -> None:
+    """
+    Validate a Location against its postcode and fill what follows from it.
+
+    - Only for Belgian locations (country missing or Belgium).
+    - Fills a missing region (IMMO_POSTCODE_CHECK=fill, the default).
+    - With IMMO_POSTCODE_CHECK=strict, also rejects (ValueError) an unknown
+      postcode or a province or region that does not match it.
+    """
+    mode = config.POSTCODE_CHECK
+    if mode == "off":
+        return
+    if location.country is not None and not is_belgian(location.country):
+        return
+
+    info = postcode_index().lookup(location.postcode)
+    if info is None:
+        if mode == "strict":
+            raise ValueError(f"Postcode {location.postcode} is not a Belgian postcode.")
+        return
+
+    if location.region is None:
+        location.region = info.region
+    if mode != "strict":
+        return
+
+    province = canonical_province(location.province)
+    if province != info.province:
+        raise ValueError(
+            f"Postcode {location.postcode} lies in province {info.province!r}, not {location.province!r}."
+        )
+    if canonical_region(location.region) != info.region:
+        raise ValueError(
+            f"Postcode {location.postcode} lies in region {info.region!r}, not {location.region!r}."
+        )
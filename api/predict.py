@@ -1,42 +1,147 @@
+import hashlib
+import math
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
 
 import joblib
 import numpy as np
-import pandas as pd
 
-from api.schemas import PropertyFeatures  # treat api/ as python package
+if TYPE_CHECKING:
+    # Imported where used: "/" must answer before pandas is loaded (cold start)
+    import pandas as pd
 
-# Path to model file
-_MODEL_PATH = Path(__file__).parent / "models" / "immo_eliza_rf_small.joblib"
-_MODEL = None  # lazy-loaded cache
+from api import config, metrics, tracing
+from api.cache import PredictionCache, feature_key
+from api.corpus import random_corpus
+from api.features import FEATURE_COLUMNS, RowLayout, missing_as_nan
+from api.forest import CompiledPipeline
+from api.fused import FusedTransform, verify
+from api.planner import PlannedPredictor
+from api.procpool import ProcessPoolPredictor
+from api.registry import ModelRegistry
+from api.schemas import Location, PropertyFeatures, validate_properties  # treat api/ as python package
 
+# Versioned model artifacts; the default one is the original file name
+_REGISTRY = ModelRegistry(config.MODEL_DIR, config.MODEL_NAME)
+_MODEL_PATH = config.MODEL_DIR / config.MODEL_NAME
+_MODEL_LOCK = threading.Lock()  # single-flight: only one thread ever runs the first joblib.load
+_SWAP_LOCK = threading.Lock()  # one hot swap at a time
 
-def _load_model():
+
+class ServingModel:
     """
-    Lazy-load the trained pipeline.
+    One loaded model version with everything needed to serve it.
 
-    - If the file is directly a model/pipeline (has .predict) -> use that.
-    - If it is a dict, try common keys such as ‘model’, ‘pipeline’, ‘pipe’, ‘estimator’.
+    - model: the fitted pipeline; predictor: the object serving .predict
+      (the pipeline, its compiled version, a process pool or a calibrated
+      planner over those); layout: fast input path or None.
+    - Requests take ONE reference to the current ServingModel and use it to
+      the end, so a hot swap (rebinding _SERVING) never mixes two versions.
     """
-    global _MODEL
-    if _MODEL is not None:
-        return _MODEL
 
-    loaded = joblib.load(_MODEL_PATH)
+    def __init__(self, model: Any, version: str, path: Path, load_seconds: float) -> None:
+        self.model = model
+        self.version = version
+        self.path = path
+        self.load_seconds = load_seconds
+        self.layout: Optional[RowLayout] = _build_layout(model)
+        self.predictor: Any = _build_predictor(model)
+
+    @property
+    def engine(self) -> str:
+        if isinstance(self.predictor, PlannedPredictor):
+            return "auto"
+        if isinstance(self.predictor, ProcessPoolPredictor):
+            return "process"
+        return "compiled" if isinstance(self.predictor, CompiledPipeline) else "sklearn"
+
+    @property
+    def fused(self) -> bool:
+        """True when the predictor takes raw column values (fused preprocessing, no DataFrame)."""
+        return _takes_arrays(self.predictor)
+
+    @property
+    def calibration_seconds(self) -> Optional[float]:
+        """Time the "auto" planner spent timing the engines (None for the other engines)."""
+        if isinstance(self.predictor, PlannedPredictor):
+            return self.predictor.calibration.get("seconds")
+        return None
+
+
+_SERVING: Optional[ServingModel] = None  # lazy-loaded, swapped atomically
+_PRELOADING = False  # True while the gunicorn master loads the model before forking
 
+# Readiness info reported by /ready (filled by _load_model, warm_up and hot swaps)
+_MODEL_STATUS: Dict[str, Any] = {
+    "version": None,
+    "model_file": None,
+    "loaded": False,
+    "ready": False,
+    "load_seconds": None,
+    "calibration_seconds": None,
+    "warmup_seconds": None,
+    "self_test_prediction": None,
+    "fast_path": False,
+    "engine": None,
+    "error": None,
+}
+
+# WHY: repeated listings (random examples, retries) should not re-run the pipeline
+_CACHE: Optional[PredictionCache] = (
+    PredictionCache(config.CACHE_MAX_SIZE, config.CACHE_TTL_SECONDS)
+    if config.CACHE_MAX_SIZE > 0
+    else None
+)
+
+# Realistic dummy property used for the start-up self-test prediction
+_WARMUP_FEATURES = PropertyFeatures(
+    property_type="house",
+    location=Location(province="Antwerpen", postcode=2000, locality="Antwerpen"),
+    number_of_bedrooms=3,
+    livable_surface=120,
+    total_land_surface=300,
+    garage=True,
+    garden=True,
+    kitchen_type="installed",
+    type_of_heating="gas",
+    state_of_property="good",
+)
+
+# Same property with only the mandatory fields: exercises the missing-value paths
+_WARMUP_MINIMAL_FEATURES = PropertyFeatures(
+    property_type="apartment",
+    location=Location(province="Antwerpen", postcode=2000, locality="Antwerpen"),
+    livable_surface=80,
+)
+
+# Compiled engine must agree with scikit-learn within this relative tolerance
+_ENGINE_RTOL = 1e-9
+# Self-test sample on top of the two warm-up properties (api/corpus.py: missing
+# values mixed with strings in every column), and how many of them run alone
+_SELF_TEST_ROWS = 254
+_SELF_TEST_SINGLE_ROWS = 8
+
+
+def _unwrap_model(loaded: Any) -> Any:
+    """
+    Return the object with a .predict method from a loaded joblib file.
+
+    - If the file is directly a model/pipeline (has .predict) -> use that.
+    - If it is a dict, try common keys such as ‘model’, ‘pipeline’, ‘pipe’, ‘estimator’.
+    """
     # Case 1: immediately a pipeline/model
     if hasattr(loaded, "predict"):
-        _MODEL = loaded
-        return _MODEL
+        return loaded
 
     # Case 2: dict with a model inside
     if isinstance(loaded, dict):
         for key in ("model", "pipeline", "pipe", "estimator"):
             candidate = loaded.get(key)
             if hasattr(candidate, "predict"):
-                _MODEL = candidate
-                return _MODEL
+                return candidate
 
         raise TypeError(
             "Loaded joblib file is a dict but no usable model was found under keys "
@@ -49,6 +154,320 @@ def _load_model():
     )
 
 
+def _model_version(path: Path) -> str:
+    """Version id = file name + content hash, so a retrained file never reuses old cache entries."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return f"{path.stem}-{digest.hexdigest()[:12]}"
+
+
+def _build_layout(model: Any) -> Optional[RowLayout]:
+    """Precompute the model column order for the fast input path (None = use DataFrame path)."""
+    if not config.FAST_PATH_ENABLED:
+        return None
+    try:
+        return RowLayout.for_model(model)
+    except ValueError:
+        # Model expects columns we cannot fill from PropertyFeatures: keep the generic path
+        return None
+
+
+def _build_predictor(model: Any) -> Any:
+    """Pick the inference engine from config; fall back to the plain pipeline."""
+    if config.INFERENCE_ENGINE not in ("auto", "compiled", "process"):
+        return model
+    try:
+        # Compacted artifacts (api/compact.py) are compiled already
+        compiled = model if isinstance(model, CompiledPipeline) else CompiledPipeline.from_model(
+            model, max_rows=config.COMPILED_MAX_ROWS)
+    except TypeError:
+        # Final estimator is not a tree regressor we know how to compile
+        return model
+    compiled = _fuse(compiled)
+
+    if config.INFERENCE_ENGINE == "process":
+        return ProcessPoolPredictor(compiled, processes=config.INFERENCE_PROCESSES)
+    if config.INFERENCE_ENGINE == "auto":
+        return _build_planner(compiled)
+    return compiled
+
+
+def _fuse(compiled: CompiledPipeline) -> CompiledPipeline:
+    """Swap the fitted preprocessing for its fused version (api/fused.py) when it matches bit-for-bit."""
+    if not config.FUSED_PREPROCESS or compiled.preprocessor is None:
+        return compiled
+    try:
+        fused = FusedTransform.from_preprocessor(compiled.preprocessor)
+        if not verify(fused, compiled.preprocessor):
+            return compiled
+    except (TypeError, ValueError):
+        # Step types we do not fuse, or inputs the verification corpus cannot express
+        return compiled
+    return CompiledPipeline(fused, compiled.forest, compiled.estimator, compiled.max_rows)
+
+
+def _build_planner(compiled: CompiledPipeline) -> Any:
+    """Calibrated per-call choice between the engines this model and machine support."""
+    if compiled.estimator is None:
+        # Compacted artifact: the compiled forest is the only engine
+        return compiled
+
+    pool = None
+    # The gunicorn master must not start processes a forked worker would inherit
+    if config.INFERENCE_PROCESSES > 1 and not _PRELOADING:
+        pool = ProcessPoolPredictor(compiled, processes=config.INFERENCE_PROCESSES)
+    planner = PlannedPredictor(compiled, pool)
+    planner.calibrate(config.PLANNER_MAX_ROWS)
+    return planner
+
+
+def load_serving(path: Path) -> ServingModel:
+    """Deserialize one artifact and prepare its fast path / inference engine (not served, not self-tested)."""
+    start = time.perf_counter()
+    model = _unwrap_model(joblib.load(path))
+    version = _model_version(path)
+    return ServingModel(model, version, path, time.perf_counter() - start)
+
+
+def _self_test(serving: ServingModel) -> float:
+    """
+    Run the start-up self-test on a model version before it serves traffic.
+
+    - Checks the fast input path against the plain DataFrame path and
+      switches it off if they disagree.
+    - Checks the compiled engine against scikit-learn and falls back to
+      scikit-learn if it is off by more than _ENGINE_RTOL (see _engine_agrees).
+    - Both checks run on the warm-up properties plus a seeded corpus whose
+      categorical columns mix strings and missing values, as real batches do.
+    - Returns the self-test price; raises if it is not a finite number.
+    """
+    import pandas as pd
+
+    model = serving.model
+
+    # Bypass the cache: the self-test must really run the pipeline
+    reference_df = pd.DataFrame([preprocess_for_model(_WARMUP_FEATURES)])
+    price = float(np.asarray(model.predict(reference_df))[0])
+    if not math.isfinite(price):
+        raise ValueError(f"Self-test prediction is not a finite number: {price}")
+
+    sample = [_WARMUP_FEATURES, _WARMUP_MINIMAL_FEATURES, *random_corpus(_SELF_TEST_ROWS, seed=0)]
+    expected = _predict_features(model, None, sample)
+    if serving.layout is not None and _predict_features(model, serving.layout, sample) != expected:
+        serving.layout = None
+
+    if serving.predictor is not model and not _engine_agrees(serving.predictor, serving.layout, sample, expected):
+        serving.predictor = model
+
+    return price
+
+
+def _engine_agrees(predictor: Any, layout: Optional[RowLayout], sample: List[PropertyFeatures],
+                   expected: List[float]) -> bool:
+    """
+    True when an inference engine gives scikit-learn's prices on the self-test sample.
+
+    - The whole sample in one call, and its first rows one call each.
+    - For the "auto" planner, every strategy of the plan on the whole sample:
+      live traffic would otherwise only reach a step at its batch size.
+    """
+    def agrees(prices: Any, rows: slice = slice(None)) -> bool:
+        return bool(np.allclose(np.asarray(prices, dtype=np.float64), expected[rows], rtol=_ENGINE_RTOL, atol=0.0))
+
+    if not agrees(_predict_features(predictor, layout, sample)):
+        return False
+    for i in range(min(_SELF_TEST_SINGLE_ROWS, len(sample))):
+        if not agrees(_predict_features(predictor, layout, sample[i:i + 1]), slice(i, i + 1)):
+            return False
+    if isinstance(predictor, PlannedPredictor):
+        Xt = predictor.transform(_model_input(layout, sample, arrays=_takes_arrays(predictor)))
+        for step in predictor.plan:
+            if not agrees(predictor.run(step["strategy"], Xt, step["chunk_rows"])):
+                return False
+    return True
+
+
+def _describe(serving: ServingModel) -> Dict[str, Any]:
+    return {
+        "version": serving.version,
+        "model_file": serving.path.name,
+        "loaded": True,
+        "load_seconds": serving.load_seconds,
+        "calibration_seconds": serving.calibration_seconds,
+        "fast_path": serving.layout is not None,
+        "engine": serving.engine,
+        "fused_preprocess": serving.fused,
+    }
+
+
+def _self_tested(serving: ServingModel) -> Dict[str, Any]:
+    """Self-test a version that is not served yet; returns its readiness status."""
+    start = time.perf_counter()
+    price = _self_test(serving)
+    return dict(
+        _describe(serving),
+        ready=True,
+        warmup_seconds=time.perf_counter() - start,
+        self_test_prediction=price,
+        error=None,
+    )
+
+
+def _publish(serving: ServingModel, status: Dict[str, Any]) -> None:
+    """Serve a self-tested version (caller holds _MODEL_LOCK)."""
+    global _SERVING
+    _SERVING = serving
+    if _CACHE is not None:
+        _CACHE.bind_model(serving.version)
+    _MODEL_STATUS.update(status)
+
+
+def _load_model():
+    """
+    Lazy-load the trained pipeline (thread-safe).
+
+    - The app normally loads it eagerly at start-up through warm_up().
+    - Concurrent first callers wait on a lock instead of each running joblib.load.
+    - Serves the artifact named by the registry (CURRENT file, else IMMO_MODEL_NAME).
+    - The model is self-tested BEFORE it is published: no request (nor the
+      background warm-up) ever sees an unchecked engine, and the self-test
+      never changes a ServingModel that is already serving.
+    """
+    global _SERVING
+    if _SERVING is not None:
+        return _SERVING.model
+
+    with _MODEL_LOCK:
+        # Another thread may have finished loading while we waited for the lock
+        if _SERVING is not None:
+            return _SERVING.model
+
+        try:
+            serving = load_serving(_REGISTRY.active_path())
+        except Exception as exc:
+            _MODEL_STATUS["error"] = f"Model load failed: {exc}"
+            raise
+
+        _MODEL_STATUS.update(_describe(serving))
+        try:
+            status = _self_tested(serving)
+        except Exception as exc:
+            _MODEL_STATUS["error"] = f"Self-test prediction failed: {exc}"
+            raise
+        _publish(serving, status)
+
+    return _SERVING.model
+
+
+def current_model() -> ServingModel:
+    """The model version serving right now (loaded on first use)."""
+    _load_model()
+    return _SERVING
+
+
+def warm_up() -> Dict[str, Any]:
+    """
+    Load the model and run a self-test prediction.
+
+    - Pays deserialization, calibration and first-call costs before real users arrive.
+    - Marks the service ready only once the self-test returned a finite price
+      (see _self_test for the fast path / compiled engine checks).
+    """
+    _load_model()
+    return model_status()
+
+
+def preload() -> Dict[str, Any]:
+    """
+    warm_up() in the gunicorn master, before it forks the workers (api/gunicorn_conf.py).
+
+    - No worker process may be running at the fork: a worker would inherit a
+      dead pool and a forkserver that is not its child.
+    - So "auto" is calibrated without the process pool (the gunicorn workers
+      already use the cores), and the pool that the self-test of the "process"
+      engine started is shut down again; each worker starts its own on demand.
+    """
+    global _PRELOADING
+    _PRELOADING = True
+    try:
+        status = warm_up()
+    finally:
+        _PRELOADING = False
+
+    predictor = _SERVING.predictor
+    if isinstance(predictor, ProcessPoolPredictor):
+        predictor.shutdown()
+    return status
+
+
+def activate_model(path: Path) -> Dict[str, Any]:
+    """
+    Hot swap: load + self-test another artifact, then serve it.
+
+    - Runs next to live traffic; the old version keeps serving until the new
+      one has passed its self-test, then ONE reference assignment swaps them.
+    - In-flight requests finish on the version they started with.
+    - If loading or the self-test fails, nothing changes and the error is raised.
+    """
+    with _SWAP_LOCK:
+        serving = load_serving(path)
+        status = _self_tested(serving)
+
+        with _MODEL_LOCK:
+            _publish(serving, status)
+    return model_status()
+
+
+def loaded_model_file() -> Optional[str]:
+    """File name of the artifact being served (None before the first load)."""
+    serving = _SERVING
+    return serving.path.name if serving is not None else None
+
+
+def model_registry() -> ModelRegistry:
+    return _REGISTRY
+
+
+def model_status() -> Dict[str, Any]:
+    """Snapshot of load / warm-up state for the readiness probe."""
+    return dict(_MODEL_STATUS)
+
+
+def inference_stats() -> Dict[str, Any]:
+    """Engine of the serving model, its execution plan ("auto") and pool counters."""
+    serving = _SERVING
+    if serving is None:
+        return {"engine": None}
+    predictor = serving.predictor
+    stats: Dict[str, Any] = {"engine": serving.engine}
+    if isinstance(predictor, PlannedPredictor):
+        stats.update(predictor.stats())
+        predictor = predictor.pool
+    if isinstance(predictor, ProcessPoolPredictor):
+        stats["process_pool"] = predictor.stats()
+    return stats
+
+
+def cache_stats() -> Dict[str, Any]:
+    """Hit / miss / eviction counters of the prediction cache."""
+    if _CACHE is None:
+        return {"enabled": False}
+    return _CACHE.stats()
+
+
+@contextmanager
+def cache_disabled() -> Iterator[None]:
+    """Bypass the prediction cache inside the block (benchmarks: every call runs the model)."""
+    global _CACHE
+    saved, _CACHE = _CACHE, None
+    try:
+        yield
+    finally:
+        _CACHE = saved
+
+
 def preprocess_for_model(features: PropertyFeatures) -> Dict[str, Any]:
     """
     Create a feature dictionary with exactly the same column names
@@ -59,52 +478,169 @@ def preprocess_for_model(features: PropertyFeatures) -> Dict[str, Any]:
     and your preprocessing pipeline should be able to handle that.
     """
     feature_dict: Dict[str, Any] = {
-        # 23 expected feature columns:
-
-        # Size & physical attributes
-        "Number of bedrooms": features.number_of_bedrooms,
-        "Livable surface": features.livable_surface,
-        "Total land surface": features.total_land_surface,
-        "Surface garden": features.surface_garden,
-        "Surface terrace": features.surface_terrace,
-        "Number of facades": features.number_of_facades,
-        "Number of bathrooms": features.number_of_bathrooms,
-        "Number of showers": features.number_of_showers,
-        "Number of toilets": features.number_of_toilets,
-        "Garage": features.garage,
-        "Number of garages": features.number_of_garages,
-
-        # Condition & comfort indicators
-        "Furnished": features.furnished,
-        "Attic": features.attic,
-        "Garden": features.garden,
-        "Terrace": features.terrace,
-        "Swimming pool": features.swimming_pool,
-        "Kitchen equipment": features.kitchen_equipment,
-        "Kitchen type": features.kitchen_type,
-        "Type of heating": features.type_of_heating,
-        "Type of glazing": features.type_of_glazing,
-        "Elevator": features.elevator,
-        "Availability": features.availability,
-        "State of the property": features.state_of_property,
+        column: getattr(features, attribute)
+        for column, attribute in FEATURE_COLUMNS.items()
     }
 
     return feature_dict
 
 
-def predict_price(features: PropertyFeatures) -> float:
+def _cache_input(features: PropertyFeatures, layout: Optional[RowLayout]) -> Dict[str, Any]:
+    """What the model sees of one property: the cache key must cover exactly that."""
+    feature_dict = preprocess_for_model(features)
+    if layout is not None and layout.uses_location:
+        feature_dict["Postcode"] = features.location.postcode
+    return feature_dict
+
+
+def _takes_arrays(model: Any) -> bool:
+    return isinstance(getattr(model, "preprocessor", None), FusedTransform)
+
+
+def _model_input(layout: Optional[RowLayout], features_list: List[PropertyFeatures], arrays: bool = False) -> Any:
+    """DataFrame with the model columns, through the fast path when available (arrays: plain object array)."""
+    if layout is not None:
+        return layout.values(features_list) if arrays else layout.frame(features_list)
+    import pandas as pd
+
+    # Model expects DataFrame with the correct column names; missing values as NaN (see missing_as_nan)
+    rows = [list(preprocess_for_model(features).values()) for features in features_list]
+    return pd.DataFrame(missing_as_nan(np.array(rows, dtype=object)), columns=list(FEATURE_COLUMNS), dtype=object)
+
+
+def _predict_features(
+    model: Any,
+    layout: Optional[RowLayout],
+    features_list: List[PropertyFeatures],
+) -> List[float]:
+    """Run the pipeline (or its compiled version) once over the given properties (no cache)."""
+    with metrics.timed("preprocess"):
+        input_df = _model_input(layout, features_list, arrays=_takes_arrays(model))
+    with metrics.timed("predict"):
+        y_pred = model.predict(input_df)
+    metrics.PREDICTED_ROWS.inc(len(features_list))
+    return [float(price) for price in np.asarray(y_pred)]
+
+
+def predict_prices(
+    features_list: List[PropertyFeatures],
+    serving: Optional[ServingModel] = None,
+) -> List[float]:
+    """
+    Vectorized version of predict_price for many properties at once.
+
+    - Serves repeated properties from the prediction cache (when enabled).
+    - Builds ONE model input for the remaining ones (same columns as preprocess_for_model).
+    - Calls the trained pipeline ONCE, so the forest is traversed per batch
+      instead of once per property.
+    - Returns the predicted prices in the same order as the input.
+    - serving: model version to use (default: the current one); callers that
+      report the version pass the ServingModel they took.
+    """
+    if not features_list:
+        return []
+
+    if serving is None:
+        serving = current_model()
+    model, layout = serving.predictor, serving.layout
+
+    if _CACHE is None:
+        tracing.annotate(rows=len(features_list))
+        return _predict_features(model, layout, features_list)
+
+    keys = [feature_key(_cache_input(features, layout), serving.version) for features in features_list]
+    prices: List[Optional[float]] = [_CACHE.get(key) for key in keys]
+
+    missing = [i for i, price in enumerate(prices) if price is None]
+    tracing.annotate(rows=len(features_list), cache_hits=len(features_list) - len(missing))
+    if missing:
+        computed = _predict_features(model, layout, [features_list[i] for i in missing])
+        for i, price in zip(missing, computed):
+            prices[i] = price
+            _CACHE.put(keys[i], price)
+
+    return prices
+
+
+def predict_prices_with_version(features_list: List[PropertyFeatures]) -> List[Tuple[float, str]]:
+    """(price, model version) per property, all from ONE model version."""
+    serving = current_model()
+    return [(price, serving.version) for price in predict_prices(features_list, serving)]
+
+
+def predict_price(features: PropertyFeatures, serving: Optional[ServingModel] = None) -> float:
     """
     - Takes validated PropertyFeatures (with location, property_type for the API).
     - Converts to DataFrame with exact column names for the model.
     - Uses your trained pipeline to predict a price.
     """
-    model = _load_model()
-    feature_dict = preprocess_for_model(features)
+    return predict_prices([features], serving)[0]
 
-    # Model expects DataFrame with the correct column names
-    input_df = pd.DataFrame([feature_dict])
 
-    y_pred = model.predict(input_df)
-    price = float(np.asarray(y_pred)[0])
+class ScoredItems(NamedTuple):
+    """
+    Scores of a list of raw property objects, as columns (one entry per input item).
 
-    return price
+    - prices / price_per_m2: float64 arrays, NaN where the item was invalid.
+    - errors: validation errors of the invalid items, by index.
+    - model_version: version that scored the valid items (None if there were none).
+    """
+
+    prices: np.ndarray
+    price_per_m2: np.ndarray
+    errors: Dict[int, List[Dict[str, Any]]]
+    model_version: Optional[str]
+
+    @property
+    def n_success(self) -> int:
+        return len(self.prices) - len(self.errors)
+
+    def item(self, index: int) -> Dict[str, Any]:
+        """The result of one item as a dict (see score_items)."""
+        if index in self.errors:
+            return {
+                "index": index,
+                "prediction": None,
+                "price_per_m2": None,
+                "status_code": 422,
+                "errors": self.errors[index],
+                "model_version": None,
+            }
+        return {
+            "index": index,
+            "prediction": float(self.prices[index]),
+            "price_per_m2": float(self.price_per_m2[index]),
+            "status_code": 200,
+            "errors": None,
+            "model_version": self.model_version,
+        }
+
+
+def score_columns(items: List[Dict[str, Any]]) -> ScoredItems:
+    """
+    Validate raw property objects one by one and predict the valid ones in ONE call.
+
+    Invalid items never fail the others. The result stays in arrays, so
+    encoders (api/encoding.py) never build a dict per item.
+    """
+    with metrics.timed("request_validation"):
+        valid, errors = validate_properties(items)
+    serving = current_model() if valid else None
+
+    prices = np.full(len(items), np.nan)
+    surfaces = np.full(len(items), np.nan)
+    if valid:
+        positions = [index for index, _ in valid]
+        prices[positions] = predict_prices([features for _, features in valid], serving)
+        surfaces[positions] = [features.livable_surface for _, features in valid]
+
+    return ScoredItems(prices, prices / surfaces, errors, serving.version if serving else None)
+
+
+def score_items(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Same as score_columns, as one dict per item, in input order:
+    index, prediction, price_per_m2, status_code (200 / 422), errors, model_version.
+    """
+    scored = score_columns(items)
+    return [scored.item(index) for index in range(len(items))]
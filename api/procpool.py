@@ -0,0 +1,201 @@
+"""
+Process-pool inference: tree walks in worker processes, outside the GIL of the server.
+
+- The compiled forest (api/forest.py) is written ONCE to .npy files; the
+  parent and every worker memory-map them read-only, so the node arrays live
+  once in the page cache however many processes walk them.
+- The parent runs the fitted preprocessing and sends the numeric rows as a
+  float32 buffer (the forest compares in float32 anyway, so nothing is lost);
+  workers send back float64 prices as raw bytes. No DataFrame is pickled.
+- Big batches are split into one chunk per worker; a single row is one task.
+- A worker that dies (OOM kill, segfault) breaks the pool: it is rebuilt and
+  the call retried once, then predicted in-process so the request still gets
+  an answer. Restarts / fallbacks are counted in stats().
+- The pool is started lazily in the process that predicts and shut down when
+  the predictor is garbage-collected, e.g. after a hot swap. A process forked
+  after a pool was started (gunicorn preload) inherits a dead executor AND the
+  parent's forkserver: it builds its own executor and starts its workers with
+  spawn. If workers cannot be started at all, the call is predicted in-process.
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from api.forest import CompiledForest, CompiledPipeline
+
+_ARRAYS = ("feature", "threshold", "left", "right", "value", "missing_left", "roots")
+# Below this many rows per worker the IPC round trip costs more than the split saves
+_MIN_ROWS_PER_TASK = 256
+
+_WORKER_FOREST: Optional[CompiledForest] = None
+# Process that started the forkserver; a forked child cannot reuse it
+_FORKSERVER_PID: Optional[int] = None
+
+
+def save_forest(forest: CompiledForest, directory: Path) -> Dict[str, Any]:
+    """Write the node arrays as .npy files; returns the scalar attributes."""
+    for name in _ARRAYS:
+        np.save(directory / f"{name}.npy", getattr(forest, name))
+    return {"max_depth": forest.max_depth, "n_features": forest.n_features}
+
+
+def load_forest(directory: Path, meta: Dict[str, Any]) -> CompiledForest:
+    """Memory-mapped, read-only CompiledForest from save_forest() files."""
+    arrays = {name: np.load(directory / f"{name}.npy", mmap_mode="r") for name in _ARRAYS}
+    return CompiledForest(**arrays, **meta)
+
+
+def _init_worker(directory: str, meta: Dict[str, Any]) -> None:
+    global _WORKER_FOREST
+    _WORKER_FOREST = load_forest(Path(directory), meta)
+
+
+def _predict_rows(buffer: bytes, n_rows: int) -> bytes:
+    """Worker task: float32 rows in, float64 prices out (both raw bytes)."""
+    X = np.frombuffer(buffer, dtype=np.float32).reshape(n_rows, -1)
+    return _WORKER_FOREST.predict(X).tobytes()
+
+
+def _mp_context() -> Any:
+    # Never fork a threaded server; forkserver starts workers from a clean process
+    global _FORKSERVER_PID
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    if _FORKSERVER_PID is None:
+        _FORKSERVER_PID = os.getpid()
+    # The forkserver of the process we were forked from is not our child
+    return multiprocessing.get_context("forkserver" if _FORKSERVER_PID == os.getpid() else "spawn")
+
+
+def _cleanup(executor_box: List[Optional[ProcessPoolExecutor]], directory: str) -> None:
+    executor = executor_box[0]
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+class ProcessPoolPredictor:
+    """
+    Drop-in predictor (like CompiledPipeline) whose forest runs in a process pool.
+
+    processes: pool size (0 = one per CPU).
+    """
+
+    def __init__(self, compiled: CompiledPipeline, processes: int = 0) -> None:
+        self.processes = processes if processes > 0 else (os.cpu_count() or 1)
+
+        self._directory = tempfile.mkdtemp(prefix="immo-forest-")
+        self._meta = save_forest(compiled.forest, Path(self._directory))
+        # Preprocessing stays here; the in-process fallback reads the same pages as the workers
+        self.pipeline = CompiledPipeline(compiled.preprocessor, load_forest(Path(self._directory), self._meta))
+
+        self._lock = threading.Lock()
+        self._executor: List[Optional[ProcessPoolExecutor]] = [None]  # boxed for the finalizer
+        self._pid: Optional[int] = None
+        self._stats = {"tasks": 0, "restarts": 0, "fallbacks": 0}
+        self._finalizer = weakref.finalize(self, _cleanup, self._executor, self._directory)
+
+    @property
+    def preprocessor(self) -> Any:
+        return self.pipeline.preprocessor
+
+    @property
+    def forest(self) -> CompiledForest:
+        return self.pipeline.forest
+
+    @property
+    def feature_names_in_(self) -> Optional[np.ndarray]:
+        return self.pipeline.feature_names_in_
+
+    def transform(self, X: Any) -> np.ndarray:
+        return self.pipeline.transform(X)
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor[0] is None or self._pid != os.getpid():
+                self._executor[0] = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=_mp_context(),
+                    initializer=_init_worker,
+                    initargs=(self._directory, self._meta),
+                )
+                self._pid = os.getpid()
+            return self._executor[0]
+
+    def _discard(self, pool: ProcessPoolExecutor) -> bool:
+        with self._lock:
+            if self._executor[0] is not pool:
+                return False
+            pool.shutdown(wait=False, cancel_futures=True)
+            self._executor[0] = None
+            return True
+
+    def _restart(self, broken: ProcessPoolExecutor) -> None:
+        if self._discard(broken):
+            with self._lock:
+                self._stats["restarts"] += 1
+
+    def chunks(self, n_rows: int) -> List[slice]:
+        """Row ranges sent as separate tasks: at most one per worker."""
+        n_tasks = max(1, min(self.processes, n_rows // _MIN_ROWS_PER_TASK))
+        bounds = np.linspace(0, n_rows, n_tasks + 1).astype(int)
+        return [slice(start, stop) for start, stop in zip(bounds[:-1], bounds[1:])]
+
+    def predict_matrix(self, Xt: np.ndarray) -> np.ndarray:
+        """Prices for a numeric feature matrix, computed in the pool."""
+        rows = np.ascontiguousarray(Xt, dtype=np.float32)
+        if rows.shape[0] == 0:
+            return np.empty(0, dtype=np.float64)
+
+        for attempt in range(2):
+            pool = self._pool()
+            try:
+                futures = [pool.submit(_predict_rows, rows[part].tobytes(), part.stop - part.start)
+                           for part in self.chunks(rows.shape[0])]
+                results = [np.frombuffer(future.result(), dtype=np.float64) for future in futures]
+            except BrokenProcessPool:
+                # A worker died: new pool, then one more try
+                self._restart(pool)
+                continue
+            except (ChildProcessError, OSError, RuntimeError):
+                # Workers could not be started (forkserver / spawn failure): answer here
+                self._discard(pool)
+                break
+            with self._lock:
+                self._stats["tasks"] += len(futures)
+            return np.concatenate(results)
+
+        with self._lock:
+            self._stats["fallbacks"] += 1
+        return self.forest.predict(rows)
+
+    def predict(self, X: Any) -> np.ndarray:
+        return self.predict_matrix(self.transform(X))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "processes": self.processes,
+            "running": self._executor[0] is not None and self._pid == os.getpid(),
+            "forest_bytes": self.forest.nbytes,
+            **self._stats,
+        }
+
+    def shutdown(self) -> None:
+        """Stop the workers but keep the shared arrays: the next call starts a new pool."""
+        with self._lock:
+            executor, self._executor[0] = self._executor[0], None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def close(self) -> None:
+        """Stop the workers and delete the shared arrays (also done on garbage collection)."""
+        self._finalizer()
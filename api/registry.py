@@ -0,0 +1,201 @@
+"""
+Versioned model artifacts and zero-downtime hot swaps.
+
+- ModelRegistry: a directory of `*.joblib` artifacts plus a CURRENT file
+  naming the active one (falls back to IMMO_MODEL_NAME).
+- ModelSwapper: loads + self-tests a version on a background thread and only
+  then swaps it in (see predict.activate_model). Requests that started on the
+  old model finish on it; a version that fails its self-test is never served.
+- Optional watcher: polls CURRENT, so every gunicorn worker follows a swap
+  (the admin endpoint only reaches the worker that received it).
+"""
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+ARTIFACT_SUFFIX = ".joblib"
+POINTER_FILE = "CURRENT"
+
+
+class SwapInProgress(Exception):
+    """Raised when a swap is requested while another one is still loading."""
+
+
+class ModelRegistry:
+    """Directory of versioned model artifacts with a CURRENT pointer file."""
+
+    def __init__(self, root: Path, default_name: str) -> None:
+        self.root = Path(root)
+        self.default_name = default_name
+
+    @property
+    def pointer(self) -> Path:
+        return self.root / POINTER_FILE
+
+    def names(self) -> List[str]:
+        """Artifact file names, oldest first."""
+        if not self.root.is_dir():
+            return []
+        paths = [path for path in self.root.iterdir() if path.suffix == ARTIFACT_SUFFIX and path.is_file()]
+        return [path.name for path in sorted(paths, key=lambda path: (path.stat().st_mtime, path.name))]
+
+    def path_for(self, name: str) -> Path:
+        """Path of an artifact in the registry (no directories or other file types)."""
+        if not name or Path(name).name != name or not name.endswith(ARTIFACT_SUFFIX):
+            raise ValueError(f"Invalid model name {name!r}; expected a '{ARTIFACT_SUFFIX}' file name.")
+        path = self.root / name
+        if not path.is_file():
+            raise FileNotFoundError(f"Model {name!r} not found in {self.root}.")
+        return path
+
+    def active_name(self) -> str:
+        """Name in CURRENT, else the configured default."""
+        try:
+            name = self.pointer.read_text(encoding="utf-8").strip()
+        except OSError:
+            name = ""
+        return name or self.default_name
+
+    def active_path(self) -> Path:
+        name = self.active_name()
+        if name == self.default_name:
+            # Let joblib report a missing default model the usual way
+            return self.root / name
+        return self.path_for(name)
+
+    def set_active(self, name: str) -> None:
+        """Point CURRENT at an artifact; atomic, so readers never see half a name."""
+        self.path_for(name)
+        tmp = self.pointer.with_name(f".{POINTER_FILE}.{os.getpid()}.tmp")
+        tmp.write_text(name + "\n", encoding="utf-8")
+        os.replace(tmp, self.pointer)
+
+    def describe(self) -> List[Dict[str, Any]]:
+        active = self.active_name()
+        described = []
+        for name in self.names():
+            stat = (self.root / name).stat()
+            described.append({
+                "name": name,
+                "size_bytes": stat.st_size,
+                "modified": datetime.fromtimestamp(stat.st_mtime, timezone.utc).isoformat(timespec="seconds"),
+                "active": name == active,
+            })
+        return described
+
+
+class ModelSwapper:
+    """
+    Background loading + atomic swap of model versions.
+
+    activate_fn(path) must load, self-test and publish the model, raising if
+    the new version is not fit to serve. loaded_name_fn() returns the file
+    name currently served (used by the watcher).
+    """
+
+    def __init__(
+        self,
+        registry: ModelRegistry,
+        activate_fn: Callable[[Path], Dict[str, Any]],
+        loaded_name_fn: Callable[[], Optional[str]],
+    ) -> None:
+        self.registry = registry
+        self.activate_fn = activate_fn
+        self.loaded_name_fn = loaded_name_fn
+
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._state: Dict[str, Any] = {
+            "state": "idle",
+            "target": None,
+            "error": None,
+            "started_at": None,
+            "seconds": None,
+            "swaps": 0,
+        }
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
+        self._failed_target: Optional[str] = None
+
+    def request(self, name: str) -> Dict[str, Any]:
+        """Start loading `name` in the background; raises SwapInProgress if busy."""
+        path = self.registry.path_for(name)
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                raise SwapInProgress(f"Already loading {self._state['target']!r}.")
+            self._state.update(
+                state="loading",
+                target=name,
+                error=None,
+                started_at=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                seconds=None,
+            )
+            self._thread = threading.Thread(
+                target=self._run, args=(name, path), name="immo-model-swap", daemon=True
+            )
+            self._thread.start()
+        return self.status()
+
+    def wait(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Block until the current swap (if any) has finished."""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        return self.status()
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._state)
+
+    def _run(self, name: str, path: Path) -> None:
+        start = time.perf_counter()
+        try:
+            self.activate_fn(path)
+            # Persist only once the version passed its self-test
+            self.registry.set_active(name)
+        except Exception as exc:
+            with self._lock:
+                self._failed_target = name
+                self._state.update(state="failed", error=str(exc), seconds=time.perf_counter() - start)
+            return
+        with self._lock:
+            self._failed_target = None
+            self._state.update(state="done", seconds=time.perf_counter() - start)
+            self._state["swaps"] += 1
+
+    # File watch
+
+    def start_watching(self, interval: float) -> None:
+        """Poll CURRENT every `interval` seconds and swap when it names another model."""
+        if interval <= 0 or (self._watcher is not None and self._watcher.is_alive()):
+            return
+        self._stop_watching.clear()
+        self._watcher = threading.Thread(
+            target=self._watch, args=(interval,), name="immo-model-watch", daemon=True
+        )
+        self._watcher.start()
+
+    def stop_watching(self) -> None:
+        self._stop_watching.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def check_pointer(self) -> bool:
+        """One watcher step: request a swap if CURRENT changed. Returns True if one started."""
+        name = self.registry.active_name()
+        if name == self.loaded_name_fn() or name == self._failed_target:
+            # Same model, or a version that already failed: do not retry in a loop
+            return False
+        try:
+            self.request(name)
+        except (SwapInProgress, ValueError, FileNotFoundError):
+            return False
+        return True
+
+    def _watch(self, interval: float) -> None:
+        while not self._stop_watching.wait(interval):
+            self.check_pointer()
@@ -1,7 +1,12 @@
 # 1) Imports & config
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError, model_validator
+
+from api.postcodes import check_location
+
+# WHY: protect the server from unbounded payloads; bigger jobs can send several batches
+MAX_BATCH_SIZE = 10_000
 
 
 # 2) Pydantic schemas
@@ -11,6 +16,8 @@ class Location(BaseModel):
     Belgian location axes for validation.
     We will later flatten these to match the model's expected columns
     (country, region, province, postcode, locality).
+    Province and region are checked against the postcode (api/postcodes.py);
+    a missing region is filled in from it.
     """
     province: str = Field(
         ...,
@@ -39,6 +46,12 @@ class Location(BaseModel):
         description="Country name if present. Do NOT guess.",
     )
 
+    @model_validator(mode="after")
+    def _matches_postcode(self) -> "Location":
+        # WHY: postcode 2000 is Antwerpen; one array lookup catches typos and fills the region
+        check_location(self)
+        return self
+
 
 class PropertyFeatures(BaseModel):
     """
@@ -207,3 +220,151 @@ class PredictionResponse(BaseModel):
         ...,
         description="HTTP-like status code for this prediction.",
     )
+    model_version: Optional[str] = Field(
+        None,
+        description="Model version that produced the prediction (file name + content hash).",
+    )
+
+
+class BatchPredictionRequest(BaseModel):
+    """
+    Many properties in one call.
+
+    Items are kept as raw objects here and validated one by one against
+    PropertyFeatures, so a single bad item does not fail the whole batch.
+    """
+    data: List[Dict[str, Any]] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_BATCH_SIZE,
+        description="List of property objects (same shape as PredictionRequest.data).",
+    )
+
+
+class ColumnarPredictionRequest(BaseModel):
+    """
+    Many properties as one array per feature (see api/columnar.py).
+
+    Keys are PropertyFeatures fields with the location fields flat
+    (province, postcode, locality, region, country); row i of every array
+    describes property i. Rows are validated per column, in bulk.
+    """
+    data: Dict[str, List[Any]] = Field(
+        ...,
+        description="Feature name -> values, one per property (all arrays equally long).",
+    )
+
+    @model_validator(mode="after")
+    def _same_length(self) -> "ColumnarPredictionRequest":
+        lengths = {len(values) for values in self.data.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"All columns must have the same length, got {sorted(lengths)}.")
+        n_rows = lengths.pop() if lengths else 0
+        if not 1 <= n_rows <= MAX_BATCH_SIZE:
+            raise ValueError(f"Expected between 1 and {MAX_BATCH_SIZE} rows, got {n_rows}.")
+        return self
+
+
+class BatchPredictionItem(BaseModel):
+    index: int = Field(
+        ...,
+        description="Position of the item in the request list.",
+    )
+    prediction: Optional[float] = Field(
+        None,
+        description="Predicted property price in EUR (None if the item was invalid).",
+    )
+    price_per_m2: Optional[float] = Field(
+        None,
+        description="Derived price per m² = prediction / livable_surface.",
+    )
+    status_code: int = Field(
+        ...,
+        description="HTTP-like status code for this item (200 or 422).",
+    )
+    errors: Optional[List[Dict[str, Any]]] = Field(
+        None,
+        description="Validation errors for this item, if any.",
+    )
+    model_version: Optional[str] = Field(
+        None,
+        description="Model version that produced the prediction (None if the item was invalid).",
+    )
+
+
+class BatchPredictionResponse(BaseModel):
+    predictions: List[BatchPredictionItem] = Field(
+        ...,
+        description="One result per request item, in request order.",
+    )
+    n_success: int = Field(
+        ...,
+        description="Number of items that received a prediction.",
+    )
+    n_failed: int = Field(
+        ...,
+        description="Number of items rejected by validation.",
+    )
+    status_code: int = Field(
+        ...,
+        description="HTTP-like status code for the batch as a whole.",
+    )
+    model_version: Optional[str] = Field(
+        None,
+        description="Model version that scored the batch.",
+    )
+
+
+# 3) Validation helpers
+
+# Flat column names that belong inside the nested Location object
+_LOCATION_FIELDS = frozenset(Location.model_fields)
+
+def nest_location(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Flat record (CSV row, table row) -> property object.
+
+    - province, postcode, locality, region and country are moved into "location".
+    - Missing values (None or empty strings) are dropped so schema defaults apply.
+    """
+    item: Dict[str, Any] = {}
+    location: Dict[str, Any] = {}
+    for key, value in record.items():
+        if value is None or value == "":
+            continue
+        if key in _LOCATION_FIELDS:
+            location[key] = value
+        else:
+            item[key] = value
+    if location:
+        item["location"] = location
+    return item
+
+
+def validate_properties(
+    items: List[Dict[str, Any]],
+) -> Tuple[List[Tuple[int, PropertyFeatures]], Dict[int, List[Dict[str, Any]]]]:
+    """
+    Validate raw property objects one by one.
+
+    - Returns (index, PropertyFeatures) pairs for the valid items.
+    - Returns {index: errors} for the invalid ones, in a JSON-safe format
+      (loc / msg / type) so they can be sent back as-is.
+    """
+    valid: List[Tuple[int, PropertyFeatures]] = []
+    errors: Dict[int, List[Dict[str, Any]]] = {}
+
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, PropertyFeatures(**item)))
+        except ValidationError as exc:
+            errors[index] = [
+                {
+                    "loc": list(err["loc"]),
+                    "msg": err["msg"],
+                    "type": err["type"],
+                }
+                for err in exc.errors()
+            ]
+
+    return valid, errors
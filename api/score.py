@@ -0,0 +1,194 @@
+"""
+Offline batch scorer: price CSV / Parquet files without running the HTTP server.
+
+    python -m api.score listings.csv -o scored.csv --chunk-size 20000 --workers 4
+
+- Input columns are PropertyFeatures field names; province, postcode, locality,
+  region and country are folded into the location object (same as /predict/stream).
+- Rows are validated one by one, so invalid rows get status 422 + an error message
+  instead of stopping the run.
+- Chunks are scored in a process pool; the model is loaded once in the parent
+  and shared copy-on-write with forked workers.
+- Parquet needs the optional `pyarrow` package.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from api.predict import _load_model, score_columns
+from api.schemas import nest_location
+
+PARQUET_SUFFIXES = (".parquet", ".pq")
+
+
+def _is_parquet(path: Path) -> bool:
+    return path.suffix.lower() in PARQUET_SUFFIXES
+
+
+def _import_pyarrow_parquet():
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise SystemExit("Parquet files need the optional 'pyarrow' package (pip install pyarrow).") from exc
+    return pq
+
+
+def read_chunks(path: Path, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Yield the input file as DataFrames of at most chunk_size rows."""
+    if _is_parquet(path):
+        pq = _import_pyarrow_parquet()
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+def score_chunk(frame: pd.DataFrame) -> pd.DataFrame:
+    """Validate + score one chunk; returns the result columns aligned with the input rows."""
+    # NaN -> None so pydantic sees missing values, not floats
+    records = frame.astype(object).where(frame.notna(), None).to_dict(orient="records")
+    scored = score_columns([nest_location(record) for record in records])
+
+    status_codes = np.full(len(frame), 200)
+    status_codes[list(scored.errors)] = 422
+    errors = [None] * len(frame)
+    for position, item_errors in scored.errors.items():
+        errors[position] = json.dumps(item_errors)
+
+    return pd.DataFrame(
+        {
+            "prediction": scored.prices,
+            "price_per_m2": scored.price_per_m2,
+            "status_code": status_codes,
+            "error": errors,
+            "model_version": [scored.model_version if code == 200 else None for code in status_codes.tolist()],
+        },
+        index=frame.index,
+    )
+
+
+class _Writer:
+    """Append scored chunks to a CSV or Parquet output file."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._parquet_writer: Optional[Any] = None
+        self._wrote_header = False
+
+    def write(self, frame: pd.DataFrame) -> None:
+        if _is_parquet(self.path):
+            pq = _import_pyarrow_parquet()
+            import pyarrow as pa
+
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            self._parquet_writer.write_table(table)
+        else:
+            frame.to_csv(self.path, mode="a" if self._wrote_header else "w",
+                         header=not self._wrote_header, index=False)
+            self._wrote_header = True
+
+    def close(self) -> None:
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+
+def _init_worker() -> None:
+    # No-op after fork (model inherited); loads it once per worker under spawn
+    _load_model()
+
+
+def score_file(
+    input_path: Path,
+    output_path: Path,
+    chunk_size: int = 10_000,
+    workers: int = 1,
+    progress: bool = True,
+) -> Dict[str, Any]:
+    """
+    Score a whole file chunk by chunk and write input rows + result columns.
+
+    Returns a summary with row counts, elapsed time and throughput (rows/s).
+    """
+    start = time.perf_counter()
+    _load_model()  # load ONCE before forking so workers share it
+
+    writer = _Writer(output_path)
+    n_rows = n_ok = 0
+
+    def _emit(frame: pd.DataFrame, scored: pd.DataFrame) -> None:
+        nonlocal n_rows, n_ok
+        writer.write(pd.concat([frame, scored], axis=1))
+        n_rows += len(frame)
+        n_ok += int((scored["status_code"] == 200).sum())
+        if progress:
+            elapsed = time.perf_counter() - start
+            print(f"\r{n_rows:,} rows scored ({n_rows / elapsed:,.0f} rows/s)", end="", file=sys.stderr, flush=True)
+
+    try:
+        if workers <= 1:
+            for frame in read_chunks(input_path, chunk_size):
+                _emit(frame, score_chunk(frame))
+        else:
+            # WHY: bounded window of in-flight chunks keeps memory flat on huge files
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+                pending: Deque[Any] = deque()
+                for frame in read_chunks(input_path, chunk_size):
+                    pending.append((frame, pool.submit(score_chunk, frame)))
+                    if len(pending) >= 2 * workers:
+                        done_frame, future = pending.popleft()
+                        _emit(done_frame, future.result())
+                while pending:
+                    done_frame, future = pending.popleft()
+                    _emit(done_frame, future.result())
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    if progress:
+        print(file=sys.stderr)
+
+    return {
+        "input": str(input_path),
+        "output": str(output_path),
+        "rows": n_rows,
+        "scored": n_ok,
+        "failed": n_rows - n_ok,
+        "workers": workers,
+        "chunk_size": chunk_size,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(n_rows / elapsed, 1) if elapsed else None,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Score a CSV / Parquet file of properties offline.")
+    parser.add_argument("input", type=Path, help="Input .csv or .parquet file.")
+    parser.add_argument("-o", "--output", type=Path, default=None,
+                        help="Output .csv or .parquet file (default: <input>.scored.csv).")
+    parser.add_argument("--chunk-size", type=int, default=10_000, help="Rows per chunk (default 10000).")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (default: number of CPUs).")
+    parser.add_argument("--quiet", action="store_true", help="No progress output.")
+    args = parser.parse_args(argv)
+
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1.")
+    output = args.output or args.input.with_name(f"{args.input.stem}.scored.csv")
+
+    summary = score_file(args.input, output, args.chunk_size, args.workers, progress=not args.quiet)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
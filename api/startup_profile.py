@@ -0,0 +1,222 @@
+"""
+Start-up profile: where a cold start spends its time and memory.
+
+    python -m api.startup_profile -o startup-profile.json
+    python -m api.startup_profile --baseline startup-profile.json --threshold 0.2
+
+- Profiles the start-up in a fresh interpreter started with `-X importtime`
+  (CPython's own per-module import timer), in the phases of a real boot:
+  import api.app, model deserialization, warm-up (self-test prediction).
+- Per phase: wall time, RSS / PSS at its end, and the modules it imported
+  (self + cumulative time, nesting depth), also summed per top-level package.
+- The serving env vars of the current shell apply (IMMO_INFERENCE_ENGINE, ...)
+  and are recorded in the report.
+- With --baseline, phase times and RSS are compared with a saved report; the
+  command exits with status 1 when one grew by more than --threshold (and by
+  more than a small absolute floor, so tiny phases do not flag noise).
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from api.memory import process_memory
+
+PHASES = ("import_app", "model_load", "warm_up")
+# Imports before the first phase: interpreter start-up and this module
+_PRELUDE = "interpreter"
+_MARKER = "@@immo-startup-phase "
+
+# Growth below these is noise, whatever the ratio
+_MIN_SECONDS_DELTA = 0.05
+_MIN_RSS_DELTA = 5 * 1024 * 1024
+
+
+# 1) Child: the profiled start-up
+
+def _run_phase(name: str) -> Dict[str, Any]:
+    sys.stderr.write(f"\n{_MARKER}{name}\n")
+    sys.stderr.flush()
+    start = time.perf_counter()
+    # Imports inside the timed phases: the app's modules belong to import_app
+    if name == "import_app":
+        import api.app  # noqa: F401
+    elif name == "model_load":
+        from api.predict import _load_model
+
+        _load_model()
+    elif name == "warm_up":
+        from api.predict import warm_up
+
+        warm_up()
+    seconds = time.perf_counter() - start
+    return {"phase": name, "seconds": round(seconds, 4), "memory": process_memory()}
+
+
+def _child() -> None:
+    phases = [{"phase": _PRELUDE, "seconds": None, "memory": process_memory()}]
+    phases.extend(_run_phase(name) for name in PHASES)
+
+    from api.predict import model_status
+
+    status = model_status()
+    print(json.dumps({
+        "phases": phases,
+        "model": {key: status.get(key) for key in ("version", "load_seconds", "calibration_seconds", "warmup_seconds")},
+    }))
+
+
+# 2) Parent: run the child, parse -X importtime
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """
+    Modules from `-X importtime` output, in import order, tagged with their phase.
+
+    Lines look like "import time:       394 |      62194 |   joblib"; two spaces
+    of indentation per nesting level.
+    """
+    phase = _PRELUDE
+    modules = []
+    for line in stderr.splitlines():
+        if line.startswith(_MARKER):
+            phase = line[len(_MARKER):].strip()
+            continue
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # header line
+        name = parts[2].rstrip()
+        stripped = name.lstrip()
+        modules.append({
+            "module": stripped,
+            "phase": phase,
+            "self_us": int(parts[0]),
+            "cumulative_us": int(parts[1]),
+            "depth": (len(name) - len(stripped) - 1) // 2,
+        })
+    return modules
+
+
+def _packages(modules: List[Dict[str, Any]], top: int) -> Dict[str, float]:
+    """Self import time summed per top-level package, in seconds, largest first."""
+    totals: Dict[str, int] = defaultdict(int)
+    for module in modules:
+        totals[module["module"].split(".")[0]] += module["self_us"]
+    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {package: round(us / 1e6, 4) for package, us in ranked}
+
+
+def profile_startup(top: int = 15, timeout: float = 600.0) -> Dict[str, Any]:
+    """Run a profiled start-up in a fresh interpreter and build the report."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "api.startup_profile", "--child"],
+        capture_output=True, text=True, timeout=timeout,
+        cwd=Path(__file__).resolve().parent.parent,
+    )
+    if completed.returncode != 0:
+        tail = [line for line in completed.stderr.splitlines() if not line.startswith("import time:")][-20:]
+        raise RuntimeError("Profiled start-up failed:\n" + "\n".join(tail))
+
+    child = json.loads(completed.stdout.strip().splitlines()[-1])
+    modules = parse_importtime(completed.stderr)
+
+    phases = []
+    for phase in child["phases"]:
+        imported = [module for module in modules if module["phase"] == phase["phase"]]
+        memory = phase["memory"]
+        phases.append({
+            "phase": phase["phase"],
+            "seconds": phase["seconds"],
+            "rss_bytes": memory.get("rss"),
+            "pss_bytes": memory.get("pss"),
+            # Top-level imports only: their cumulative time already contains the nested ones
+            "import_seconds": round(sum(m["cumulative_us"] for m in imported if m["depth"] == 0) / 1e6, 4),
+            "n_modules": len(imported),
+            "packages": _packages(imported, top),
+        })
+
+    timed = [phase["seconds"] for phase in phases if phase["seconds"] is not None]
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {name: value for name, value in sorted(os.environ.items()) if name.startswith("IMMO_")},
+        "model": child["model"],
+        "total_seconds": round(sum(timed), 4),
+        "phases": phases,
+        "packages": _packages(modules, top),
+        "modules": modules,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """Phase time / RSS of `current` vs `baseline`; regressed = grew by more than threshold."""
+    before = {phase["phase"]: phase for phase in baseline.get("phases", [])}
+    rows = []
+    for phase in current["phases"]:
+        old = before.get(phase["phase"])
+        if old is None:
+            continue
+        for key, floor in (("seconds", _MIN_SECONDS_DELTA), ("rss_bytes", _MIN_RSS_DELTA)):
+            value, reference = phase.get(key), old.get(key)
+            if value is None or not reference:
+                continue
+            ratio = value / reference
+            rows.append({
+                "phase": phase["phase"],
+                "metric": key,
+                "baseline": reference,
+                "current": value,
+                "ratio": round(ratio, 3),
+                "regressed": ratio > 1 + threshold and value - reference > floor,
+            })
+    return rows
+
+
+def _print_summary(report: Dict[str, Any]) -> None:
+    print(f"{'phase':<12} {'seconds':>9} {'imports s':>10} {'modules':>8} {'RSS MB':>8}  top packages", file=sys.stderr)
+    for phase in report["phases"]:
+        seconds = f"{phase['seconds']:.3f}" if phase["seconds"] is not None else "-"
+        rss = f"{phase['rss_bytes'] / 2**20:.1f}" if phase["rss_bytes"] else "-"
+        packages = ", ".join(f"{name} {value:.2f}s" for name, value in list(phase["packages"].items())[:3])
+        print(f"{phase['phase']:<12} {seconds:>9} {phase['import_seconds']:>10.3f} {phase['n_modules']:>8} "
+              f"{rss:>8}  {packages}", file=sys.stderr)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Profile the API start-up (imports, model load, warm-up, memory).")
+    parser.add_argument("-o", "--output", type=Path, default=None, help="Write the JSON report here (else stdout).")
+    parser.add_argument("--baseline", type=Path, default=None, help="Saved report to compare with.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed growth per phase (0.2 = 20%%).")
+    parser.add_argument("--top", type=int, default=15, help="Packages listed per phase.")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        _child()
+        return 0
+
+    report = profile_startup(args.top)
+    _print_summary(report)
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2))
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.baseline is None:
+        return 0
+    rows = compare(report, json.loads(args.baseline.read_text()), args.threshold)
+    for row in rows:
+        flag = "  REGRESSED" if row["regressed"] else ""
+        print(f"{row['phase']:<12} {row['metric']:<10} x{row['ratio']:.2f}{flag}", file=sys.stderr)
+    return 1 if any(row["regressed"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
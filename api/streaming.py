@@ -0,0 +1,246 @@
+import codecs
+import csv
+import json
+import zlib
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Union
+
+from fastapi.responses import StreamingResponse
+from starlette.requests import ClientDisconnect
+
+from api import config
+from api.admission import Overloaded
+from api.encoding import dumps, prediction_rows
+from api.predict import score_columns
+from api.schemas import nest_location
+
+STREAM_FORMATS = ("ndjson", "csv")
+
+# Upper bound on bytes inflated from one gzip chunk (protects against zip bombs)
+_MAX_INFLATE_BYTES = 1 << 20
+
+
+class _ParseError:
+    """Placeholder for a line that could not be parsed into a property object."""
+
+    def __init__(self, message: str) -> None:
+        self.message = message
+
+
+def _inflate(decompressor: Any, chunk: bytes) -> Iterator[bytes]:
+    """Decompress one gzip chunk in bounded pieces."""
+    data = decompressor.decompress(chunk, _MAX_INFLATE_BYTES)
+    while data:
+        yield data
+        tail = decompressor.unconsumed_tail
+        data = decompressor.decompress(tail, _MAX_INFLATE_BYTES) if tail else b""
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], gzipped: bool = False,
+                     max_line_length: Optional[int] = None) -> AsyncIterator[Union[str, _ParseError]]:
+    """
+    Turn a request body stream into text lines without reading it all.
+
+    - Optionally gunzips the body (Content-Encoding: gzip).
+    - Decodes UTF-8 incrementally, so multi-byte characters may span chunks.
+    - A line longer than max_line_length (default IMMO_STREAM_MAX_LINE_LENGTH)
+      is never held in memory: it is skipped up to its newline and yielded
+      as a _ParseError instead.
+    """
+    if max_line_length is None:
+        max_line_length = config.STREAM_MAX_LINE_LENGTH
+    too_long = f"Line is longer than {max_line_length} characters."
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzipped else None
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    skipping = False  # inside a line already reported as too long
+
+    async for chunk in chunks:
+        pieces = _inflate(decompressor, chunk) if decompressor is not None else [chunk]
+        for piece in pieces:
+            text = decoder.decode(piece)
+            if skipping:
+                end = text.find("\n")
+                if end < 0:
+                    continue
+                text, skipping = text[end + 1:], False
+            pending += text
+            *lines, pending = pending.split("\n")
+            for line in lines:
+                yield _ParseError(too_long) if len(line) > max_line_length else line.rstrip("\r")
+            if len(pending) > max_line_length:
+                yield _ParseError(too_long)
+                pending, skipping = "", True
+
+    if skipping:
+        return
+    if decompressor is not None:
+        pending += decoder.decode(decompressor.flush())
+    pending += decoder.decode(b"", final=True)
+    if len(pending) > max_line_length:
+        yield _ParseError(too_long)
+    elif pending:
+        yield pending.rstrip("\r")
+
+
+def parse_ndjson_line(line: str) -> Dict[str, Any]:
+    """One property per line, either bare or wrapped as {"data": {...}} like /predict."""
+    item = json.loads(line)
+    if not isinstance(item, dict):
+        raise ValueError("Each NDJSON line must be a JSON object.")
+    if set(item) == {"data"} and isinstance(item["data"], dict):
+        return item["data"]
+    return item
+
+
+def parse_csv_row(header: List[str], line: str) -> Dict[str, Any]:
+    """
+    Flat CSV row -> property object.
+
+    - Column names are PropertyFeatures fields; province, postcode, locality,
+      region and country are nested into "location".
+    - Empty cells are treated as missing; pydantic converts the text values.
+    - Quoted fields cannot contain line breaks (rows are read line by line).
+    """
+    values = next(csv.reader([line]))
+    if len(values) != len(header):
+        raise ValueError(f"Expected {len(header)} CSV columns, got {len(values)}.")
+
+    return nest_location(dict(zip(header, values)))
+
+
+# run(fn, *args) awaits fn(*args) off the event loop (the app's InferenceExecutor.run)
+Runner = Callable[..., Awaitable[Any]]
+
+
+async def _score_chunk(records: List[Any], start_index: int, run: Runner) -> bytes:
+    """Score one chunk through run() and encode the results as NDJSON."""
+    positions = [offset for offset, record in enumerate(records) if not isinstance(record, _ParseError)]
+    scored = await run(score_columns, [records[offset] for offset in positions])
+
+    lines: List[bytes] = [b""] * len(records)
+    for offset, line in zip(positions, prediction_rows(scored, [start_index + offset for offset in positions])):
+        lines[offset] = line
+    for offset, record in enumerate(records):
+        if isinstance(record, _ParseError):
+            lines[offset] = dumps({
+                "index": start_index + offset,
+                "prediction": None,
+                "price_per_m2": None,
+                "status_code": 400,
+                "errors": [{"loc": [], "msg": record.message, "type": "parse_error"}],
+                "model_version": None,
+            })
+
+    return b"\n".join(lines) + b"\n"
+
+
+async def score_stream(
+    lines: AsyncIterator[Union[str, _ParseError]],
+    input_format: str,
+    chunk_size: int,
+    run: Runner,
+) -> AsyncIterator[bytes]:
+    """
+    Validate + score records in fixed-size chunks and yield NDJSON results.
+
+    - Only one chunk is held in memory at a time, whatever the input size.
+    - Each chunk is one call of run(), so streams share the inference
+      admission limits with every other endpoint.
+    - Overloaded on the first chunk is raised (nothing is sent yet); later, it
+      ends the stream with an error line telling where to resume.
+    """
+    header: Optional[List[str]] = None
+    records: List[Any] = []
+    start_index = 0
+
+    try:
+        async for line in lines:
+            if isinstance(line, _ParseError):
+                # Over-long line (iter_lines): reported in place, like any unparsable line
+                records.append(line)
+            elif not line.strip():
+                continue
+
+            elif input_format == "csv" and header is None:
+                header = [name.strip() for name in next(csv.reader([line]))]
+                continue
+            else:
+                try:
+                    if input_format == "csv":
+                        records.append(parse_csv_row(header, line))
+                    else:
+                        records.append(parse_ndjson_line(line))
+                except (ValueError, csv.Error) as exc:
+                    records.append(_ParseError(str(exc)))
+
+            if len(records) >= chunk_size:
+                yield await _score_chunk(records, start_index, run)
+                start_index += len(records)
+                records = []
+
+        if records:
+            yield await _score_chunk(records, start_index, run)
+
+    except ClientDisconnect:
+        # Client went away: nobody left to report to
+        raise
+    except Overloaded as exc:
+        if start_index == 0:
+            raise
+        yield dumps({
+            "status_code": config.OVERLOAD_STATUS,
+            "error": "Server is busy, retry later.",
+            "retry_after": exc.retry_after,
+            "resume_from_index": start_index,
+        }) + b"\n"
+    except Exception as exc:
+        # WHY: headers are already sent, so report the failure as a final NDJSON line
+        yield dumps({
+            "status_code": 500,
+            "error": "Streaming prediction failed.",
+            "details": str(exc),
+        }) + b"\n"
+
+
+async def start_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """
+    Compute the first chunk now and return the whole stream.
+
+    WHY: an error before the first chunk (e.g. Overloaded) can still become a
+    plain error response; once streaming, the status line is already sent.
+    """
+    try:
+        first: Optional[bytes] = await chunks.__anext__()
+    except StopAsyncIteration:
+        first = None
+
+    async def resumed() -> AsyncIterator[bytes]:
+        if first is not None:
+            yield first
+            async for chunk in chunks:
+                yield chunk
+
+    return resumed()
+
+
+async def gzip_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Gzip a byte stream, flushing after every chunk so results keep flowing."""
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+class BodyStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse for endpoints that keep reading the request body while responding.
+
+    Starlette's default implementation watches for client disconnects by calling
+    receive() in parallel, which steals body messages from request.stream() and
+    stalls the upload. Here the body reader itself notices a disconnect.
+    """
+
+    async def __call__(self, scope: Any, receive: Any, send: Any) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
@@ -0,0 +1,72 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api import app as app_module
+from api.admission import DeadlineExceeded, InferenceExecutor, Overloaded
+from api.app import app
+from api.test_api import VALID_PROPERTY
+
+client = TestClient(app)
+
+
+def test_full_executor_fails_fast() -> None:
+    executor = InferenceExecutor(max_concurrency=1, max_queue=1)
+    release = threading.Event()
+    running = executor.submit(release.wait)
+    queued = executor.submit(lambda: "queued")
+
+    with pytest.raises(Overloaded) as info:
+        executor.submit(lambda: "refused")
+    assert info.value.retry_after >= 1
+    assert executor.stats()["rejected"] == 1
+
+    release.set()
+    assert running.result(timeout=5) is True
+    assert queued.result(timeout=5) == "queued"
+    executor.shutdown()
+
+
+def test_expired_work_is_dropped_not_computed() -> None:
+    executor = InferenceExecutor(max_concurrency=1, max_queue=4)
+    release = threading.Event()
+    calls = []
+    blocker = executor.submit(release.wait)
+
+    async def late_request() -> None:
+        await executor.run(calls.append, "computed", deadline=time.monotonic() + 0.05)
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(late_request())
+    release.set()
+    blocker.result(timeout=5)
+    executor.shutdown()
+
+    assert calls == []
+    assert executor.stats()["expired"] == 1
+
+
+def test_predict_returns_503_with_retry_after_when_saturated(monkeypatch) -> None:
+    busy = InferenceExecutor(max_concurrency=1, max_queue=0)
+    release = threading.Event()
+    busy.submit(release.wait)
+    monkeypatch.setattr(app_module, "_EXECUTOR", busy)
+    try:
+        res = client.post("/predict", json={"data": VALID_PROPERTY})
+    finally:
+        release.set()
+        busy.shutdown()
+
+    assert res.status_code == 503
+    assert int(res.headers["retry-after"]) >= 1
+    assert res.json()["detail"]["error"] == "Server is busy, retry later."
+
+
+def test_admission_stats() -> None:
+    client.post("/predict", json={"data": VALID_PROPERTY}, headers={"X-Request-Timeout": "5"})
+    stats = client.get("/stats/admission").json()
+    assert stats["enabled"] is True
+    assert stats["completed"] >= 1
@@ -1,30 +1,160 @@
+import threading
+
+import pytest
 from fastapi.testclient import TestClient
+from api import app as app_module
+from api import config
+from api import predict as predict_module
 from api.app import app
-from api.schemas import PropertyRequest
+from api.corpus import random_corpus
+from api.predict import predict_prices
 
 # WHY: allow reviewers to see a real test interacting with the API
 client = TestClient(app)
 
+VALID_PROPERTY = {
+    "property_type": "house",
+    "subtype_of_property": "bungalow",
+    "location": {
+        "province": "Antwerpen",
+        "postcode": 2000,
+        "locality": "Antwerpen"
+    },
+    "number_of_bedrooms": 3,
+    "livable_surface": 120,
+    "total_land_surface": 300
+}
+
 def test_health() -> None:
     res = client.get("/")
     assert res.status_code == 200
     assert res.json()["status"] == "alive"
 
 def test_predict_valid() -> None:
-    payload = {
-        "data": {
-            "property_type": "house",
-            "subtype_of_property": "bungalow",
-            "location": {
-                "province": "Antwerpen",
-                "postcode": 2000,
-                "locality": "Antwerpen"
-            },
-            "Number of bedrooms": 3,
-            "Livable surface": 120,
-            "Total land surface": 300
-        }
-    }
+    payload = {"data": VALID_PROPERTY}
     res = client.post("/predict", json=payload)
     assert res.status_code == 200
     assert "prediction" in res.json()
+
+# Neighbours that set the categorical fields VALID_PROPERTY leaves empty
+CATEGORICAL_NEIGHBOURS = [
+    {**VALID_PROPERTY, "kitchen_type": "installed", "state_of_property": "good", "availability": "immediately"},
+    {**VALID_PROPERTY, "livable_surface": 80, "garden": True, "type_of_heating": "gas", "type_of_glazing": "double",
+     "kitchen_equipment": "installed"},
+    {**VALID_PROPERTY, "number_of_bedrooms": None, "state_of_property": "as new"},
+]
+
+@pytest.mark.parametrize("engine", ["sklearn", "auto"])
+def test_predict_batch_matches_single(monkeypatch, engine: str) -> None:
+    monkeypatch.setattr(config, "INFERENCE_ENGINE", engine)
+    monkeypatch.setattr(predict_module, "_CACHE", None)
+    monkeypatch.setattr(predict_module, "_SERVING", None)
+    monkeypatch.setattr(predict_module, "_MODEL_STATUS", dict(predict_module._MODEL_STATUS))
+    items = [VALID_PROPERTY, *CATEGORICAL_NEIGHBOURS]
+    items += [feature.model_dump() for feature in random_corpus(40, seed=11)]
+
+    res = client.post("/predict/batch", json={"data": items})
+    assert res.status_code == 200
+    body = res.json()
+    assert body["n_success"] == len(items)
+    assert [item["index"] for item in body["predictions"]] == list(range(len(items)))
+
+    for item, predicted in zip(items, body["predictions"]):
+        single = client.post("/predict", json={"data": item})
+        assert single.status_code == 200
+        assert predicted["prediction"] == single.json()["prediction"]
+
+def test_predict_batch_reports_invalid_items() -> None:
+    invalid = {**VALID_PROPERTY, "livable_surface": 0}
+    res = client.post("/predict/batch", json={"data": [invalid, VALID_PROPERTY]})
+    assert res.status_code == 200
+    body = res.json()
+    assert body["n_success"] == 1
+    assert body["n_failed"] == 1
+    assert body["predictions"][0]["status_code"] == 422
+    assert body["predictions"][0]["errors"][0]["loc"] == ["livable_surface"]
+    assert body["predictions"][1]["prediction"] is not None
+
+def test_predict_prices_empty() -> None:
+    assert predict_prices([]) == []
+
+def test_ready_after_startup(monkeypatch) -> None:
+    # Entering the client runs the lifespan hook (eager load + self-test)
+    monkeypatch.setattr(config, "BACKGROUND_WARMUP", False)
+    with TestClient(app) as started:
+        res = started.get("/ready")
+    assert res.status_code == 200
+    body = res.json()
+    assert body["ready"] is True
+    assert body["load_seconds"] is not None
+    assert body["warmup_seconds"] is not None
+    assert (body["calibration_seconds"] is not None) == (body["engine"] == "auto")
+
+def test_root_answers_while_warming_up(monkeypatch) -> None:
+    release, warmed = threading.Event(), threading.Event()
+
+    def slow_warm_up():
+        release.wait(10)
+        warmed.set()
+
+    monkeypatch.setattr(config, "BACKGROUND_WARMUP", True)
+    monkeypatch.setattr(app_module, "warm_up", slow_warm_up)
+    with TestClient(app) as started:
+        assert started.get("/").status_code == 200
+        assert not warmed.is_set()
+        release.set()
+        assert warmed.wait(10)
+
+def test_concurrent_first_load_is_single_flight(monkeypatch) -> None:
+    calls = []
+    real_load = predict_module.joblib.load
+
+    def counting_load(*args, **kwargs):
+        calls.append(1)
+        return real_load(*args, **kwargs)
+
+    monkeypatch.setattr(predict_module, "_SERVING", None)
+    monkeypatch.setattr(predict_module.joblib, "load", counting_load)
+
+    threads = [threading.Thread(target=predict_module._load_model) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+
+
+def test_model_is_self_tested_before_it_serves(monkeypatch) -> None:
+    served_during_self_test = []
+    real_self_test = predict_module._self_test
+
+    def watching_self_test(serving):
+        served_during_self_test.append(predict_module._SERVING is serving)
+        return real_self_test(serving)
+
+    monkeypatch.setattr(predict_module, "_SERVING", None)
+    monkeypatch.setattr(predict_module, "_MODEL_STATUS", dict(predict_module._MODEL_STATUS))
+    monkeypatch.setattr(predict_module, "_self_test", watching_self_test)
+
+    status = predict_module.warm_up()
+
+    assert served_during_self_test == [False]
+    assert status["ready"] and predict_module._SERVING is not None
+
+def test_memory_stats_reports_this_worker() -> None:
+    res = client.get("/stats/memory")
+    assert res.status_code == 200
+    body = res.json()
+    assert body["pid"] > 0
+    if body["available"]:
+        assert body["rss"] > 0
+
+def test_repeated_prediction_is_served_from_cache() -> None:
+    payload = {"data": {**VALID_PROPERTY, "livable_surface": 137}}
+    first = client.post("/predict", json=payload).json()
+    hits_before = client.get("/stats/cache").json()["hits"]
+    second = client.post("/predict", json=payload).json()
+
+    assert second["prediction"] == first["prediction"]
+    assert client.get("/stats/cache").json()["hits"] == hits_before + 1
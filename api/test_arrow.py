@@ -0,0 +1,131 @@
+import io
+import json
+from typing import Any, Dict, List
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from api import config
+from api import predict as predict_module
+from api.app import app
+from api.columnar import COLUMN_SPECS, check_column
+from api.corpus import random_corpus
+from api.features import FEATURE_COLUMNS
+from api.schemas import nest_location
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+client = TestClient(app)
+
+
+def _rows(n: int) -> List[Dict[str, Any]]:
+    rows = []
+    for features in random_corpus(n, seed=5):
+        row = features.model_dump(mode="json", exclude_none=True)
+        row.update(row.pop("location"))
+        rows.append(row)
+    return rows
+
+
+def _columns(rows: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    names = sorted(set().union(*rows))
+    return {name: [row.get(name) for row in rows] for name in names}
+
+
+def _ipc(table: Any) -> bytes:
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def test_arrow_stream_matches_columnar_endpoint(monkeypatch) -> None:
+    monkeypatch.setattr(config, "POSTCODE_CHECK", "strict")
+    rows = _rows(150)
+    rows[3]["livable_surface"] = 0  # ge=1
+    rows[7]["province"] = "Limburg"  # postcode 2000 lies in Antwerpen
+    columns = _columns(rows)
+    expected = client.post("/predict/columns", json={"data": columns}).json()
+
+    response = client.post("/predict/arrow", content=_ipc(pa.table(columns)),
+                           headers={"Content-Type": "application/vnd.apache.arrow.stream"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+
+    result = pa.ipc.open_stream(response.content).read_all()
+    assert result.schema.metadata[b"model_version"].decode() == expected["model_version"]
+    assert result.column_names == ["index", "prediction", "price_per_m2", "status_code", "errors"]
+    assert result.to_pydict()["prediction"] == [item["prediction"] for item in expected["predictions"]]
+    assert result.to_pydict()["status_code"] == [item["status_code"] for item in expected["predictions"]]
+    errors = result.to_pydict()["errors"]
+    assert json.loads(errors[3]) == expected["predictions"][3]["errors"]
+    assert json.loads(errors[7]) == expected["predictions"][7]["errors"]
+    assert errors[0] is None
+
+
+def test_parquet_with_model_column_names_and_nulls() -> None:
+    rows = _rows(80)
+    columns = _columns(rows)
+    expected = client.post("/predict/columns", json={"data": columns}).json()
+
+    # "Livable surface", "Postcode", ...; integer columns with nulls become float64 + NaN
+    renamed = {attribute: column for column, attribute in FEATURE_COLUMNS.items()}
+    renamed.update(postcode="Postcode", province="Province", locality="Locality")
+    table = pa.table({renamed.get(name, name): values for name, values in columns.items()})
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer)
+
+    response = client.post("/predict/arrow", content=buffer.getvalue(), headers={"Accept": "application/json"})
+    assert response.status_code == 200
+    assert response.json() == expected
+
+
+def test_arrow_rows_score_like_single_requests(monkeypatch) -> None:
+    monkeypatch.setattr(predict_module, "_CACHE", None)
+    base = {"property_type": "house", "livable_surface": 120, "province": "Antwerpen", "postcode": 2000,
+            "locality": "Antwerpen"}
+    # Categorical columns where some rows hold a string and others null
+    rows = [base,
+            {**base, "kitchen_type": "installed", "state_of_property": "good", "availability": "immediately"},
+            {**base, "type_of_heating": "gas", "type_of_glazing": "double", "kitchen_equipment": "installed"},
+            {**base, "livable_surface": 80, "state_of_property": "as new"}]
+    columns = _columns(rows)
+
+    response = client.post("/predict/arrow", content=_ipc(pa.table(columns)), headers={"Accept": "application/json"})
+    assert response.status_code == 200
+    prices = [item["prediction"] for item in response.json()["predictions"]]
+    for i, (row, price) in enumerate(zip(rows, prices)):
+        # Alone, a column of this row may be all null (Arrow type null)
+        alone = pa.table({name: values[i:i + 1] for name, values in columns.items()})
+        single = client.post("/predict/arrow", content=_ipc(alone), headers={"Accept": "application/json"})
+        assert single.json()["predictions"][0]["prediction"] == price
+        assert client.post("/predict", json={"data": nest_location(row)}).json()["prediction"] == price
+
+
+def test_typed_arrays_are_checked_like_objects() -> None:
+    specs = {spec.name: spec for spec in COLUMN_SPECS}
+    for name, values in [
+        ("livable_surface", [120.0, 0.0, np.nan, 2.5, 80.0]),
+        ("postcode", [2000, 999, 10000, 3500, 9999]),
+        ("number_of_garages_numeric", [1.5, -0.5, np.nan, 0.0, 2.0]),
+    ]:
+        typed = np.array(values)
+        objects = np.array([None if value != value else value for value in typed.tolist()], dtype=object)
+        converted, typed_errors = check_column(specs[name], typed)
+        _, object_errors = check_column(specs[name], objects)
+
+        assert converted is typed  # no copy
+        assert [(error.type, error.rows.tolist()) for error in typed_errors] == \
+               [(error.type, error.rows.tolist()) for error in object_errors]
+
+
+def test_bad_bodies_are_rejected(monkeypatch) -> None:
+    table = pa.table(_columns(_rows(5)))
+    assert client.post("/predict/arrow", content=b"not arrow").status_code == 400
+    assert client.post("/predict/arrow?format=orc", content=_ipc(table)).status_code == 400
+    assert client.post("/predict/arrow", content=_ipc(pa.table({"foo": [1, 2]}))).status_code == 400
+
+    monkeypatch.setattr(config, "ARROW_MAX_ROWS", 4)
+    assert client.post("/predict/arrow", content=_ipc(table)).status_code == 413
@@ -0,0 +1,93 @@
+import threading
+from typing import List
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api import app as app_module
+from api import predict as predict_module
+from api.admission import InferenceExecutor
+from api.app import app
+from api.batching import MicroBatcher
+from api.corpus import random_corpus
+from api.predict import predict_price, predict_prices_with_version
+from api.schemas import PropertyFeatures
+from api.test_api import CATEGORICAL_NEIGHBOURS, VALID_PROPERTY
+
+
+def _features(livable_surface: int) -> PropertyFeatures:
+    return PropertyFeatures(**{**VALID_PROPERTY, "livable_surface": livable_surface})
+
+
+def test_batcher_matches_predict_price() -> None:
+    calls: List[int] = []
+
+    def predict_fn(batch: List[PropertyFeatures]) -> List[float]:
+        calls.append(len(batch))
+        return [predict_price(features) for features in batch]
+
+    batcher = MicroBatcher(predict_fn, max_batch_size=8, max_wait_ms=200)
+    items = [_features(50 + 10 * i) for i in range(8)]
+    results: List[float] = [0.0] * len(items)
+
+    def worker(i: int) -> None:
+        results[i] = batcher.predict(items[i])
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(items))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    batcher.stop()
+
+    assert results == [predict_price(features) for features in items]
+    stats = batcher.stats()
+    assert stats["items"] == len(items)
+    assert stats["batches"] == len(calls)
+    assert stats["max_observed_batch_size"] > 1
+
+
+def test_batcher_propagates_model_errors() -> None:
+    def predict_fn(batch: List[PropertyFeatures]) -> List[float]:
+        raise RuntimeError("model exploded")
+
+    batcher = MicroBatcher(predict_fn, max_batch_size=4, max_wait_ms=1)
+    future = batcher.submit(_features(100))
+    with pytest.raises(RuntimeError, match="model exploded"):
+        future.result(timeout=5)
+    batcher.stop()
+    assert batcher.stats()["failed_batches"] == 1
+
+
+def test_batcher_rejects_invalid_settings() -> None:
+    with pytest.raises(ValueError):
+        MicroBatcher(lambda batch: [], max_batch_size=0)
+
+
+def test_batched_requests_match_solo_requests(monkeypatch) -> None:
+    monkeypatch.setattr(predict_module, "_CACHE", None)
+    items = [VALID_PROPERTY, *CATEGORICAL_NEIGHBOURS]
+    items += [features.model_dump() for features in random_corpus(13, seed=14)]
+
+    with TestClient(app) as client:
+        solo = [client.post("/predict", json={"data": item}).json() for item in items]
+
+        batcher = MicroBatcher(predict_prices_with_version, max_batch_size=8, max_wait_ms=100)
+        monkeypatch.setattr(app_module, "_BATCHER", batcher)
+        monkeypatch.setattr(app_module, "_EXECUTOR", InferenceExecutor(max_concurrency=8, max_queue=32))
+        batched: List[dict] = [{}] * len(items)
+
+        def worker(i: int) -> None:
+            batched[i] = client.post("/predict", json={"data": items[i]}).json()
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(items))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        batcher.stop()
+        app_module._EXECUTOR.shutdown()
+
+    assert [body["prediction"] for body in batched] == [body["prediction"] for body in solo]
+    assert [body["model_version"] for body in batched] == [body["model_version"] for body in solo]
+    assert batcher.stats()["max_observed_batch_size"] > 1
@@ -0,0 +1,61 @@
+import time
+
+from api import predict as predict_module
+from api.cache import PredictionCache, feature_key
+from api.corpus import random_corpus
+from api.predict import predict_prices
+
+
+def test_key_ignores_field_order_but_not_model_version() -> None:
+    a = {"Livable surface": 120, "Garage": True}
+    b = {"Garage": True, "Livable surface": 120}
+    assert feature_key(a, "v1") == feature_key(b, "v1")
+    assert feature_key(a, "v1") != feature_key(a, "v2")
+    assert feature_key(a, "v1") != feature_key({**a, "Garage": None}, "v1")
+
+
+def test_lru_eviction_and_counters() -> None:
+    cache = PredictionCache(max_size=2, ttl_seconds=0)
+    cache.put("a", 1.0)
+    cache.put("b", 2.0)
+    assert cache.get("a") == 1.0  # "b" is now least recently used
+    cache.put("c", 3.0)
+
+    assert cache.get("b") is None
+    assert cache.get("c") == 3.0
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+
+
+def test_ttl_expiry() -> None:
+    cache = PredictionCache(max_size=10, ttl_seconds=0.01)
+    cache.put("a", 1.0)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_model_change_invalidates_entries() -> None:
+    cache = PredictionCache(max_size=10)
+    cache.bind_model("v1")
+    cache.put("a", 1.0)
+    cache.bind_model("v1")
+    assert cache.get("a") == 1.0
+    cache.bind_model("v2")
+    assert cache.get("a") is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_cached_prices_match_uncached(monkeypatch) -> None:
+    corpus = random_corpus(30, seed=12)
+    monkeypatch.setattr(predict_module, "_CACHE", None)
+    uncached = [predict_prices([features])[0] for features in corpus]
+
+    cache = PredictionCache(max_size=100)
+    monkeypatch.setattr(predict_module, "_CACHE", cache)
+    # Filled from one batch, read back one row at a time: the key holds no batch context
+    assert predict_prices(corpus) == uncached
+    assert [predict_prices([features])[0] for features in corpus] == uncached
+    assert cache.stats()["hits"] == len(corpus)
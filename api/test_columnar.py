@@ -0,0 +1,116 @@
+from typing import Any, Dict, List
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from api import config
+from api import predict as predict_module
+from api.app import app
+from api.columnar import COLUMN_SPECS, score_columnar
+from api.corpus import random_corpus
+from api.predict import score_columns
+from api.schemas import MAX_BATCH_SIZE, nest_location
+
+client = TestClient(app)
+
+BASE_ROW = {"property_type": "house", "livable_surface": 120, "province": "Antwerpen",
+            "postcode": 2000, "locality": "Antwerpen"}
+
+# Values pydantic accepts or rejects (lax mode), per kind of field
+VARIATIONS = {
+    "number_of_bedrooms": [3, "3", 3.0, " 4 ", "3.0", True, 2.5, -1, "x", [1]],
+    "number_of_facades": [1, 4, 0, 5],
+    "livable_surface": [1, 0, None, "12"],
+    "number_of_garages_numeric": [1.5, "2.5", -0.5, "x"],
+    "garden": [True, False, "yes", "N", "TRUE", 1, 0, 1.0, 2, 0.5, "maybe", "1.0"],
+    "property_type": ["house", "", 5, None, True],
+    "postcode": [2000, 999, 10000, "2000"],
+    "province": ["Anvers", "Limburg", ""],
+    "region": ["Vlaanderen", "Wallonië"],
+}
+
+
+def _rows() -> List[Dict[str, Any]]:
+    rows = []
+    for column, values in VARIATIONS.items():
+        rows.extend({**BASE_ROW, column: value} for value in values)
+    return rows
+
+
+def _columns(rows: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    names = sorted(set().union(*rows))
+    return {name: [row.get(name) for row in rows] for name in names}
+
+
+def test_specs_follow_the_schema() -> None:
+    specs = {spec.name: spec for spec in COLUMN_SPECS}
+    assert specs["postcode"].kind is int and (specs["postcode"].ge, specs["postcode"].le) == (1000, 9999)
+    assert specs["livable_surface"].required and specs["livable_surface"].ge == 1
+    assert specs["garden"].kind is bool and not specs["garden"].required
+    assert specs["property_type"].min_length == 1
+
+
+@pytest.mark.parametrize("postcode_check", ["fill", "strict"])
+def test_validation_matches_pydantic(monkeypatch, postcode_check: str) -> None:
+    monkeypatch.setattr(config, "POSTCODE_CHECK", postcode_check)
+    rows = _rows()
+    expected = score_columns([nest_location(row) for row in rows])
+    scored = score_columnar(_columns(rows))
+
+    assert sorted(scored.errors) == sorted(expected.errors)
+    for index, errors in scored.errors.items():
+        # Postcode checks are a Location-level validator in the schema
+        fields = {"location" if error["type"] == "value_error" else error["loc"][-1] for error in errors}
+        assert fields == {error["loc"][-1] for error in expected.errors[index]}
+    np.testing.assert_array_equal(scored.prices, expected.prices)
+
+
+def test_predictions_match_batch_endpoint() -> None:
+    rows = []
+    for features in random_corpus(200, seed=11):
+        row = features.model_dump(mode="json", exclude_none=True)
+        row.update(row.pop("location"))
+        rows.append(row)
+
+    columnar = client.post("/predict/columns", json={"data": _columns(rows)})
+    batch = client.post("/predict/batch", json={"data": [nest_location(row) for row in rows]})
+
+    assert columnar.status_code == 200
+    assert columnar.json() == batch.json()
+
+
+# Categorical columns where some rows hold a string and others nothing
+MIXED_CATEGORIES = [
+    BASE_ROW,
+    {**BASE_ROW, "kitchen_type": "installed", "state_of_property": "good", "availability": "immediately"},
+    {**BASE_ROW, "type_of_heating": "gas", "type_of_glazing": "double", "kitchen_equipment": "installed"},
+    {**BASE_ROW, "livable_surface": 80, "state_of_property": "as new"},
+]
+
+
+def test_columnar_rows_score_like_single_requests(monkeypatch) -> None:
+    monkeypatch.setattr(predict_module, "_CACHE", None)
+    rows = MIXED_CATEGORIES + [{**BASE_ROW, "livable_surface": surface} for surface in (60, 250)]
+
+    columnar = client.post("/predict/columns", json={"data": _columns(rows)})
+    batch = client.post("/predict/batch", json={"data": [nest_location(row) for row in rows]})
+
+    assert columnar.status_code == batch.status_code == 200
+    prices = [item["prediction"] for item in columnar.json()["predictions"]]
+    assert prices == [item["prediction"] for item in batch.json()["predictions"]]
+    names = sorted(set().union(*rows))
+    for row, price in zip(rows, prices):
+        # Alone, a column of this row may hold nothing but None
+        alone = client.post("/predict/columns", json={"data": {name: [row.get(name)] for name in names}})
+        assert alone.json()["predictions"][0]["prediction"] == price
+        assert client.post("/predict", json={"data": nest_location(row)}).json()["prediction"] == price
+
+
+@pytest.mark.parametrize("data", [
+    {"livable_surface": [120, 80], "postcode": [2000]},
+    {"livable_surface": []},
+    {"livable_surface": [1] * (MAX_BATCH_SIZE + 1)},
+])
+def test_malformed_tables_are_rejected(data) -> None:
+    assert client.post("/predict/columns", json={"data": data}).status_code == 422
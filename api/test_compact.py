@@ -0,0 +1,113 @@
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from api import compact as compact_module
+from api import predict as predict_module
+from api.compact import DEFAULT_MAX_DEVIATION, compact_model, errors, load_eval_set
+from api.corpus import random_corpus
+from api.forest import CompiledForest, CompiledPipeline
+from api.predict import _load_model, cache_disabled, predict_price, preprocess_for_model
+from api.schemas import PropertyFeatures
+
+
+def _frame(n: int, seed: int) -> pd.DataFrame:
+    return pd.DataFrame([preprocess_for_model(f) for f in random_corpus(n, seed=seed)])
+
+
+def test_float32_forest_keeps_split_decisions() -> None:
+    model = _load_model()
+    compiled = CompiledPipeline.from_model(model)
+    Xt = compiled.transform(_frame(300, seed=6))
+    small = CompiledForest.from_estimator(compiled.estimator, dtype=np.float32)
+
+    assert small.nbytes < compiled.forest.nbytes
+    # Only the float32 leaf values differ, never the path through a tree
+    np.testing.assert_allclose(small.predict(Xt), compiled.estimator.predict(Xt), rtol=1e-6)
+
+
+def test_depth_cap_and_tree_subset_shrink_the_forest() -> None:
+    estimator = CompiledPipeline.from_model(_load_model()).estimator
+    full = CompiledForest.from_estimator(estimator)
+    capped = CompiledForest.from_estimator(estimator, max_depth=6, trees=[0, 1, 2])
+
+    assert capped.n_trees == 3
+    assert capped.max_depth <= 6
+    assert capped.n_nodes < full.n_nodes
+
+
+def test_compact_model_meets_budget_and_is_served(tmp_path, monkeypatch) -> None:
+    model = _load_model()
+    X = _frame(600, seed=7)
+    compact, summary = compact_model(model, X, max_deviation=2.0)
+
+    assert isinstance(compact, CompiledPipeline)
+    assert compact.forest.n_nodes < CompiledPipeline.from_model(model).forest.n_nodes
+    assert summary["check_half"]["deviation_pct"] <= 2.0
+
+    holdout = _frame(200, seed=8)
+    result = errors(compact.predict(holdout), model.predict(holdout), None)
+    assert result["deviation_pct"] < 5.0
+
+    # The artifact is a regular model version
+    path = tmp_path / "rf-compact.joblib"
+    joblib.dump(compact, path)
+    monkeypatch.setattr(predict_module, "_SERVING", predict_module._SERVING)
+    monkeypatch.setattr(predict_module, "_MODEL_STATUS", dict(predict_module._MODEL_STATUS))
+    status = predict_module.activate_model(path)
+    assert status["engine"] == "compiled"
+    assert status["version"].startswith("rf-compact")
+
+
+def test_eval_set_accepts_feature_names(tmp_path) -> None:
+    path = tmp_path / "eval.csv"
+    path.write_text("livable_surface,number_of_bedrooms,price\n120,3,300000\n80,,200000\n")
+
+    X, prices = load_eval_set(path)
+
+    assert "Livable surface" in X.columns
+    assert X.loc[1, "Number of bedrooms"] is not None and pd.isna(X.loc[1, "Number of bedrooms"])
+    assert prices.tolist() == [300000.0, 200000.0]
+
+
+def test_eval_set_scores_like_serving(tmp_path) -> None:
+    path = tmp_path / "eval.csv"
+    path.write_text("livable_surface,number_of_bedrooms,state_of_property\n80,,good\n")
+    features = PropertyFeatures(
+        property_type="house",
+        location={"province": "Antwerpen", "postcode": 2000, "locality": "Antwerpen"},
+        livable_surface=80,
+        state_of_property="good",
+    )
+
+    X, _ = load_eval_set(path)
+
+    with cache_disabled():
+        assert _load_model().predict(X)[0] == predict_price(features)
+
+
+@pytest.mark.parametrize("options, budget", [
+    ([], (DEFAULT_MAX_DEVIATION, None)),
+    (["--max-mape-increase", "0.5"], (None, 0.5)),
+    (["--max-deviation", "2", "--max-mape-increase", "0.5"], (2.0, 0.5)),
+])
+def test_cli_applies_only_the_budgets_given(tmp_path, monkeypatch, options, budget) -> None:
+    eval_csv = tmp_path / "eval.csv"
+    eval_csv.write_text("livable_surface,price\n120,300000\n80,200000\n")
+    model_path = tmp_path / "model.joblib"
+    joblib.dump(_load_model(), model_path)
+    seen = []
+
+    class Stop(Exception):
+        pass
+
+    def fake_compact_model(model, X, prices, max_deviation, max_mape_increase, depths):
+        seen.append((max_deviation, max_mape_increase))
+        raise Stop  # before anything is written
+
+    monkeypatch.setattr(compact_module, "compact_model", fake_compact_model)
+    with pytest.raises(Stop):
+        compact_module.main([str(eval_csv), "--model", str(model_path), *options])
+
+    assert seen == [budget]
@@ -0,0 +1,54 @@
+import json
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from api import encoding
+from api.app import app
+from api.predict import ScoredItems, score_columns, score_items
+from api.test_api import VALID_PROPERTY
+
+client = TestClient(app)
+
+ITEMS = [VALID_PROPERTY, {**VALID_PROPERTY, "livable_surface": 0}, {**VALID_PROPERTY, "livable_surface": 75}]
+
+
+@pytest.fixture(params=["orjson", "json"])
+def encoder(request, monkeypatch) -> str:
+    if request.param == "json":
+        monkeypatch.setattr(encoding, "orjson", None)
+    elif encoding.orjson is None:
+        pytest.skip("orjson is not installed")
+    return request.param
+
+
+def test_batch_body_matches_item_dicts(encoder: str) -> None:
+    scored = score_columns(ITEMS)
+    body = json.loads(encoding.batch_body(scored))
+
+    assert body["predictions"] == score_items(ITEMS)
+    assert (body["n_success"], body["n_failed"]) == (2, 1)
+    assert body["model_version"] == scored.model_version
+
+
+def test_rows_use_given_indices_and_null_for_nan(encoder: str) -> None:
+    scored = ScoredItems(np.array([1.5, np.inf]), np.array([0.5, np.nan]), {}, "v1")
+    rows = [json.loads(row) for row in encoding.prediction_rows(scored, [10, 11])]
+
+    assert [row["index"] for row in rows] == [10, 11]
+    assert rows[0]["prediction"] == 1.5
+    assert rows[1]["prediction"] is None and rows[1]["price_per_m2"] is None
+    assert json.loads(encoding.dumps({"x": float("nan"), "y": [1, "é"]})) == {"x": None, "y": [1, "é"]}
+
+
+def test_predict_response_is_single_pass_json() -> None:
+    res = client.post("/predict", json={"data": VALID_PROPERTY})
+    body = res.json()
+
+    assert res.headers["content-type"] == "application/json"
+    assert body["price_per_m2"] == pytest.approx(body["prediction"] / VALID_PROPERTY["livable_surface"])
+
+    batch = client.post("/predict/batch", json={"data": ITEMS})
+    assert batch.headers["content-type"] == "application/json"
+    assert batch.json()["predictions"][0]["prediction"] == pytest.approx(body["prediction"])
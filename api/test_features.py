@@ -0,0 +1,35 @@
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from api.corpus import random_corpus
+from api.features import FEATURE_COLUMNS, RowLayout
+from api.predict import _load_model, preprocess_for_model
+from api.schemas import PropertyFeatures
+
+
+def _reference(model, corpus: List[PropertyFeatures]) -> np.ndarray:
+    # Plain DataFrame, every missing value as NaN (the serving contract, see missing_as_nan)
+    rows = [{k: np.nan if v is None else v for k, v in preprocess_for_model(f).items()} for f in corpus]
+    return np.asarray(model.predict(pd.DataFrame(rows, dtype=object)))
+
+
+def test_layout_covers_all_feature_columns() -> None:
+    layout = RowLayout.for_model(_load_model())
+    assert set(layout.columns) == set(FEATURE_COLUMNS)
+
+
+def test_fast_path_single_rows_are_identical() -> None:
+    model = _load_model()
+    layout = RowLayout.for_model(model)
+    for features in random_corpus(50, seed=1):
+        expected = _reference(model, [features])
+        assert np.array_equal(np.asarray(model.predict(layout.frame([features]))), expected)
+
+
+def test_fast_path_batch_is_identical() -> None:
+    model = _load_model()
+    layout = RowLayout.for_model(model)
+    corpus = random_corpus(300, seed=2)
+    assert np.array_equal(np.asarray(model.predict(layout.frame(corpus))), _reference(model, corpus))
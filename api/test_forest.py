@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+
+from api import config
+from api import predict as predict_module
+from api.corpus import random_corpus
+from api.forest import CompiledForest, CompiledPipeline
+from api.predict import _load_model, preprocess_for_model
+
+
+def test_compiled_pipeline_matches_sklearn() -> None:
+    model = _load_model()
+    compiled = CompiledPipeline.from_model(model)
+    df = pd.DataFrame([preprocess_for_model(f) for f in random_corpus(500, seed=4)])
+
+    # Bit for bit, whatever the batch size: a row's price does not depend on its neighbours
+    np.testing.assert_array_equal(compiled.predict(df), model.predict(df))
+    np.testing.assert_array_equal(compiled.predict(df.iloc[:1]), model.predict(df.iloc[:1]))
+    np.testing.assert_array_equal(compiled.predict(df.iloc[:2]), model.predict(df)[:2])
+
+
+def test_compiled_forest_follows_missing_value_routing() -> None:
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, 4))
+    y = X[:, 0] * 3 + X[:, 1] + rng.normal(scale=0.1, size=400)
+    X[rng.random(X.shape) < 0.2] = np.nan
+
+    forest = RandomForestRegressor(n_estimators=10, max_depth=6, random_state=0).fit(X, y)
+    compiled = CompiledForest.from_estimator(forest)
+
+    np.testing.assert_array_equal(compiled.predict(X), forest.predict(X))
+
+
+def test_large_batches_go_back_to_sklearn() -> None:
+    model = _load_model()
+    compiled = CompiledPipeline.from_model(model, max_rows=10)
+    df = pd.DataFrame([preprocess_for_model(f) for f in random_corpus(50, seed=5)])
+
+    assert np.array_equal(compiled.predict(df), model[-1].predict(compiled.transform(df)))
+
+
+def test_unsupported_estimator_is_rejected() -> None:
+    linear = LinearRegression().fit(np.eye(3), np.arange(3))
+    with pytest.raises(TypeError):
+        CompiledForest.from_estimator(linear)
+
+
+def test_compiled_engine_selected_by_config(monkeypatch) -> None:
+    monkeypatch.setattr(config, "INFERENCE_ENGINE", "compiled")
+    monkeypatch.setattr(predict_module, "_SERVING", None)
+    monkeypatch.setattr(predict_module, "_MODEL_STATUS", dict(predict_module._MODEL_STATUS))
+
+    status = predict_module.warm_up()
+
+    assert status["engine"] == "compiled"
+    assert isinstance(predict_module._SERVING.predictor, CompiledPipeline)
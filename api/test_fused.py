@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from api import config
+from api import predict as predict_module
+from api.corpus import random_corpus
+from api.features import RowLayout
+from api.fused import FusedTransform, verify
+from api.predict import _load_model, preprocess_for_model
+
+
+def _toy_frame() -> pd.DataFrame:
+    return pd.DataFrame({"a": [1.0, np.nan, 3.0, 4.0], "b": ["x", "y", "x", np.nan]})
+
+
+def test_fused_matches_pipeline_bit_for_bit() -> None:
+    model = _load_model()
+    preprocessor = model[:-1]
+    fused = FusedTransform.from_preprocessor(preprocessor)
+    corpus = random_corpus(2000, seed=10)
+    layout = RowLayout.for_model(model)
+    values = layout.values(corpus)
+    columns = {str(name): values[:, j] for j, name in enumerate(layout.columns)}
+
+    assert verify(fused, preprocessor)
+    assert verify(fused, preprocessor, columns, single_rows=50)
+
+    reference = pd.DataFrame([preprocess_for_model(f) for f in corpus])
+    assert fused.transform(reference).tobytes() == preprocessor.transform(reference).tobytes()
+
+
+def test_none_and_nan_are_both_missing() -> None:
+    fused = FusedTransform.from_preprocessor(_load_model()[:-1])
+    values = RowLayout.for_model(_load_model()).values(random_corpus(20, seed=3))
+    with_none = values.copy()
+    with_none[with_none != with_none] = None  # NaN -> None
+
+    # Value by value: a None alone in its column is missing too
+    assert fused.transform(with_none).tobytes() == fused.transform(values).tobytes()
+    assert fused.transform(with_none[:1]).tobytes() == fused.transform(values[:1]).tobytes()
+
+
+def test_verification_catches_wrong_imputation() -> None:
+    preprocessor = _load_model()[:-1]
+    fused = FusedTransform.from_preprocessor(preprocessor)
+    encoded = fused.categorical[0]
+    # Missing values imputed as another of the column's categories
+    other = next(category for category in encoded.table if category != encoded.fill)
+    fused.categorical[0] = encoded._replace(fill=other)
+
+    assert not verify(fused, preprocessor)
+
+
+def test_unsupported_steps_are_not_fused() -> None:
+    scaled = ColumnTransformer([("num", StandardScaler(), ["a"])]).fit(_toy_frame())
+    with pytest.raises(TypeError):
+        FusedTransform.from_preprocessor(scaled)
+
+
+def test_unknown_category_follows_handle_unknown() -> None:
+    strict = ColumnTransformer([
+        ("num", SimpleImputer(strategy="median"), ["a"]),
+        ("cat", OneHotEncoder(handle_unknown="error"), ["b"]),
+    ]).fit(_toy_frame().fillna({"b": "x"}))
+    fused = FusedTransform.from_preprocessor(strict)
+    unseen = pd.DataFrame({"a": [2.0], "b": ["z"]})
+
+    assert verify(fused, strict)
+    np.testing.assert_array_equal(fused.transform(pd.DataFrame({"a": [np.nan], "b": ["y"]})), [[3.0, 0.0, 1.0]])
+    with pytest.raises(ValueError):
+        strict.transform(unseen)
+    with pytest.raises(ValueError):
+        fused.transform(unseen)
+
+
+@pytest.mark.parametrize("enabled", [True, False])
+def test_fused_preprocess_selected_by_config(monkeypatch, enabled: bool) -> None:
+    monkeypatch.setattr(config, "INFERENCE_ENGINE", "compiled")
+    monkeypatch.setattr(config, "FUSED_PREPROCESS", enabled)
+    monkeypatch.setattr(predict_module, "_SERVING", None)
+    monkeypatch.setattr(predict_module, "_MODEL_STATUS", dict(predict_module._MODEL_STATUS))
+
+    status = predict_module.warm_up()
+
+    assert status["engine"] == "compiled"
+    assert status["fused_preprocess"] is enabled
+    assert isinstance(predict_module._SERVING.predictor.preprocessor, FusedTransform) is enabled
@@ -0,0 +1,46 @@
+from fastapi.testclient import TestClient
+
+from api import metrics
+from api.app import app
+from api.predict import cache_disabled
+from api.test_api import VALID_PROPERTY
+
+client = TestClient(app)
+
+
+def test_metrics_endpoint_counts_requests_and_stages() -> None:
+    # Cache off: every stage of the prediction must run
+    payload = {"data": VALID_PROPERTY}
+    before = metrics.REQUESTS.value(route="/predict", method="POST", status=200)
+    with cache_disabled():
+        assert client.post("/predict", json=payload).status_code == 200
+    assert metrics.REQUESTS.value(route="/predict", method="POST", status=200) == before + 1
+
+    res = client.get("/metrics")
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/plain")
+    text = res.text
+    assert 'immo_http_requests_total{method="POST",route="/predict",status="200"}' in text
+    for stage in ("request_validation", "preprocess", "predict", "serialization"):
+        assert f'immo_stage_duration_seconds_count{{stage="{stage}"}}' in text
+    assert "immo_model_info{" in text
+    assert "# TYPE immo_cache_hits_total counter" in text
+    assert "# TYPE immo_cache_size gauge" in text
+
+
+def test_unknown_route_is_not_a_label_per_path() -> None:
+    client.get("/no-such-page-123")
+    assert metrics.REQUESTS.value(route="unmatched", method="GET", status=404) >= 1
+    assert "no-such-page-123" not in client.get("/metrics").text
+
+
+def test_histogram_buckets_are_cumulative() -> None:
+    histogram = metrics.Histogram("test_seconds", "Test.", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, name='a"b')
+
+    lines = histogram.render()
+    assert 'test_seconds_bucket{name="a\\"b",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{name="a\\"b",le="1.0"} 3' in lines
+    assert 'test_seconds_bucket{name="a\\"b",le="+Inf"} 4' in lines
+    assert 'test_seconds_count{name="a\\"b"} 4' in lines
@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from api import config
+from api import predict as predict_module
+from api.app import app
+from api.corpus import random_corpus
+from api.forest import CompiledPipeline
+from api.planner import PlannedPredictor, calibration_rows, ladder
+from api.predict import _load_model, preprocess_for_model
+from api.procpool import ProcessPoolPredictor
+
+client = TestClient(app)
+
+
+def test_ladder() -> None:
+    assert ladder(1) == [1]
+    assert ladder(4096) == [1, 4, 16, 64, 256, 1024, 4096]
+    assert ladder(1000) == [1, 4, 16, 64, 256]
+
+
+def test_calibration_rows_take_varied_paths() -> None:
+    forest = CompiledPipeline.from_model(_load_model()).forest
+    X = calibration_rows(forest, 200)
+
+    assert X.shape == (200, forest.n_features)
+    # Real leaves, not one path repeated
+    assert len(np.unique(forest.predict(X))) > 100
+
+
+def test_every_strategy_matches_sklearn() -> None:
+    model = _load_model()
+    compiled = CompiledPipeline.from_model(model)
+    pool = ProcessPoolPredictor(compiled, processes=2)
+    planner = PlannedPredictor(compiled, pool)
+    df = pd.DataFrame([preprocess_for_model(f) for f in random_corpus(600, seed=9)])
+    Xt = planner.transform(df)
+    expected = model.predict(df)
+
+    try:
+        for strategy in ["sklearn_threads", *planner.strategies()]:
+            np.testing.assert_allclose(planner.run(strategy, Xt), expected, rtol=1e-9, err_msg=strategy)
+        np.testing.assert_allclose(planner.run("compiled", Xt, chunk_rows=256), expected, rtol=1e-9)
+    finally:
+        pool.close()
+
+
+def test_calibration_builds_a_plan_per_batch_size() -> None:
+    planner = PlannedPredictor(CompiledPipeline.from_model(_load_model()))
+    calibration = planner.calibrate(max_rows=64)
+
+    assert calibration["batch_sizes"] == [1, 4, 16, 64]
+    assert set(calibration["timings_ms"]["64"]) == {"compiled", "sklearn"}
+    assert planner.plan[0]["min_rows"] == 1
+    assert [step["min_rows"] for step in planner.plan] == sorted(step["min_rows"] for step in planner.plan)
+    assert {step["strategy"] for step in planner.plan} <= set(calibration["strategies"])
+
+
+def test_step_for_uses_the_largest_step_below_the_batch() -> None:
+    planner = PlannedPredictor(CompiledPipeline.from_model(_load_model()))
+    planner.plan = [{"min_rows": 1, "strategy": "compiled", "chunk_rows": None},
+                    {"min_rows": 1024, "strategy": "sklearn", "chunk_rows": None}]
+
+    assert planner.step_for(0)["strategy"] == "compiled"
+    assert planner.step_for(1023)["strategy"] == "compiled"
+    assert planner.step_for(1024)["strategy"] == "sklearn"
+    assert planner.step_for(10**6)["strategy"] == "sklearn"
+
+
+def test_auto_engine_exposes_its_plan(monkeypatch) -> None:
+    monkeypatch.setattr(config, "INFERENCE_ENGINE", "auto")
+    monkeypatch.setattr(config, "PLANNER_MAX_ROWS", 16)
+    monkeypatch.setattr(predict_module, "_SERVING", None)
+    monkeypatch.setattr(predict_module, "_MODEL_STATUS", dict(predict_module._MODEL_STATUS))
+
+    assert predict_module.warm_up()["engine"] == "auto"
+    response = client.get("/stats/inference")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["engine"] == "auto"
+    assert body["plan"][0]["min_rows"] == 1
+    assert body["calibration"]["batch_sizes"] == [1, 4, 16]
+
+
+def test_preload_plans_without_the_process_pool(monkeypatch) -> None:
+    # gunicorn master: no pool may be started (and timed) before the fork
+    monkeypatch.setattr(config, "INFERENCE_ENGINE", "auto")
+    monkeypatch.setattr(config, "INFERENCE_PROCESSES", 2)
+    monkeypatch.setattr(config, "PLANNER_MAX_ROWS", 16)
+    monkeypatch.setattr(predict_module, "_SERVING", None)
+    monkeypatch.setattr(predict_module, "_MODEL_STATUS", dict(predict_module._MODEL_STATUS))
+
+    assert predict_module.preload()["engine"] == "auto"
+
+    predictor = predict_module._SERVING.predictor
+    assert predictor.pool is None and "process" not in predictor.calibration["strategies"]
+    assert not predict_module._PRELOADING
+
+
+def test_self_test_checks_every_strategy_of_the_plan(monkeypatch) -> None:
+    def calibrate(self, max_rows):
+        # A strategy only big batches would reach, off by 1 %
+        self.plan = [{"min_rows": 1, "strategy": "compiled", "chunk_rows": None},
+                     {"min_rows": 1024, "strategy": "sklearn", "chunk_rows": None}]
+        return {}
+
+    run = PlannedPredictor.run
+
+    def off_by_one_percent(self, strategy, Xt, chunk_rows=None):
+        prices = run(self, strategy, Xt, chunk_rows)
+        return prices * 1.01 if strategy == "sklearn" else prices
+
+    monkeypatch.setattr(PlannedPredictor, "calibrate", calibrate)
+    monkeypatch.setattr(PlannedPredictor, "run", off_by_one_percent)
+    monkeypatch.setattr(config, "INFERENCE_ENGINE", "auto")
+    monkeypatch.setattr(predict_module, "_SERVING", None)
+    monkeypatch.setattr(predict_module, "_MODEL_STATUS", dict(predict_module._MODEL_STATUS))
+
+    # Falls back to the plain pipeline before serving a single request
+    assert predict_module.warm_up()["engine"] == "sklearn"
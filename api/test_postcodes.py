@@ -0,0 +1,114 @@
+import os
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from api import config
+from api.app import app
+from api.corpus import random_corpus
+from api.features import RowLayout
+from api.postcodes import canonical_province, postcode_index
+from api.schemas import Location
+from api.test_api import VALID_PROPERTY
+
+client = TestClient(app)
+
+
+def test_lookup_known_and_range_only_postcodes() -> None:
+    index = postcode_index()
+
+    known = index.lookup(2000)
+    assert (known.locality, known.province, known.region, known.exact) == ("Antwerpen", "Antwerpen", "Vlaanderen", True)
+
+    # Not in the bundled file: province from the range, coordinates of a nearby postcode
+    nearby = index.lookup(4877)
+    assert (nearby.locality, nearby.province, nearby.region, nearby.exact) == (None, "Luik", "Wallonië", False)
+    assert np.isfinite(nearby.latitude)
+
+    assert index.lookup(999) is None
+
+
+def test_batch_columns_match_single_lookups() -> None:
+    index = postcode_index()
+    postcodes = [1000, 2000, 6700, 8400, 4877, 12]
+    columns = index.columns(postcodes)
+
+    for i, postcode in enumerate(postcodes):
+        info = index.lookup(postcode)
+        assert columns["province"][i] == (info.province if info else None)
+        assert columns["locality"][i] == (info.locality if info else None)
+    assert np.isnan(columns["latitude"][-1])
+
+
+def test_province_spellings_are_accepted() -> None:
+    assert canonical_province("Anvers") == "Antwerpen"
+    assert canonical_province("province de Liège") == "Luik"
+    assert canonical_province("flandre-occidentale") == "West-Vlaanderen"
+    assert canonical_province("Atlantis") is None
+
+
+def test_location_is_checked_and_filled(monkeypatch) -> None:
+    monkeypatch.setattr(config, "POSTCODE_CHECK", "strict")
+
+    location = Location(province="Anvers", postcode=2000, locality="Antwerpen")
+    assert location.region == "Vlaanderen"
+
+    with pytest.raises(ValidationError, match="Antwerpen"):
+        Location(province="Limburg", postcode=2000, locality="Antwerpen")
+    with pytest.raises(ValidationError, match="region"):
+        Location(province="Antwerpen", postcode=2000, locality="Antwerpen", region="Wallonië")
+
+    # Foreign addresses are not checked against Belgian postcodes
+    Location(province="Limburg", postcode=6211, locality="Maastricht", country="Netherlands")
+
+    monkeypatch.setattr(config, "POSTCODE_CHECK", "fill")
+    assert Location(province="Limburg", postcode=2000, locality="Antwerpen").region == "Vlaanderen"
+
+
+@pytest.mark.skipif("IMMO_POSTCODE_CHECK" in os.environ, reason="IMMO_POSTCODE_CHECK overrides the default")
+def test_default_accepts_baseline_payloads() -> None:
+    # The default (fill) only adds the region: locations the API always took still score
+    assert config.POSTCODE_CHECK == "fill"
+    payloads = [
+        {**VALID_PROPERTY, "location": {"province": "Namur", "postcode": 2000, "locality": "Antwerpen"}},
+        {**VALID_PROPERTY, "location": {"province": "Antwerpen", "postcode": 2000, "locality": "Antwerpen",
+                                        "region": "Wallonie"}},
+        {**VALID_PROPERTY, "location": {"province": "Atlantis", "postcode": 9999, "locality": "Nowhere"}},
+    ]
+
+    for payload in payloads:
+        assert client.post("/predict", json={"data": payload}).status_code == 200
+    items = client.post("/predict/batch", json={"data": payloads}).json()["predictions"]
+    assert [item["status_code"] for item in items] == [200, 200, 200]
+
+
+def test_predict_rejects_mismatched_province(monkeypatch) -> None:
+    monkeypatch.setattr(config, "POSTCODE_CHECK", "strict")
+    wrong = {**VALID_PROPERTY, "location": {"province": "Namur", "postcode": 2000, "locality": "Antwerpen"}}
+
+    assert client.post("/predict", json={"data": wrong}).status_code == 422
+    items = client.post("/predict/batch", json={"data": [VALID_PROPERTY, wrong]}).json()["predictions"]
+    assert [item["status_code"] for item in items] == [200, 422]
+
+
+def test_location_endpoint() -> None:
+    res = client.get("/locations/9000")
+    assert res.status_code == 200
+    assert res.json()["locality"] == "Gent"
+    assert client.get("/locations/123").status_code == 404
+
+
+def test_row_layout_fills_location_columns() -> None:
+    corpus = random_corpus(3, seed=1)
+    corpus[1].location = Location(province="Hainaut", postcode=7000, locality="Mons")
+    layout = RowLayout(["Livable surface", "Province", "Region", "Latitude"])
+
+    frame = layout.frame(corpus)
+    assert frame["Province"].tolist() == ["Antwerpen", "Henegouwen", "Antwerpen"]
+    assert frame["Region"].tolist() == ["Vlaanderen", "Wallonië", "Vlaanderen"]
+    assert layout.uses_location
+
+    single = layout.frame([corpus[1]])
+    assert single.iloc[0].tolist() == frame.iloc[1].tolist()
@@ -0,0 +1,137 @@
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from api import config
+from api import predict as predict_module
+from api.corpus import random_corpus
+from api.forest import CompiledPipeline
+from api.predict import _load_model, preprocess_for_model
+from api.procpool import ProcessPoolPredictor
+
+
+@pytest.fixture(scope="module")
+def predictor():
+    pool_predictor = ProcessPoolPredictor(CompiledPipeline.from_model(_load_model()), processes=2)
+    yield pool_predictor
+    pool_predictor.close()
+
+
+def test_pool_predictions_match_sklearn(predictor) -> None:
+    model = _load_model()
+    df = pd.DataFrame([preprocess_for_model(f) for f in random_corpus(700, seed=6)])
+
+    np.testing.assert_allclose(predictor.predict(df), model.predict(df), rtol=1e-9)
+    np.testing.assert_allclose(predictor.predict(df.iloc[:1]), model.predict(df.iloc[:1]), rtol=1e-9)
+    assert predictor.stats()["running"]
+
+
+def test_shared_forest_is_read_only_memory_map(predictor) -> None:
+    assert isinstance(predictor.forest.threshold, np.memmap)
+    with pytest.raises(ValueError):
+        predictor.forest.threshold[0] = 0.0
+
+
+def test_batches_are_split_per_worker(predictor) -> None:
+    assert predictor.chunks(1) == [slice(0, 1)]
+    assert predictor.chunks(300) == [slice(0, 300)]
+    assert predictor.chunks(1000) == [slice(0, 500), slice(500, 1000)]
+
+
+def test_dead_worker_restarts_the_pool(predictor) -> None:
+    df = pd.DataFrame([preprocess_for_model(f) for f in random_corpus(20, seed=7)])
+    expected = predictor.pipeline.predict(df)
+    restarts = predictor.stats()["restarts"]
+
+    with pytest.raises(BrokenProcessPool):
+        predictor._pool().submit(os._exit, 1).result()
+
+    np.testing.assert_array_equal(predictor.predict(df), expected)
+    assert predictor.stats()["restarts"] == restarts + 1
+
+
+def test_broken_pool_falls_back_in_process(predictor, monkeypatch) -> None:
+    class BrokenPool:
+        def submit(self, *args, **kwargs):
+            raise BrokenProcessPool("worker died")
+
+        def shutdown(self, **kwargs):
+            pass
+
+    df = pd.DataFrame([preprocess_for_model(f) for f in random_corpus(5, seed=8)])
+    monkeypatch.setattr(predictor, "_pool", BrokenPool)
+    fallbacks = predictor.stats()["fallbacks"]
+
+    np.testing.assert_array_equal(predictor.predict(df), predictor.pipeline.predict(df))
+    assert predictor.stats()["fallbacks"] == fallbacks + 1
+
+
+def test_start_failure_falls_back_in_process(predictor, monkeypatch) -> None:
+    class UnstartablePool:
+        def submit(self, *args, **kwargs):
+            raise ChildProcessError(10, "No child processes")
+
+        def shutdown(self, **kwargs):
+            pass
+
+    df = pd.DataFrame([preprocess_for_model(f) for f in random_corpus(5, seed=8)])
+    monkeypatch.setattr(predictor, "_pool", UnstartablePool)
+    fallbacks = predictor.stats()["fallbacks"]
+
+    np.testing.assert_array_equal(predictor.predict(df), predictor.pipeline.predict(df))
+    assert predictor.stats()["fallbacks"] == fallbacks + 1
+
+
+def test_pool_works_in_a_process_forked_after_use(predictor) -> None:
+    # gunicorn --preload: the master predicted (and started the forkserver), then forked
+    df = pd.DataFrame([preprocess_for_model(f) for f in random_corpus(5, seed=9)])
+    expected = predictor.predict(df)
+    before = predictor.stats()
+
+    pid = os.fork()
+    if pid == 0:
+        ok = False
+        try:
+            ok = (np.array_equal(predictor.predict(df), expected)
+                  and predictor.stats()["tasks"] == before["tasks"] + 1
+                  and predictor.stats()["fallbacks"] == before["fallbacks"])
+            predictor._pool().shutdown(wait=True)
+        finally:
+            os._exit(0 if ok else 1)
+
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+
+
+def test_process_engine_selected_by_config(monkeypatch) -> None:
+    monkeypatch.setattr(config, "INFERENCE_ENGINE", "process")
+    monkeypatch.setattr(config, "INFERENCE_PROCESSES", 1)
+    monkeypatch.setattr(predict_module, "_SERVING", None)
+    monkeypatch.setattr(predict_module, "_MODEL_STATUS", dict(predict_module._MODEL_STATUS))
+
+    status = predict_module.warm_up()
+    stats = predict_module.inference_stats()
+
+    assert status["engine"] == stats["engine"] == "process"
+    assert stats["process_pool"]["processes"] == 1 and stats["process_pool"]["running"]
+    predict_module._SERVING.predictor.close()
+
+
+def test_preload_leaves_no_pool_running(monkeypatch) -> None:
+    monkeypatch.setattr(config, "INFERENCE_ENGINE", "process")
+    monkeypatch.setattr(config, "INFERENCE_PROCESSES", 1)
+    monkeypatch.setattr(predict_module, "_SERVING", None)
+    monkeypatch.setattr(predict_module, "_MODEL_STATUS", dict(predict_module._MODEL_STATUS))
+
+    # The self-test used the pool; gunicorn forks right after
+    assert predict_module.preload()["engine"] == "process"
+    pool = predict_module._SERVING.predictor
+    assert not pool.stats()["running"]
+
+    df = pd.DataFrame([preprocess_for_model(f) for f in random_corpus(5, seed=10)])
+    np.testing.assert_array_equal(pool.predict(df), pool.pipeline.predict(df))
+    assert pool.stats()["running"]
+    pool.close()
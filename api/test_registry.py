@@ -0,0 +1,91 @@
+import os
+
+import joblib
+import pytest
+from fastapi.testclient import TestClient
+
+from api import app as app_module
+from api import config
+from api import predict as predict_module
+from api.app import app
+from api.registry import ModelRegistry, ModelSwapper
+from api.test_api import VALID_PROPERTY
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch) -> ModelRegistry:
+    """Registry with two versions of the real model + one broken artifact."""
+    for name in ("rf_v1.joblib", "rf_v2.joblib"):
+        os.symlink(predict_module._MODEL_PATH, tmp_path / name)
+    joblib.dump({"not": "a model"}, tmp_path / "broken.joblib")
+
+    registry = ModelRegistry(tmp_path, "rf_v1.joblib")
+    # Whatever a test swaps in is undone afterwards
+    predict_module.current_model()
+    monkeypatch.setattr(predict_module, "_SERVING", predict_module._SERVING)
+    monkeypatch.setattr(predict_module, "_MODEL_STATUS", dict(predict_module._MODEL_STATUS))
+    swapper = ModelSwapper(registry, predict_module.activate_model, predict_module.loaded_model_file)
+    monkeypatch.setattr(app_module, "_SWAPPER", swapper)
+    monkeypatch.setattr(config, "ADMIN_TOKEN", "secret")
+    return registry
+
+
+def test_registry_lists_and_points_to_versions(registry: ModelRegistry) -> None:
+    assert set(registry.names()) == {"rf_v1.joblib", "rf_v2.joblib", "broken.joblib"}
+    assert registry.active_name() == "rf_v1.joblib"
+
+    registry.set_active("rf_v2.joblib")
+    assert registry.pointer.read_text().strip() == "rf_v2.joblib"
+    assert registry.active_path().name == "rf_v2.joblib"
+
+    for bad in ("../rf_v1.joblib", "CURRENT", "missing.joblib"):
+        with pytest.raises((ValueError, FileNotFoundError)):
+            registry.set_active(bad)
+
+
+def test_admin_hot_swap_serves_new_version(registry: ModelRegistry) -> None:
+    old = predict_module.current_model()
+    headers = {"X-Admin-Token": "secret"}
+
+    res = client.post("/admin/models/rf_v2.joblib/activate", headers=headers)
+    assert res.status_code == 202
+    assert app_module._SWAPPER.wait(timeout=60)["state"] == "done"
+
+    body = client.post("/predict", json={"data": VALID_PROPERTY}).json()
+    assert body["model_version"].startswith("rf_v2-")
+    assert client.get("/models").json()["serving"]["model_file"] == "rf_v2.joblib"
+    assert registry.active_name() == "rf_v2.joblib"
+
+    # A request that took the old version before the swap finishes on it
+    features = predict_module.PropertyFeatures(**VALID_PROPERTY)
+    assert predict_module.predict_price(features, old) == pytest.approx(body["prediction"])
+
+
+def test_failed_swap_keeps_old_model(registry: ModelRegistry) -> None:
+    before = predict_module.model_status()["version"]
+    swapper = app_module._SWAPPER
+
+    swapper.request("broken.joblib")
+    status = swapper.wait(timeout=60)
+
+    assert status["state"] == "failed"
+    assert predict_module.model_status()["version"] == before
+    assert registry.active_name() == "rf_v1.joblib"
+    # The watcher does not retry a version that already failed
+    registry.pointer.write_text("broken.joblib")
+    assert swapper.check_pointer() is False
+
+
+def test_watcher_follows_pointer_file(registry: ModelRegistry) -> None:
+    registry.set_active("rf_v2.joblib")
+    assert app_module._SWAPPER.check_pointer() is True
+    app_module._SWAPPER.wait(timeout=60)
+    assert predict_module.loaded_model_file() == "rf_v2.joblib"
+
+
+def test_admin_requires_token(registry: ModelRegistry) -> None:
+    assert client.post("/admin/models/rf_v2.joblib/activate").status_code == 401
+    res = client.post("/admin/models/nope.joblib/activate", headers={"X-Admin-Token": "secret"})
+    assert res.status_code == 404
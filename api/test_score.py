@@ -0,0 +1,42 @@
+from pathlib import Path
+
+import pandas as pd
+
+from api.corpus import random_corpus
+from api.predict import predict_prices
+from api.score import score_file
+
+
+def _write_input(path: Path, n: int) -> list:
+    corpus = random_corpus(n, seed=6)
+    rows = []
+    for features in corpus:
+        row = features.model_dump(exclude={"location"})
+        row.update(features.location.model_dump())
+        rows.append(row)
+    rows[3]["livable_surface"] = 0  # invalid row must not stop the run
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return corpus
+
+
+def test_score_file_matches_api_predictions(tmp_path: Path) -> None:
+    corpus = _write_input(tmp_path / "in.csv", 25)
+    out = tmp_path / "out.csv"
+
+    summary = score_file(tmp_path / "in.csv", out, chunk_size=10, workers=1, progress=False)
+
+    assert summary["rows"] == 25
+    assert summary["failed"] == 1
+    scored = pd.read_csv(out)
+    assert scored.loc[3, "status_code"] == 422
+    expected = predict_prices([f for i, f in enumerate(corpus) if i != 3])
+    actual = scored.drop(index=3)["prediction"].tolist()
+    assert all(abs(a - e) < 1e-6 for a, e in zip(actual, expected))
+
+
+def test_process_pool_gives_same_output(tmp_path: Path) -> None:
+    _write_input(tmp_path / "in.csv", 40)
+    score_file(tmp_path / "in.csv", tmp_path / "one.csv", chunk_size=7, workers=1, progress=False)
+    score_file(tmp_path / "in.csv", tmp_path / "two.csv", chunk_size=7, workers=2, progress=False)
+
+    pd.testing.assert_frame_equal(pd.read_csv(tmp_path / "one.csv"), pd.read_csv(tmp_path / "two.csv"))
@@ -0,0 +1,47 @@
+from api.startup_profile import PHASES, compare, parse_importtime, profile_startup
+
+IMPORTTIME = """import time: self [us] | cumulative | imported package
+import time:       235 |        235 |   _io
+import time:       613 |        848 | _frozen_importlib_external
+
+@@immo-startup-phase import_app
+import time:       100 |        100 |     fastapi.params
+import time:       400 |        500 |   fastapi.routing
+import time:       300 |        800 | fastapi
+something else on stderr
+"""
+
+
+def test_parse_importtime_tags_phase_and_depth() -> None:
+    modules = parse_importtime(IMPORTTIME)
+    assert [(m["module"], m["phase"], m["depth"]) for m in modules] == [
+        ("_io", "interpreter", 1),
+        ("_frozen_importlib_external", "interpreter", 0),
+        ("fastapi.params", "import_app", 2),
+        ("fastapi.routing", "import_app", 1),
+        ("fastapi", "import_app", 0),
+    ]
+    assert modules[-1]["self_us"] == 300 and modules[-1]["cumulative_us"] == 800
+
+
+def test_compare_ignores_growth_below_the_floor() -> None:
+    baseline = {"phases": [{"phase": "model_load", "seconds": 2.0, "rss_bytes": 200 << 20},
+                           {"phase": "warm_up", "seconds": 0.01, "rss_bytes": 201 << 20}]}
+    current = {"phases": [{"phase": "model_load", "seconds": 3.0, "rss_bytes": 202 << 20},
+                          {"phase": "warm_up", "seconds": 0.03, "rss_bytes": 203 << 20}]}
+    regressed = [(row["phase"], row["metric"]) for row in compare(current, baseline, 0.2) if row["regressed"]]
+    # warm_up tripled, but by 20 ms only
+    assert regressed == [("model_load", "seconds")]
+
+
+def test_profile_startup_reports_every_phase() -> None:
+    report = profile_startup(top=5)
+    phases = {phase["phase"]: phase for phase in report["phases"]}
+
+    assert list(phases) == ["interpreter", *PHASES]
+    assert report["model"]["version"]
+    imported = {(m["phase"], m["module"]) for m in report["modules"]}
+    assert ("import_app", "fastapi") in imported
+    # scikit-learn comes with the model, not with the app
+    assert ("model_load", "sklearn") in imported and ("import_app", "sklearn") not in imported
+    assert phases["model_load"]["rss_bytes"] > phases["interpreter"]["rss_bytes"]
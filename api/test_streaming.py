@@ -0,0 +1,149 @@
+import asyncio
+import gzip
+import json
+from typing import AsyncIterator, List
+
+from fastapi.concurrency import run_in_threadpool
+from fastapi.testclient import TestClient
+
+from api import app as app_module
+from api import config
+from api.admission import Overloaded
+from api.app import app
+from api.streaming import iter_lines, score_stream
+from api.test_api import VALID_PROPERTY
+
+client = TestClient(app)
+
+
+async def _chunks(parts: List[bytes]) -> AsyncIterator[bytes]:
+    for part in parts:
+        yield part
+
+
+async def _collect(stream: AsyncIterator) -> list:
+    return [item async for item in stream]
+
+
+def _results(body: str) -> List[dict]:
+    return [json.loads(line) for line in body.splitlines() if line]
+
+
+def test_ndjson_stream_reports_per_line_status() -> None:
+    lines = [
+        json.dumps(VALID_PROPERTY),
+        "{not json",
+        json.dumps({**VALID_PROPERTY, "livable_surface": 0}),
+        json.dumps({"data": VALID_PROPERTY}),
+    ]
+    res = client.post(
+        "/predict/stream",
+        content="\n".join(lines),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert res.status_code == 200
+    results = _results(res.text)
+    assert [r["index"] for r in results] == [0, 1, 2, 3]
+    assert [r["status_code"] for r in results] == [200, 400, 422, 200]
+    assert results[0]["prediction"] == results[3]["prediction"]
+
+
+def test_csv_stream_nests_location_columns() -> None:
+    body = (
+        "property_type,province,postcode,locality,livable_surface,garden\n"
+        "house,Antwerpen,2000,Antwerpen,120,true\n"
+        "apartment,Limburg,3500,Hasselt,75,\n"
+    )
+    res = client.post("/predict/stream", content=body, headers={"Content-Type": "text/csv"})
+    results = _results(res.text)
+    assert [r["status_code"] for r in results] == [200, 200]
+
+
+def test_gzip_in_and_out() -> None:
+    payload = "\n".join(json.dumps(VALID_PROPERTY) for _ in range(5)).encode("utf-8")
+    res = client.post(
+        "/predict/stream",
+        content=gzip.compress(payload),
+        headers={"Content-Encoding": "gzip", "Accept-Encoding": "gzip"},
+    )
+    assert res.headers["content-encoding"] == "gzip"
+    # httpx transparently gunzips the response body
+    assert len(_results(res.text)) == 5
+
+
+def test_results_keep_global_indexes_across_chunks() -> None:
+    lines = _chunks([(json.dumps(VALID_PROPERTY) + "\n").encode("utf-8")] * 5)
+    chunks = asyncio.run(_collect(score_stream(iter_lines(lines), "ndjson", 2, run_in_threadpool)))
+    assert len(chunks) == 3
+    indexes = [r["index"] for chunk in chunks for r in _results(chunk.decode("utf-8"))]
+    assert indexes == [0, 1, 2, 3, 4]
+
+
+def test_chunks_go_through_the_inference_executor() -> None:
+    completed = app_module._EXECUTOR.stats()["completed"]
+    lines = "\n".join(json.dumps(VALID_PROPERTY) for _ in range(3))
+    res = client.post("/predict/stream", content=lines, headers={"Content-Type": "application/x-ndjson"})
+
+    assert [r["status_code"] for r in _results(res.text)] == [200, 200, 200]
+    assert app_module._EXECUTOR.stats()["completed"] == completed + 1
+
+
+def test_overload_before_the_first_chunk_is_a_503(monkeypatch) -> None:
+    class FullExecutor:
+        async def run(self, fn, *args, deadline=None):
+            raise Overloaded(retry_after=3)
+
+    monkeypatch.setattr(app_module, "_EXECUTOR", FullExecutor())
+    res = client.post("/predict/stream", content=json.dumps(VALID_PROPERTY))
+
+    assert res.status_code == 503
+    assert res.headers["Retry-After"] == "3"
+
+
+def test_overload_mid_stream_ends_with_an_error_line() -> None:
+    calls: List[int] = []
+
+    async def run(fn, *args):
+        calls.append(len(args[0]))
+        if len(calls) > 1:
+            raise Overloaded(retry_after=2)
+        return await run_in_threadpool(fn, *args)
+
+    lines = _chunks([(json.dumps(VALID_PROPERTY) + "\n").encode("utf-8")] * 5)
+    chunks = asyncio.run(_collect(score_stream(iter_lines(lines), "ndjson", 2, run)))
+    results = [r for chunk in chunks for r in _results(chunk.decode("utf-8"))]
+
+    assert [r["index"] for r in results[:2]] == [0, 1]
+    assert results[-1] == {"status_code": 503, "error": "Server is busy, retry later.", "retry_after": 2,
+                           "resume_from_index": 2}
+
+
+def test_overlong_line_is_skipped_not_buffered() -> None:
+    parts = [b"short\n" + b"x" * 8, b"x" * 8, b"x" * 8, b"\nok\n", b"y" * 20]
+    lines = asyncio.run(_collect(iter_lines(_chunks(parts), max_line_length=10)))
+
+    assert lines[0] == "short" and lines[2] == "ok"
+    assert [line.message for line in (lines[1], lines[3])] == ["Line is longer than 10 characters."] * 2
+    assert len(lines) == 4
+
+
+def test_overlong_line_is_a_400_on_that_line(monkeypatch) -> None:
+    monkeypatch.setattr(config, "STREAM_MAX_LINE_LENGTH", 1000)
+    lines = [json.dumps(VALID_PROPERTY), json.dumps({**VALID_PROPERTY, "padding": "x" * 5000}),
+             json.dumps(VALID_PROPERTY)]
+    res = client.post("/predict/stream", content="\n".join(lines), headers={"Content-Type": "application/x-ndjson"})
+
+    results = _results(res.text)
+    assert [r["status_code"] for r in results] == [200, 400, 200]
+    assert results[1]["errors"][0]["msg"] == "Line is longer than 1000 characters."
+
+
+def test_lines_split_inside_multibyte_character() -> None:
+    data = "Liège\nWallonië".encode("utf-8")
+    parts = [data[:4], data[4:9], data[9:]]
+    assert asyncio.run(_collect(iter_lines(_chunks(parts)))) == ["Liège", "Wallonië"]
+
+
+def test_unknown_stream_format_is_rejected() -> None:
+    res = client.post("/predict/stream?format=xml", content="<a/>")
+    assert res.status_code == 400
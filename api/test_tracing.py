@@ -0,0 +1,51 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from api import tracing
+from api.app import app
+from api.test_api import VALID_PROPERTY
+
+client = TestClient(app)
+
+
+def _timings(header: str) -> dict:
+    parts = (part.strip().split(";dur=") for part in header.split(","))
+    return {name: float(value) for name, value in parts}
+
+
+def test_predict_has_server_timing_per_stage() -> None:
+    payload = {"data": {**VALID_PROPERTY, "livable_surface": 141}}
+    res = client.post("/predict", json=payload, headers={"X-Request-ID": "abc-123"})
+    assert res.status_code == 200
+    assert res.headers["x-request-id"] == "abc-123"
+
+    timings = _timings(res.headers["server-timing"])
+    for stage in ("request_validation", "preprocess", "predict", "serialization", "total"):
+        assert stage in timings
+    assert timings["total"] >= timings["predict"]
+
+
+def test_trace_file_records_spans(tmp_path) -> None:
+    path = tmp_path / "trace.jsonl"
+    assert tracing.configure_trace_file(str(path), max_bytes=1_000_000, backups=1)
+    try:
+        other = {**VALID_PROPERTY, "livable_surface": 143}
+        res = client.post("/predict/batch", json={"data": [VALID_PROPERTY, other]})
+        assert res.status_code == 200
+        request_id = res.headers["x-request-id"]
+    finally:
+        tracing.close_trace_file()
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    mine = [record for record in records if record["request_id"] == request_id]
+    stages = {record["stage"] for record in mine}
+    assert {"request_validation", "predict", "request"} <= stages
+    assert all(record["route"] == "/predict/batch" and record["rows"] == 2 for record in mine)
+    assert "cache_hits" in mine[0]
+    assert next(r for r in mine if r["stage"] == "request")["status_code"] == 200
+
+
+def test_trace_file_is_opt_in() -> None:
+    assert tracing.configure_trace_file("") is False
+    assert not tracing.trace_file_enabled()
@@ -0,0 +1,219 @@
+"""
+Per-request trace spans: Server-Timing headers + optional local trace file.
+
+- TracingMiddleware opens a RequestTrace for every HTTP request (request id
+  from X-Request-ID or a new one) and stores it in a context variable, which
+  FastAPI copies into the threadpool that runs sync endpoints.
+- metrics.observe_stage() adds every timed stage to the current trace, so the
+  stages measured for /metrics are the same ones reported here.
+- Responses get `Server-Timing: request_validation;dur=0.41, ..., total;dur=9.87`
+  (browser dev tools and curl -v show it) and an `X-Request-ID` header.
+- With IMMO_TRACE_FILE set, every span is written as one JSON line to a
+  rotating file. Writing happens on a background thread (QueueHandler), so the
+  event loop never waits for the disk.
+"""
+import contextvars
+import json
+import logging
+import queue
+import threading
+import time
+import uuid
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Callable, Dict, List, Optional
+
+from api import config
+
+_CURRENT: "contextvars.ContextVar[Optional[RequestTrace]]" = contextvars.ContextVar(
+    "immo_request_trace", default=None
+)
+
+_trace_logger = logging.getLogger("immo.trace")
+_trace_logger.propagate = False
+_listener: Optional[QueueListener] = None
+_listener_lock = threading.Lock()
+
+
+class RequestTrace:
+    """Spans and attributes collected while one request is handled."""
+
+    def __init__(self, request_id: str, method: str = "", route: str = "") -> None:
+        self.request_id = request_id
+        self.method = method
+        self.route = route
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        # (stage, offset from request start in s, duration in s)
+        self.spans: List[tuple] = []
+        self.attributes: Dict[str, Any] = {}
+
+    def add_span(self, stage: str, seconds: float) -> None:
+        offset = time.perf_counter() - seconds - self._started
+        # list.append is atomic: threadpool + event loop may both record
+        self.spans.append((stage, offset, seconds))
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._started
+
+    def server_timing(self) -> str:
+        """Server-Timing header value; repeated stages are summed."""
+        totals: Dict[str, float] = {}
+        for stage, _, seconds in list(self.spans):
+            totals[stage] = totals.get(stage, 0.0) + seconds
+        parts = [f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in totals.items()]
+        parts.append(f"total;dur={self.elapsed() * 1000:.2f}")
+        return ", ".join(parts)
+
+    def records(self, status_code: int) -> List[Dict[str, Any]]:
+        """One structured record per span, plus one for the whole request."""
+        common = {
+            "request_id": self.request_id,
+            "method": self.method,
+            "route": self.route,
+            **self.attributes,
+        }
+        records = [
+            {
+                **common,
+                "stage": stage,
+                "start": round(self.started_at + offset, 6),
+                "offset_ms": round(offset * 1000, 3),
+                "duration_ms": round(seconds * 1000, 3),
+            }
+            for stage, offset, seconds in list(self.spans)
+        ]
+        records.append({
+            **common,
+            "stage": "request",
+            "start": round(self.started_at, 6),
+            "offset_ms": 0.0,
+            "duration_ms": round(self.elapsed() * 1000, 3),
+            "status_code": status_code,
+        })
+        return records
+
+
+def current() -> Optional[RequestTrace]:
+    return _CURRENT.get()
+
+
+def add_span(stage: str, seconds: float) -> None:
+    """Record a finished stage on the current request (no-op outside a request)."""
+    trace = _CURRENT.get()
+    if trace is not None:
+        trace.add_span(stage, seconds)
+
+
+def annotate(**attributes: Any) -> None:
+    """Attach attributes (rows, cache_hits, ...) to the current request's spans."""
+    trace = _CURRENT.get()
+    if trace is not None:
+        trace.attributes.update(attributes)
+
+
+# Trace file
+
+def configure_trace_file(
+    path: Optional[str] = None,
+    max_bytes: Optional[int] = None,
+    backups: Optional[int] = None,
+) -> bool:
+    """
+    Start writing trace records to a rotating JSON-lines file.
+
+    Defaults come from IMMO_TRACE_FILE / IMMO_TRACE_MAX_BYTES / IMMO_TRACE_BACKUPS.
+    Returns False (and records nothing) when no path is configured.
+    """
+    global _listener
+    path = path if path is not None else config.TRACE_FILE
+    if not path:
+        return False
+
+    with _listener_lock:
+        if _listener is not None:
+            return True
+
+        file_handler = RotatingFileHandler(
+            path,
+            maxBytes=max_bytes if max_bytes is not None else config.TRACE_MAX_BYTES,
+            backupCount=backups if backups is not None else config.TRACE_BACKUPS,
+            encoding="utf-8",
+        )
+        file_handler.setFormatter(logging.Formatter("%(message)s"))
+
+        records: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+        _trace_logger.addHandler(QueueHandler(records))
+        _trace_logger.setLevel(logging.INFO)
+        _listener = QueueListener(records, file_handler)
+        _listener.start()
+    return True
+
+
+def close_trace_file() -> None:
+    """Flush pending records and stop the writer thread."""
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        for handler in list(_trace_logger.handlers):
+            _trace_logger.removeHandler(handler)
+        _listener = None
+
+
+def trace_file_enabled() -> bool:
+    return _listener is not None
+
+
+def _write(trace: RequestTrace, status_code: int) -> None:
+    for record in trace.records(status_code):
+        _trace_logger.info(json.dumps(record, default=str))
+
+
+class TracingMiddleware:
+    """Pure ASGI middleware: one RequestTrace per HTTP request."""
+
+    def __init__(self, app: Callable, server_timing: Optional[bool] = None) -> None:
+        self.app = app
+        self.server_timing = config.SERVER_TIMING if server_timing is None else server_timing
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = _incoming_request_id(scope) or uuid.uuid4().hex
+        trace = RequestTrace(request_id, method=scope["method"])
+        token = _CURRENT.set(trace)
+        status_code = 500
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-request-id", request_id.encode("latin-1")))
+                if self.server_timing:
+                    headers.append((b"server-timing", trace.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _CURRENT.reset(token)
+            if _listener is not None:
+                trace.route = getattr(scope.get("route"), "path", "unmatched")
+                _write(trace, status_code)
+
+
+def _incoming_request_id(scope: Dict[str, Any]) -> Optional[str]:
+    for name, value in scope.get("headers", []):
+        if name == b"x-request-id":
+            # Bounded + printable so clients cannot inject odd header values
+            text = value.decode("latin-1")[:64]
+            if text.isprintable():
+                return text
+    return None
@@ -0,0 +1,45 @@
+"""
+Latency of the scikit-learn pipeline vs the compiled flat-array forest.
+
+    python -m benchmarks.bench_forest
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from api import config
+from api.corpus import random_corpus
+from api.forest import CompiledPipeline
+from api.predict import current_model, preprocess_for_model
+
+
+def _latencies_ms(fn, repeats: int) -> np.ndarray:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return np.asarray(timings)
+
+
+def main() -> None:
+    model = current_model().model
+    # Same settings as serving: big batches are handed back to scikit-learn
+    compiled = CompiledPipeline.from_model(model, max_rows=config.COMPILED_MAX_ROWS)
+    corpus = pd.DataFrame([preprocess_for_model(f) for f in random_corpus(10_000, seed=0)])
+
+    print(f"{'rows':>6} {'engine':>9} {'p50 ms':>9} {'p99 ms':>9}")
+    for n_rows, repeats in ((1, 200), (100, 50), (10_000, 3)):
+        batch = corpus.iloc[:n_rows]
+        for name, engine in (("sklearn", model), ("compiled", compiled)):
+            timings = _latencies_ms(lambda: engine.predict(batch), repeats)
+            print(f"{n_rows:>6} {name:>9} {np.percentile(timings, 50):9.2f} {np.percentile(timings, 99):9.2f}")
+
+    # Force the compiled walk on every row for the accuracy check
+    max_diff = np.max(np.abs(compiled.forest.predict(compiled.transform(corpus)) - model.predict(corpus)))
+    print(f"max |compiled - sklearn| over {len(corpus)} rows: {max_diff:.3g}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Per-request model-input overhead: pd.DataFrame([feature_dict]) vs the RowLayout fast path,
+and the fitted preprocessing vs its fused version (api/fused.py).
+
+    python -m benchmarks.bench_preprocess
+"""
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from api.features import RowLayout
+from api.fused import FusedTransform
+from api.predict import _WARMUP_FEATURES, _load_model, preprocess_for_model
+
+
+def _per_call_us(fn, number: int) -> float:
+    # Best of 5 repeats: least disturbed by other processes
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+
+def main() -> None:
+    model = _load_model()
+    layout = RowLayout.for_model(model)
+    features = _WARMUP_FEATURES
+
+    def dataframe_input():
+        return pd.DataFrame([preprocess_for_model(features)])
+
+    def fast_input():
+        return layout.frame([features])
+
+    before = _per_call_us(dataframe_input, 2000)
+    after = _per_call_us(fast_input, 2000)
+    print(f"model input (1 row)     before: {before:9.1f} us   after: {after:9.1f} us")
+
+    before_predict = _per_call_us(lambda: model.predict(dataframe_input()), 50)
+    after_predict = _per_call_us(lambda: model.predict(fast_input()), 50)
+    print(f"input + predict (1 row) before: {before_predict:9.1f} us   after: {after_predict:9.1f} us")
+
+    same = np.array_equal(model.predict(dataframe_input()), model.predict(fast_input()))
+    print(f"identical predictions: {same}")
+
+    preprocessor = model[:-1]
+    fused = FusedTransform.from_preprocessor(preprocessor)
+    fitted = _per_call_us(lambda: preprocessor.transform(fast_input()), 200)
+    fused_us = _per_call_us(lambda: fused.transform(layout.values([features])), 2000)
+    print(f"preprocess (1 row)      fitted: {fitted:9.1f} us   fused: {fused_us:9.1f} us")
+    same = fused.transform(layout.values([features])).tobytes() == preprocessor.transform(fast_input()).tobytes()
+    print(f"bit-identical matrix: {same}")
+
+
+if __name__ == "__main__":
+    main()
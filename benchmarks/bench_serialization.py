@@ -0,0 +1,47 @@
+"""
+Response encoding cost: one dict per prediction + stdlib JSONResponse vs api.encoding.
+
+    python -m benchmarks.bench_serialization
+"""
+import json
+import timeit
+
+import numpy as np
+from fastapi.responses import JSONResponse
+
+from api import encoding
+from api.predict import ScoredItems
+
+
+def _per_call_ms(fn, number: int) -> float:
+    # Best of 5 repeats: least disturbed by other processes
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e3
+
+
+def main() -> None:
+    print(f"encoder: {encoding.ENCODER}")
+    for rows in (1, 10_000):
+        prices = np.random.default_rng(0).uniform(100_000, 900_000, rows)
+        scored = ScoredItems(prices, prices / 120, {}, "immo_eliza_rf_small-0123456789ab")
+
+        def before():
+            items = [scored.item(index) for index in range(rows)]
+            return JSONResponse({
+                "predictions": items,
+                "n_success": rows,
+                "n_failed": 0,
+                "status_code": 200,
+                "model_version": scored.model_version,
+            }).body
+
+        def after():
+            return encoding.batch_body(scored)
+
+        number = 2000 if rows == 1 else 10
+        print(f"{rows:>6} predictions   before: {_per_call_ms(before, number):8.3f} ms"
+              f"   after: {_per_call_ms(after, number):8.3f} ms")
+        assert json.loads(before()) == json.loads(after())
+
+
+if __name__ == "__main__":
+    main()
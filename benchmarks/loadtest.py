@@ -0,0 +1,357 @@
+"""
+Local load test: find the saturation point of api.app:app for a serving setup.
+
+    python -m benchmarks.loadtest --concurrency 1,4,16,64 --duration 15
+    python -m benchmarks.loadtest --server gunicorn --workers 2 --rate 50 --mix single=0.7,batch=0.3
+    python -m benchmarks.loadtest --url http://localhost:8000 --concurrency 8   # already running
+
+- Starts the app on localhost (uvicorn, or gunicorn with api/gunicorn_conf.py)
+  with the serving env vars of the current shell, and waits for /ready.
+- Closed loop by default: `concurrency` clients send back to back. With --rate,
+  requests arrive on a fixed (or --arrival poisson) schedule and latency is
+  measured from the scheduled time, so a stalled server is not hidden by
+  clients that simply stop sending (coordinated omission).
+- Request mix: single /predict vs /predict/batch (--batch-size rows), and the
+  share of unique payloads (--unique) vs a small pool of repeated listings
+  that the prediction cache can answer.
+- Reports achieved RPS, p50/p95/p99/max latency and error rate per level, plus
+  server CPU % and RSS / PSS sampled every second.
+
+Load generator and server share the machine: on few cores, the generator's
+own CPU use lowers the numbers. Needs httpx (requirements-dev.txt).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+from api.corpus import random_corpus
+from api.memory import child_pids, memory_report
+
+_REPEATED_POOL = 20
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+# 1) Server process
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(kind: str, workers: int, port: int, log_path: Path) -> subprocess.Popen:
+    """Start uvicorn / gunicorn on localhost in its own process group."""
+    env = {**os.environ, "PORT": str(port), "WEB_CONCURRENCY": str(workers)}
+    if kind == "gunicorn":
+        command = [sys.executable, "-m", "gunicorn", "-c", "api/gunicorn_conf.py",
+                   "--bind", f"127.0.0.1:{port}", "api.app:app"]
+    else:
+        command = [sys.executable, "-m", "uvicorn", "api.app:app", "--host", "127.0.0.1",
+                   "--port", str(port), "--workers", str(workers), "--no-access-log"]
+
+    log = open(log_path, "wb")
+    return subprocess.Popen(
+        command, env=env, stdout=log, stderr=subprocess.STDOUT,
+        cwd=Path(__file__).resolve().parent.parent, start_new_session=True,
+    )
+
+
+def wait_ready(url: str, process: Optional[subprocess.Popen], timeout: float = 120.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode} before becoming ready.")
+        try:
+            if httpx.get(f"{url}/ready", timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"Server at {url} not ready after {timeout:.0f}s.")
+
+
+def stop_server(process: subprocess.Popen) -> None:
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=15)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+
+
+# 2) Server resource sampling
+
+def _cpu_ticks(pid: int) -> int:
+    try:
+        # Fields after the "(comm)" part; utime and stime are fields 14 and 15
+        fields = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+        return int(fields[11]) + int(fields[12])
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+class ResourceSampler(threading.Thread):
+    """Samples CPU % and memory of the server process tree every `interval` seconds."""
+
+    def __init__(self, pid: int, interval: float = 1.0) -> None:
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.samples: List[Dict[str, Any]] = []
+        self.completed = 0  # bumped by the load generator
+        self._stop_event = threading.Event()
+
+    def _tree_ticks(self) -> int:
+        return sum(_cpu_ticks(pid) for pid in [self.pid] + child_pids(self.pid))
+
+    def run(self) -> None:
+        start = last_time = time.monotonic()
+        last_ticks, last_completed = self._tree_ticks(), 0
+        while not self._stop_event.wait(self.interval):
+            now, ticks, completed = time.monotonic(), self._tree_ticks(), self.completed
+            memory = memory_report(self.pid)
+            elapsed = now - last_time
+            self.samples.append({
+                "t": round(now - start, 2),
+                "cpu_percent": round(100 * (ticks - last_ticks) / _CLOCK_TICKS / elapsed, 1),
+                "rss_mb": round(memory["total_rss"] / 2**20, 1),
+                "pss_mb": round(memory["total_pss"] / 2**20, 1),
+                "rps": round((completed - last_completed) / elapsed, 1),
+            })
+            last_time, last_ticks, last_completed = now, ticks, completed
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+# 3) Load generation
+
+class RequestMix:
+    """Picks the next request: endpoint + payload, following the configured mix."""
+
+    def __init__(self, batch_share: float, batch_size: int, unique_share: float, seed: int = 0) -> None:
+        self.batch_share = batch_share
+        self.batch_size = batch_size
+        self.unique_share = unique_share
+        self._rng = random.Random(seed)
+        corpus = random_corpus(5_000 + _REPEATED_POOL, seed=seed)
+        payloads = [features.model_dump(mode="json", exclude_none=True) for features in corpus]
+        self._repeated = payloads[:_REPEATED_POOL]
+        self._unique = payloads[_REPEATED_POOL:]
+        self._next_unique = 0
+
+    def _property(self) -> Dict[str, Any]:
+        if self._rng.random() >= self.unique_share:
+            return self._rng.choice(self._repeated)
+        payload = self._unique[self._next_unique % len(self._unique)]
+        self._next_unique += 1
+        return payload
+
+    def next(self) -> Tuple[str, str, Dict[str, Any]]:
+        """(kind, path, json body)"""
+        if self._rng.random() < self.batch_share:
+            return "batch", "/predict/batch", {"data": [self._property() for _ in range(self.batch_size)]}
+        return "single", "/predict", {"data": self._property()}
+
+
+async def _send(client: httpx.AsyncClient, mix: RequestMix, scheduled: float,
+                records: List[Tuple[str, float, int]], sampler: Optional[ResourceSampler]) -> None:
+    kind, path, body = mix.next()
+    try:
+        status = (await client.post(path, json=body)).status_code
+    except httpx.HTTPError:
+        status = 0
+    records.append((kind, time.perf_counter() - scheduled, status))
+    if sampler is not None:
+        sampler.completed += 1
+
+
+async def run_level(url: str, mix: RequestMix, concurrency: int, duration: float,
+                    rate: Optional[float], arrival: str,
+                    sampler: Optional[ResourceSampler]) -> Dict[str, Any]:
+    """Drive the server for `duration` seconds and summarise the responses."""
+    records: List[Tuple[str, float, int]] = []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    rng = random.Random(1)
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60.0) as client:
+        start = time.perf_counter()
+        end = start + duration
+
+        if rate:
+            # Open loop: requests start on schedule; at most `concurrency` in flight
+            gate = asyncio.Semaphore(concurrency)
+
+            async def scheduled_send(at: float) -> None:
+                async with gate:
+                    await _send(client, mix, at, records, sampler)
+
+            tasks, at = [], start
+            while at < end:
+                delay = at - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                tasks.append(asyncio.create_task(scheduled_send(at)))
+                at += rng.expovariate(rate) if arrival == "poisson" else 1.0 / rate
+            await asyncio.gather(*tasks)
+        else:
+            async def closed_loop() -> None:
+                while time.perf_counter() < end:
+                    await _send(client, mix, time.perf_counter(), records, sampler)
+
+            await asyncio.gather(*(closed_loop() for _ in range(concurrency)))
+
+        elapsed = time.perf_counter() - start
+
+    return summarize(records, elapsed, concurrency, rate)
+
+
+def _latency_stats(latencies: List[float]) -> Dict[str, Optional[float]]:
+    if not latencies:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None}
+    values = np.asarray(latencies) * 1000
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"p50_ms": round(float(p50), 2), "p95_ms": round(float(p95), 2),
+            "p99_ms": round(float(p99), 2), "max_ms": round(float(values.max()), 2)}
+
+
+def summarize(records: List[Tuple[str, float, int]], elapsed: float,
+              concurrency: int, rate: Optional[float]) -> Dict[str, Any]:
+    errors = sum(1 for _, _, status in records if status != 200)
+    summary: Dict[str, Any] = {
+        "concurrency": concurrency,
+        "target_rps": rate,
+        "requests": len(records),
+        "errors": errors,
+        "error_rate": round(errors / len(records), 4) if records else None,
+        "rps": round(len(records) / elapsed, 1) if elapsed else None,
+        **_latency_stats([latency for _, latency, _ in records]),
+        "by_kind": {},
+    }
+    for kind in sorted({kind for kind, _, _ in records}):
+        latencies = [latency for k, latency, _ in records if k == kind]
+        summary["by_kind"][kind] = {"requests": len(latencies), **_latency_stats(latencies)}
+    return summary
+
+
+def saturation_level(levels: List[Dict[str, Any]], min_gain: float = 0.1) -> Optional[int]:
+    """First concurrency whose RPS is less than `min_gain` above the previous level."""
+    for previous, current in zip(levels, levels[1:]):
+        if previous["rps"] and current["rps"] < previous["rps"] * (1 + min_gain):
+            return previous["concurrency"]
+    return None
+
+
+# 4) CLI
+
+def _parse_mix(text: str) -> float:
+    """'single=0.8,batch=0.2' -> share of batch requests."""
+    shares = {}
+    for part in text.split(","):
+        name, _, value = part.partition("=")
+        shares[name.strip()] = float(value)
+    unknown = set(shares) - {"single", "batch"}
+    if unknown or sum(shares.values()) <= 0:
+        raise argparse.ArgumentTypeError("Use e.g. --mix single=0.8,batch=0.2")
+    return shares.get("batch", 0.0) / sum(shares.values())
+
+
+def _print_levels(levels: List[Dict[str, Any]]) -> None:
+    print(f"\n{'conc':>5} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} "
+          f"{'err %':>6} {'cpu %':>6} {'rss MB':>7}")
+    for level in levels:
+        print(f"{level['concurrency']:>5} {level['rps']:>8.1f} {level['p50_ms'] or 0:>8.1f} "
+              f"{level['p95_ms'] or 0:>8.1f} {level['p99_ms'] or 0:>8.1f} {level['max_ms'] or 0:>8.1f} "
+              f"{100 * (level['error_rate'] or 0):>6.2f} {level.get('cpu_percent_mean') or 0:>6.0f} "
+              f"{level.get('rss_mb_max') or 0:>7.0f}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test the prediction API.")
+    parser.add_argument("--url", default=None, help="Test a running server instead of starting one.")
+    parser.add_argument("--server", choices=("uvicorn", "gunicorn"), default="uvicorn")
+    parser.add_argument("--workers", type=int, default=1, help="Server worker processes (default 1).")
+    parser.add_argument("--concurrency", default="1,4,16",
+                        help="Comma-separated client concurrency levels, run one after another.")
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds per level (default 15).")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Unrecorded seconds before the first level.")
+    parser.add_argument("--rate", type=float, default=None,
+                        help="Open-loop arrival rate in requests/s (default: closed loop).")
+    parser.add_argument("--arrival", choices=("constant", "poisson"), default="constant")
+    parser.add_argument("--mix", type=_parse_mix, default=0.0, help="e.g. single=0.8,batch=0.2")
+    parser.add_argument("--batch-size", type=int, default=10, help="Properties per batch request.")
+    parser.add_argument("--unique", type=float, default=1.0,
+                        help="Share of never-seen payloads; the rest repeat a small pool (default 1.0).")
+    parser.add_argument("-o", "--output", type=Path, default=None, help="Write the JSON report here.")
+    args = parser.parse_args(argv)
+
+    levels_wanted = [int(level) for level in args.concurrency.split(",")]
+    mix = RequestMix(args.mix, args.batch_size, args.unique)
+
+    process = None
+    url = args.url
+    if url is None:
+        port = _free_port()
+        url = f"http://127.0.0.1:{port}"
+        log_path = Path(tempfile.gettempdir()) / f"immo-loadtest-{port}.log"
+        print(f"Starting {args.server} with {args.workers} worker(s) on {url} (log: {log_path})")
+        process = start_server(args.server, args.workers, port, log_path)
+
+    report: Dict[str, Any] = {"url": url, "server": None if args.url else args.server,
+                              "workers": None if args.url else args.workers,
+                              "settings": {key: value for key, value in os.environ.items()
+                                           if key.startswith("IMMO_")},
+                              "levels": []}
+    try:
+        wait_ready(url, process)
+        if args.warmup:
+            asyncio.run(run_level(url, mix, levels_wanted[0], args.warmup, None, "constant", None))
+
+        for concurrency in levels_wanted:
+            sampler = ResourceSampler(process.pid) if process is not None else None
+            if sampler is not None:
+                sampler.start()
+            level = asyncio.run(run_level(url, mix, concurrency, args.duration,
+                                          args.rate, args.arrival, sampler))
+            if sampler is not None:
+                sampler.stop()
+                level["samples"] = sampler.samples
+                if sampler.samples:
+                    level["cpu_percent_mean"] = round(
+                        float(np.mean([s["cpu_percent"] for s in sampler.samples])), 1)
+                    level["rss_mb_max"] = max(s["rss_mb"] for s in sampler.samples)
+            report["levels"].append(level)
+            print(f"concurrency {concurrency}: {level['rps']} rps, p99 {level['p99_ms']} ms, "
+                  f"errors {level['errors']}", flush=True)
+    finally:
+        if process is not None:
+            stop_server(process)
+
+    report["saturation_concurrency"] = saturation_level(report["levels"])
+    _print_levels(report["levels"])
+    if report["saturation_concurrency"] is not None:
+        print(f"\nThroughput stops growing after concurrency {report['saturation_concurrency']}.")
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+Cold-start budget: how long a fresh server process takes to answer.
+
+    python -m benchmarks.startup                      # uvicorn, 3 runs
+    python -m benchmarks.startup --server gunicorn --runs 5 -o startup.json
+    python -m benchmarks.startup --max-root 5 --max-predict 15   # exit 1 over budget
+
+- time_to_root: process spawn -> first 200 from "/" (what Render's health
+  check and a waking client see first).
+- time_to_predict: process spawn -> first 200 from /predict (sent as soon as
+  "/" answered, so it includes the model load the request waits for).
+- time_to_ready: process spawn -> /ready says ready (load + self-test done).
+- load_s / calibration_s / self_test_s: how the server itself splits its
+  model start-up, as reported by /ready (calibration_s: "auto" engine only).
+- Every run is a new process with the serving env vars of the current shell;
+  the median of the runs is reported next to each run.
+"""
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from benchmarks.loadtest import _free_port, start_server, stop_server
+
+PREDICT_PAYLOAD = {
+    "data": {
+        "property_type": "house",
+        "location": {"province": "Antwerpen", "postcode": 2000, "locality": "Antwerpen"},
+        "livable_surface": 120,
+        "number_of_bedrooms": 3,
+    }
+}
+
+
+def _first_success(send: Any, start: float, timeout: float, interval: float = 0.01) -> float:
+    """Seconds from `start` until send() returned a 200."""
+    deadline = start + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if send().status_code == 200:
+                return time.perf_counter() - start
+        except httpx.HTTPError:
+            pass
+        time.sleep(interval)
+    raise RuntimeError(f"No successful answer within {timeout:.0f}s.")
+
+
+def measure_startup(server: str = "uvicorn", timeout: float = 120.0) -> Dict[str, float]:
+    """Time to the first "/", /predict and ready /ready of one fresh server process."""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        process = start_server(server, 1, port, Path(tmp) / "server.log")
+        try:
+            with httpx.Client(base_url=url, timeout=timeout) as client:
+                root = _first_success(lambda: client.get("/"), start, timeout)
+                predict = _first_success(lambda: client.post("/predict", json=PREDICT_PAYLOAD), start, timeout)
+                ready = _first_success(lambda: client.get("/ready"), start, timeout)
+                status = client.get("/ready").json()
+        except RuntimeError:
+            sys.stderr.write((Path(tmp) / "server.log").read_text(errors="replace")[-2000:])
+            raise
+        finally:
+            stop_server(process)
+    return {
+        "time_to_root_s": round(root, 3),
+        "time_to_predict_s": round(predict, 3),
+        "time_to_ready_s": round(ready, 3),
+        "load_s": _rounded(status["load_seconds"]),
+        "calibration_s": _rounded(status["calibration_seconds"]),
+        "self_test_s": _rounded(status["warmup_seconds"]),
+    }
+
+
+def _rounded(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds, 3)
+
+
+def summarize(runs: List[Dict[str, Optional[float]]]) -> Dict[str, Optional[float]]:
+    """Median of every timing over the runs (None when no run reported it)."""
+    summary: Dict[str, Optional[float]] = {}
+    for key in runs[0]:
+        values = [run[key] for run in runs if run[key] is not None]
+        summary[key] = round(statistics.median(values), 3) if values else None
+    return summary
+
+
+def over_budget(summary: Dict[str, float], max_root: Optional[float], max_predict: Optional[float]) -> List[str]:
+    """Human-readable list of the budgets the summary exceeds."""
+    failures = []
+    if max_root is not None and summary["time_to_root_s"] > max_root:
+        failures.append(f"time_to_root {summary['time_to_root_s']}s > {max_root}s")
+    if max_predict is not None and summary["time_to_predict_s"] > max_predict:
+        failures.append(f"time_to_predict {summary['time_to_predict_s']}s > {max_predict}s")
+    return failures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure the cold start of the API.")
+    parser.add_argument("--server", choices=("uvicorn", "gunicorn"), default="uvicorn")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh processes to start (median reported).")
+    parser.add_argument("--max-root", type=float, default=None, help="Budget for time to first '/' (s).")
+    parser.add_argument("--max-predict", type=float, default=None, help="Budget for time to first /predict (s).")
+    parser.add_argument("-o", "--output", type=Path, default=None, help="Write the report as JSON.")
+    args = parser.parse_args(argv)
+
+    runs = [measure_startup(args.server) for _ in range(args.runs)]
+    report = {"server": args.server, "median": summarize(runs), "runs": runs}
+    print(json.dumps(report, indent=2))
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2))
+
+    failures = over_budget(report["median"], args.max_root, args.max_predict)
+    for failure in failures:
+        print(f"OVER BUDGET: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
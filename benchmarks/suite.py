@@ -0,0 +1,241 @@
+"""
+Reproducible benchmark suite for the prediction hot path.
+
+    python -m benchmarks.suite -o bench.json                       # run + save
+    python -m benchmarks.suite --baseline bench.json --threshold 0.2  # compare
+
+- Cases: model load, preprocess_for_model, predict_price, predict_prices,
+  response encoding (1 / 10k predictions) and end-to-end /predict,
+  /predict/batch + /predict/columns + /predict/arrow (TestClient; Arrow only
+  with pyarrow installed) at 1 / 10 / 100 / 10k rows.
+- Same random corpus every run (fixed seed); the prediction cache is switched
+  off so every call really runs the model.
+- Results are JSON with machine metadata (CPU, Python + library versions,
+  git commit, model version, serving settings) next to the numbers.
+- With --baseline, each case's median is compared with the stored one; the
+  run exits with status 1 when a case is slower by more than --threshold
+  (0.2 = 20 %), so CI can fail on regressions.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from api import config
+from api import predict as predict_module
+from api.corpus import random_corpus
+
+BATCH_SIZES = (1, 10, 100, 10_000)
+_PACKAGES = ("numpy", "pandas", "scikit-learn", "fastapi", "pydantic", "starlette", "joblib", "orjson", "pyarrow")
+
+
+def _measure(fn: Callable[[], Any], repeats: int, warmup: int = 1) -> Dict[str, float]:
+    """Wall-clock statistics of repeated calls, in milliseconds."""
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "repeats": repeats,
+        "min_ms": round(timings[0], 4),
+        "p50_ms": round(statistics.median(timings), 4),
+        "p95_ms": round(timings[min(len(timings) - 1, int(0.95 * len(timings)))], 4),
+        "mean_ms": round(statistics.fmean(timings), 4),
+    }
+
+
+def _repeats_for(rows: int, quick: bool) -> int:
+    repeats = 200 if rows == 1 else 50 if rows <= 100 else 3
+    return max(2, repeats // 10) if quick else repeats
+
+
+def _as_columns(payloads: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """Property objects -> the columnar request format (location fields flat)."""
+    rows = [{**payload, **payload["location"]} for payload in payloads]
+    names = sorted(set().union(*rows) - {"location"})
+    return {name: [row.get(name) for row in rows] for name in names}
+
+
+def _as_arrow(columns: Dict[str, List[Any]]) -> Optional[bytes]:
+    """Columns -> an Arrow IPC stream body (None without pyarrow)."""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return None
+    table = pa.table(columns)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, timeout=10,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def machine_metadata() -> Dict[str, Any]:
+    versions = {}
+    for package in _PACKAGES:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+
+    from api import encoding
+
+    status = predict_module.model_status()
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor() or None,
+        "cpu_count": os.cpu_count(),
+        "packages": versions,
+        "model_version": status["version"],
+        "engine": status["engine"],
+        "fast_path": status["fast_path"],
+        "json_encoder": encoding.ENCODER,
+    }
+
+
+def run_suite(quick: bool = False, batch_sizes: Any = BATCH_SIZES) -> Dict[str, Any]:
+    """Run every case and return {"metadata": ..., "results": {case: stats}}."""
+    from fastapi.testclient import TestClient
+
+    from api.app import app
+
+    predict_module.current_model()
+    corpus = random_corpus(max(batch_sizes), seed=0)
+    payloads = [features.model_dump(mode="json", exclude_none=True) for features in corpus]
+    results: Dict[str, Dict[str, Any]] = {}
+
+    def case(name: str, fn: Callable[[], Any], rows: int, repeats: int) -> None:
+        stats = _measure(fn, repeats)
+        stats["rows"] = rows
+        stats["rows_per_second"] = round(rows / (stats["p50_ms"] / 1000), 1) if stats["p50_ms"] else None
+        results[name] = stats
+
+    source = predict_module.model_registry().active_path()
+    case("model_load", lambda: predict_module.load_serving(source), 1, 2 if quick else 5)
+    case("preprocess_for_model", lambda: predict_module.preprocess_for_model(corpus[0]),
+         1, 200 if quick else 2000)
+
+    from api import encoding
+    from api.predict import ScoredItems
+
+    # Response encoding alone, from a scored batch (no model call)
+    for rows in (1, 10_000):
+        prices = np.linspace(100_000.0, 900_000.0, rows)
+        scored = ScoredItems(prices, prices / 120, {}, "benchmark")
+        case(f"serialize_batch[{rows}]", lambda: encoding.batch_body(scored), rows, _repeats_for(rows, quick) * 10)
+
+    with predict_module.cache_disabled(), TestClient(app) as client:
+        case("predict_price", lambda: predict_module.predict_price(corpus[0]), 1, _repeats_for(1, quick))
+        case("http_predict", lambda: client.post("/predict", json={"data": payloads[0]}),
+             1, _repeats_for(1, quick))
+
+        for rows in batch_sizes:
+            batch, body = corpus[:rows], {"data": payloads[:rows]}
+            repeats = _repeats_for(rows, quick)
+            case(f"predict_prices[{rows}]", lambda: predict_module.predict_prices(batch), rows, repeats)
+            case(f"http_predict_batch[{rows}]", lambda: client.post("/predict/batch", json=body), rows, repeats)
+            columns = {"data": _as_columns(payloads[:rows])}
+            case(f"http_predict_columns[{rows}]", lambda: client.post("/predict/columns", json=columns), rows, repeats)
+            arrow = _as_arrow(columns["data"])
+            if arrow is not None:
+                case(f"http_predict_arrow[{rows}]", lambda: client.post("/predict/arrow", content=arrow), rows, repeats)
+
+    return {"metadata": machine_metadata(), "results": results}
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """
+    Median of every case shared with the baseline, as a ratio current / baseline.
+
+    A case regresses when the ratio exceeds 1 + threshold.
+    """
+    rows = []
+    for name, stats in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before or not before.get("p50_ms"):
+            continue
+        ratio = stats["p50_ms"] / before["p50_ms"]
+        rows.append({
+            "case": name,
+            "baseline_p50_ms": before["p50_ms"],
+            "p50_ms": stats["p50_ms"],
+            "ratio": round(ratio, 3),
+            "regression": ratio > 1 + threshold,
+        })
+    return rows
+
+
+def _print_results(results: Dict[str, Dict[str, Any]]) -> None:
+    print(f"{'case':<28} {'p50 ms':>10} {'p95 ms':>10} {'rows/s':>12}")
+    for name, stats in results.items():
+        print(f"{name:<28} {stats['p50_ms']:10.3f} {stats['p95_ms']:10.3f} {stats['rows_per_second'] or 0:12,.0f}")
+
+
+def _print_comparison(rows: List[Dict[str, Any]], threshold: float) -> None:
+    print(f"\n{'case':<28} {'baseline':>10} {'now':>10} {'ratio':>7}   (threshold +{threshold:.0%})")
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(f"{row['case']:<28} {row['baseline_p50_ms']:10.3f} {row['p50_ms']:10.3f} {row['ratio']:7.2f}{flag}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the prediction hot path.")
+    parser.add_argument("-o", "--output", type=Path, default=None, help="Write results as JSON to this file.")
+    parser.add_argument("--baseline", type=Path, default=None, help="Earlier results JSON to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed slowdown of a case's median before it counts as a regression (default 0.2).")
+    parser.add_argument("--quick", action="store_true", help="Fewer repeats (smoke run, noisier numbers).")
+    args = parser.parse_args(argv)
+
+    report = run_suite(quick=args.quick)
+    report["metadata"]["serving"] = {
+        "cache_size": config.CACHE_MAX_SIZE,
+        "inference_engine": config.INFERENCE_ENGINE,
+        "compiled_max_rows": config.COMPILED_MAX_ROWS,
+        "fast_path": config.FAST_PATH_ENABLED,
+    }
+    _print_results(report["results"])
+
+    exit_code = 0
+    if args.baseline is not None:
+        rows = compare(report, json.loads(args.baseline.read_text()), args.threshold)
+        report["comparison"] = {"baseline": str(args.baseline), "threshold": args.threshold, "cases": rows}
+        _print_comparison(rows, args.threshold)
+        exit_code = 1 if any(row["regression"] for row in rows) else 0
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"\nResults written to {args.output}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
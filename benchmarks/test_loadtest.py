@@ -0,0 +1,30 @@
+import argparse
+
+import pytest
+
+from benchmarks.loadtest import _parse_mix, saturation_level, summarize
+
+
+def test_summarize_counts_errors_and_kinds() -> None:
+    records = [("single", 0.010, 200), ("single", 0.020, 200), ("batch", 0.050, 503), ("single", 0.030, 0)]
+    summary = summarize(records, elapsed=2.0, concurrency=4, rate=None)
+
+    assert summary["requests"] == 4
+    assert summary["rps"] == 2.0
+    assert summary["errors"] == 2
+    assert summary["error_rate"] == 0.5
+    assert summary["max_ms"] == 50.0
+    assert summary["by_kind"]["single"]["requests"] == 3
+
+
+def test_saturation_is_where_throughput_flattens() -> None:
+    levels = [{"concurrency": 1, "rps": 100}, {"concurrency": 4, "rps": 180}, {"concurrency": 16, "rps": 185}]
+    assert saturation_level(levels) == 4
+    assert saturation_level(levels[:2]) is None
+
+
+def test_parse_mix() -> None:
+    assert _parse_mix("single=0.8,batch=0.2") == pytest.approx(0.2)
+    assert _parse_mix("batch=1") == 1.0
+    with pytest.raises(argparse.ArgumentTypeError):
+        _parse_mix("bulk=1")
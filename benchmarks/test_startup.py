@@ -0,0 +1,34 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks.startup import measure_startup, over_budget, summarize
+
+# Cold-start budget, with headroom for slow CI machines (1 vCPU dev box:
+# ~1 s to the first "/", ~3 s to the first /predict)
+MAX_ROOT_S = 5.0
+MAX_PREDICT_S = 20.0
+
+
+def test_app_import_defers_heavy_modules() -> None:
+    code = ("import sys, api.app; "
+            "print(sorted(m for m in ('pandas', 'sklearn', 'scipy', 'pyarrow') if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            cwd=Path(__file__).resolve().parent.parent)
+    assert result.stdout.strip() == "[]"
+
+
+def test_cold_start_within_budget() -> None:
+    timings = measure_startup("uvicorn")
+    assert timings["load_s"] is not None and timings["self_test_s"] is not None
+    assert over_budget(timings, MAX_ROOT_S, MAX_PREDICT_S) == [], timings
+
+
+def test_budget_report() -> None:
+    runs = [{"time_to_root_s": 1.0, "time_to_predict_s": 3.0}, {"time_to_root_s": 2.0, "time_to_predict_s": 9.0},
+            {"time_to_root_s": 1.5, "time_to_predict_s": 4.0}]
+    summary = summarize(runs)
+    assert summary == {"time_to_root_s": 1.5, "time_to_predict_s": 4.0}
+    assert summarize([{"calibration_s": None}, {"calibration_s": None}]) == {"calibration_s": None}
+    assert over_budget(summary, 2.0, 5.0) == []
+    assert over_budget(summary, 1.0, None) == ["time_to_root 1.5s > 1.0s"]
@@ -0,0 +1,22 @@
+from benchmarks.suite import _measure, compare
+
+
+def _report(**medians: float) -> dict:
+    return {"results": {name: {"p50_ms": value} for name, value in medians.items()}}
+
+
+def test_compare_flags_only_slowdowns_above_threshold() -> None:
+    baseline = _report(fast=10.0, slow=10.0, gone=5.0)
+    current = _report(fast=11.0, slow=13.0, new=1.0)
+
+    rows = {row["case"]: row for row in compare(current, baseline, threshold=0.2)}
+    assert set(rows) == {"fast", "slow"}  # cases missing on either side are skipped
+    assert rows["fast"]["regression"] is False
+    assert rows["slow"]["regression"] is True
+    assert rows["slow"]["ratio"] == 1.3
+
+
+def test_measure_reports_ordered_percentiles() -> None:
+    stats = _measure(lambda: sum(range(1000)), repeats=20)
+    assert stats["repeats"] == 20
+    assert 0 < stats["min_ms"] <= stats["p50_ms"] <= stats["p95_ms"]